@@ -1,6 +1,27 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.models import User
 from .models import Job, JobApplication, ContactMessage
 from .models import Testimonial
+from . import bulk, resumes
+
+
+def bulk_action(description, exclude_self_and_superusers=False, **values):
+    """
+    A ModelAdmin action that applies ``values`` with a single UPDATE.
+
+    For user actions, ``exclude_self_and_superusers`` leaves superusers and
+    the acting admin untouched, as the ``bulk_users`` view does.
+    """
+    def action(modeladmin, request, queryset):
+        if exclude_self_and_superusers:
+            queryset = queryset.filter(is_superuser=False).exclude(pk=request.user.pk)
+        updated = bulk.update(queryset, **values)
+        modeladmin.message_user(request, f"{updated} row(s) updated.", messages.SUCCESS)
+
+    action.__name__ = 'set_' + '_'.join(f'{field}_{value}' for field, value in values.items()).lower()
+    action.short_description = description
+    return action
 
 
 
@@ -12,8 +33,15 @@ class JobAdmin(admin.ModelAdmin):
         'location',
         'job_type',
         'is_active',
+        'application_count',
         'posted_at'
     )
+    actions = (
+        bulk_action("Approve selected jobs", is_active=True),
+        bulk_action("Deactivate selected jobs", is_active=False),
+        bulk_action("Feature selected jobs", featured=True),
+        bulk_action("Unfeature selected jobs", featured=False),
+    )
 
     def save_model(self, request, obj, form, change):
         if not obj.pk:
@@ -29,12 +57,24 @@ class JobApplicationAdmin(admin.ModelAdmin):
         'status',
         'email',
         'phone',
-        'applied_at'
+        'applied_at',
+        'upload_status'
     )
 
-    list_filter = ('status', 'job', 'applied_at')
+    list_filter = ('status', 'upload_status', 'job', 'applied_at')
     search_fields = ('user__username', 'email', 'full_name')
     list_editable = ('status',)
+    actions = [
+        bulk_action(f"Mark selected applications as {label}", status=status)
+        for status, label in JobApplication.STATUS_CHOICES
+    ]
+
+    def get_search_results(self, request, queryset, search_term):
+        # Also match keywords in the applicant's resume (see jobs.resumes).
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            results |= queryset.filter(resumes.matching(search_term))
+        return results, may_have_duplicates
 
 @admin.register(ContactMessage)
 class ContactMessageAdmin(admin.ModelAdmin):
@@ -52,4 +92,19 @@ class ContactMessageAdmin(admin.ModelAdmin):
 class TestimonialAdmin(admin.ModelAdmin):
     list_display = ('user', 'designation', 'is_approved', 'created_at')
     list_filter = ('is_approved', 'created_at')
-    search_fields = ('user__username', 'user__first_name', 'user__last_name', 'designation', 'message')
\ No newline at end of file
+    search_fields = ('user__username', 'user__first_name', 'user__last_name', 'designation', 'message')
+    actions = (
+        bulk_action("Approve selected testimonials", is_approved=True),
+        bulk_action("Unapprove selected testimonials", is_approved=False),
+    )
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class PortalUserAdmin(UserAdmin):
+    actions = (
+        bulk_action("Unblock selected users", exclude_self_and_superusers=True, is_active=True),
+        bulk_action("Block selected users", exclude_self_and_superusers=True, is_active=False),
+    )
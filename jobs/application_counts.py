@@ -0,0 +1,139 @@
+"""
+Per-job application counters.
+
+``Job.application_count`` and the ``<status>_count`` columns are kept in
+step with ``JobApplication`` by the receivers in ``jobs.signals``: every
+create, delete, status change or move to another job becomes one
+``UPDATE jobs_job SET ... = ... + delta`` per affected job, on the same
+connection as the write that caused it. Nothing reads a count back in
+Python, so concurrent applications never lose an update. The job and
+status an application counted towards before a save are read from its
+row, locked for the rest of the save (see ``stats.stored_copy``), not
+from the copy loaded earlier: two stale copies saved in turn, such as
+a double-clicked status link, count one change rather than the same
+change twice. Requests are
+not atomic (``ATOMIC_REQUESTS`` is off), so outside an explicit
+``transaction.atomic`` block the write and its counter update commit
+separately; the ``repair_application_counts`` command recomputes the
+columns from the source table if they drift.
+"""
+import collections
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import Job, JobApplication
+
+TOTAL = 'application_count'
+
+
+def status_field(status):
+    return f'{status}_count'
+
+
+def counted(instance):
+    """``(job id, status)`` ``instance`` counts towards, or None if either is deferred."""
+    values = instance.__dict__
+    if 'job_id' not in values or 'status' not in values:
+        return None
+    return values['job_id'], values['status']
+
+
+def remember(instance, stored=None):
+    """Note what ``instance`` counts towards, taken from ``stored`` (a fresh copy of its row) if given."""
+    instance._counted_as = counted(stored or instance) if instance.pk else None
+
+
+def apply(deltas):
+    """``deltas`` is ``{job id: {field: delta}}``; one UPDATE per job."""
+    for job_id, fields in deltas.items():
+        changes = {field: F(field) + delta for field, delta in fields.items() if delta}
+        if changes:
+            Job.objects.filter(pk=job_id).update(**changes)
+
+
+def _add(deltas, key, rows):
+    if key is None:
+        return
+    job_id, status = key
+    deltas[job_id][TOTAL] += rows
+    deltas[job_id][status_field(status)] += rows
+
+
+def record_save(instance, created):
+    new = counted(instance)
+    old = None if created else getattr(instance, '_counted_as', new)
+    if new is not None and old != new and (created or old is not None):
+        deltas = collections.defaultdict(collections.Counter)
+        _add(deltas, old, -1)
+        _add(deltas, new, 1)
+        apply(deltas)
+    instance._counted_as = new
+
+
+def record_delete(instance):
+    key = getattr(instance, '_counted_as', None) or counted(instance)
+    deltas = collections.defaultdict(collections.Counter)
+    _add(deltas, key, -1)
+    apply(deltas)
+
+
+def record_bulk_create(objects):
+    deltas = collections.defaultdict(collections.Counter)
+    for instance in objects:
+        _add(deltas, counted(instance), 1)
+    apply(deltas)
+
+
+def record_bulk_update(values, previous):
+    """
+    Adjust counters after ``jobs.bulk.update`` changed the status of
+    groups of applications; ``previous`` is grouped by job as well (see
+    ``bulk.GROUP_BY``).
+    """
+    if 'status' not in values:
+        return
+    deltas = collections.defaultdict(collections.Counter)
+    for old_values, rows in previous:
+        _add(deltas, (old_values['job_id'], old_values['status']), -rows)
+        _add(deltas, (old_values['job_id'], values['status']), rows)
+    apply(deltas)
+
+
+def rebuild(batch_size=2000):
+    """
+    Recompute every job's counters from ``JobApplication``, ``batch_size``
+    jobs per transaction, writing only the jobs that were wrong. Returns
+    the number of jobs corrected.
+    """
+    fields = Job.COUNTER_FIELDS
+    corrected = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            jobs = list(
+                Job.objects.select_for_update()
+                .filter(pk__gt=last_pk).order_by('pk').only(*fields)[:batch_size]
+            )
+            if not jobs:
+                break
+            last_pk = jobs[-1].pk
+
+            actual = collections.defaultdict(collections.Counter)
+            rows = (
+                JobApplication.objects.filter(job_id__gte=jobs[0].pk, job_id__lte=last_pk)
+                .values_list('job_id', 'status').annotate(rows=Count('pk')).order_by()
+            )
+            for job_id, status, count in rows:
+                _add(actual, (job_id, status), count)
+
+            wrong = []
+            for job in jobs:
+                counts = actual.get(job.pk, {})
+                if any(getattr(job, field) != counts.get(field, 0) for field in fields):
+                    for field in fields:
+                        setattr(job, field, counts.get(field, 0))
+                    wrong.append(job)
+            Job.objects.bulk_update(wrong, fields)
+            corrected += len(wrong)
+    return corrected
@@ -0,0 +1,125 @@
+"""
+Async versions of the public read paths, for ASGI deployments.
+
+With ``ASYNC_VIEWS`` on, ``jobs.urls`` routes ``home``, ``job_list``,
+``job_detail`` and ``my_jobs`` here instead of to ``jobs.views``. Queries
+go through the async ORM and independent ones are awaited together.
+Querysets are evaluated before rendering: templates and context
+processors are synchronous, so ``render`` runs in a worker thread.
+
+Under WSGI keep ``ASYNC_VIEWS`` off: Django would start an event loop per
+request to run these.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.shortcuts import aget_object_or_404, render
+
+from . import facets, feed, fragments, page_cache, routers, search, similarity
+from .forms import JobFilterForm
+from .models import Job, JobApplication, Testimonial
+from .page_cache import cache_anonymous_page
+from .pagination import apaginate, apaginate_ranked
+from .views import with_applied
+
+arender = sync_to_async(render)
+
+
+async def _list(queryset):
+    return [row async for row in queryset.aiterator()]
+
+
+# ==========================
+# HOME
+# ==========================
+@cache_anonymous_page('home', depends_on=(page_cache.JOBS, page_cache.TESTIMONIALS))
+async def home(request):
+    featured_jobs = Job.objects.filter(featured=True, is_active=True)
+    testimonials = Testimonial.objects.filter(is_approved=True).select_related('user__profile').order_by('-created_at')[:6]
+
+    # Only fetch the blocks whose fragment is not cached. Should a fragment
+    # expire before rendering, the template falls back to the lazy queryset.
+    context = {'featured_jobs': featured_jobs, 'testimonials': testimonials}
+    fragment_names = {'featured_jobs': fragments.HOME_FEATURED_JOBS, 'testimonials': fragments.HOME_TESTIMONIALS}
+    fragment_keys = {name: make_template_fragment_key(fragment) for name, fragment in fragment_names.items()}
+    cached = await cache.aget_many(fragment_keys.values())
+    missing = [name for name, key in fragment_keys.items() if key not in cached]
+    with routers.primary_reads(bool(missing) and await routers.aheld(*(fragment_names[name] for name in missing))):
+        rows = await asyncio.gather(*(_list(context[name]) for name in missing))
+    context.update(zip(missing, rows))
+
+    context['fragment_timeout'] = fragments.FRAGMENT_TIMEOUT
+    return await arender(request, 'jobs/home.html', context)
+
+
+# ==========================
+# JOB LIST & DETAILS
+# ==========================
+@cache_anonymous_page('job_list', params=(
+    'q', 'location', 'job_type', 'salary_from', 'salary_to', 'salary_currency', 'salary_period',
+    'featured', 'cursor', 'page_size',
+))
+async def job_list(request):
+    query = request.GET.get('q', '')
+    location = request.GET.get('location', '')
+    filters = JobFilterForm(request.GET)
+
+    jobs = filters.filter(Job.objects.filter(is_active=True).order_by('-posted_at'))
+
+    if query or location:
+        jobs = search.search_jobs(jobs, query=query, location=location)
+
+    filtered = bool(query or location) or any(
+        value not in (None, '', False) for value in filters.cleaned_data.values()
+    )
+
+    user = await request.auser()
+    sort = request.GET.get('sort', '')
+    recommended = await sync_to_async(feed.get_feed)(user) if sort == feed.FOR_YOU and user.is_authenticated else None
+    if recommended:
+        paginated = apaginate_ranked(request, with_applied(jobs, user), recommended)
+    else:
+        paginated = apaginate(request, with_applied(jobs, user))
+
+    page, job_facets = await asyncio.gather(paginated, facets.abuild(request.GET, jobs, filtered))
+
+    return await arender(request, 'jobs/job_list.html', {
+        'jobs': page.object_list,
+        'page': page,
+        'query': query,
+        'location': location,
+        'filters': filters.cleaned_data,
+        'job_types': Job.JOB_TYPE_CHOICES,
+        'salary_currencies': Job.CURRENCY_CHOICES,
+        'salary_periods': Job.SALARY_PERIOD_CHOICES,
+        'facets': job_facets,
+        'sort': sort,
+        'recommended': bool(recommended),
+    })
+
+
+@cache_anonymous_page('job_detail')
+async def job_detail(request, job_id):
+    job = await aget_object_or_404(Job, id=job_id, is_active=True)
+    return await arender(request, 'jobs/job_detail.html', {
+        'job': job,
+        'similar_jobs': await sync_to_async(similarity.similar_jobs)(job),
+    })
+
+
+# ==========================
+# MY APPLICATIONS
+# ==========================
+@login_required
+async def my_jobs(request):
+    user = await request.auser()
+    applications = JobApplication.objects.filter(user=user).select_related('job')
+    page = await apaginate(request, applications)
+
+    return await arender(request, 'jobs/my_jobs.html', {
+        'applications': page.object_list,
+        'page': page
+    })
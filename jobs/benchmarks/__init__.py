@@ -0,0 +1,9 @@
+"""
+Benchmarks for the job portal.
+
+``data`` seeds realistic volumes with ``bulk_create``; ``suite`` drives the
+main views through the Django test client and reports latency
+percentiles, queries per request and peak memory. Run them with
+``manage.py run_benchmarks``, which uses a throwaway database and can
+compare against a JSON baseline.
+"""
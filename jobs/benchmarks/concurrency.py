@@ -0,0 +1,239 @@
+"""
+Throughput of the public read paths under concurrent load.
+
+The sync views run behind Django's WSGI handler on a pool of ``threads``
+server threads (a threaded gunicorn worker); the async views run behind
+the ASGI handler on one event loop (a uvicorn worker). Both are driven
+in-process by ``concurrency`` clients that each send their next request
+as soon as the previous one is answered, so the numbers cover the
+handler, middleware and views but not the HTTP server.
+
+In-memory SQLite answers in microseconds; ``db_latency`` adds a sleep to
+every query to stand in for the round trip to a database server, which
+is where async views are meant to win. Django's async ORM still runs each
+query in a thread (one per in-flight request) and opens a new database
+connection per ASGI request, so ASGI pulls ahead only once database
+waits outweigh that extra work.
+"""
+import asyncio
+import contextlib
+import importlib
+import io
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+from django.urls import clear_url_caches, reverse
+
+from jobs import metrics
+from jobs.models import Job
+
+MODES = ('wsgi', 'asgi')
+
+
+@contextlib.contextmanager
+def read_views(async_views):
+    """Route the public read paths to ``jobs.async_views`` or ``jobs.views``."""
+
+    def reload_urls():
+        importlib.reload(importlib.import_module('jobs.urls'))
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+        clear_url_caches()
+
+    try:
+        with override_settings(ASYNC_VIEWS=async_views):
+            reload_urls()
+            yield
+    finally:
+        reload_urls()
+
+
+@contextlib.contextmanager
+def db_latency(seconds):
+    """Sleep ``seconds`` before every query, on every connection in any thread."""
+    wrapped = []
+
+    def sleep(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def add(connection, **kwargs):
+        if sleep not in connection.execute_wrappers:
+            connection.execute_wrappers.append(sleep)
+            wrapped.append(connection)
+
+    if not seconds:
+        yield
+        return
+    for connection in connections.all():
+        add(connection)
+    connection_created.connect(add, weak=False)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(add)
+        for connection in wrapped:
+            if sleep in connection.execute_wrappers:
+                connection.execute_wrappers.remove(sleep)
+
+
+def build_requests(fixtures):
+    """``[(name, path, query string, cookie header)]``, sent round robin."""
+    seeker = Client()
+    seeker.force_login(fixtures['seeker'])
+    signed_in = f"{settings.SESSION_COOKIE_NAME}={seeker.cookies[settings.SESSION_COOKIE_NAME].value}"
+    job_id = Job.objects.filter(is_active=True).order_by('id').values_list('id', flat=True).first()
+    return [
+        ('home', reverse('home'), '', ''),
+        ('job_list', reverse('job_list'), '', ''),
+        ('job_list ?q', reverse('job_list'), 'q=developer', ''),
+        ('job_detail', reverse('job_detail', args=[job_id]), '', ''),
+        ('job_list (signed in)', reverse('job_list'), '', signed_in),
+        ('my_jobs', reverse('my_jobs'), '', signed_in),
+    ]
+
+
+def wsgi_request(app, path, query, cookie):
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    if cookie:
+        environ['HTTP_COOKIE'] = cookie
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(int(status.split(' ', 1)[0]))
+
+    body = app(environ, start_response)
+    try:
+        for _ in body:
+            pass
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+    return statuses[0]
+
+
+async def asgi_request(app, path, query, cookie):
+    headers = [(b'host', b'localhost')]
+    if cookie:
+        headers.append((b'cookie', cookie.encode()))
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': headers,
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    received = False
+    statuses = []
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # The client never disconnects; the handler cancels this wait.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    await app(scope, receive, send)
+    return statuses[0]
+
+
+async def drive(send, requests, total, concurrency):
+    """
+    ``concurrency`` clients send ``total`` requests between them. Returns
+    the latencies in ms, the error count and the most threads seen alive.
+    """
+    counter = itertools.count()
+    timings, errors, peak_threads = [], 0, threading.active_count()
+
+    async def client():
+        nonlocal errors, peak_threads
+        while (i := next(counter)) < total:
+            _, path, query, cookie = requests[i % len(requests)]
+            started = time.perf_counter()
+            status = await send(path, query, cookie)
+            timings.append((time.perf_counter() - started) * 1000)
+            errors += status != 200
+            peak_threads = max(peak_threads, threading.active_count())
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return timings, errors, peak_threads
+
+
+def run_mode(mode, requests, total, concurrency, threads):
+    if mode == 'wsgi':
+        app = get_wsgi_application()
+        server = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='wsgi')
+
+        async def send(path, query, cookie):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(server, wsgi_request, app, path, query, cookie)
+    else:
+        app = get_asgi_application()
+        server = None
+
+        async def send(path, query, cookie):
+            return await asgi_request(app, path, query, cookie)
+
+    with read_views(mode == 'asgi'):
+        # Warm up every path once (URL resolver, templates, caches).
+        asyncio.run(drive(send, requests, len(requests), 1))
+        started = time.perf_counter()
+        timings, errors, peak_threads = asyncio.run(drive(send, requests, total, concurrency))
+        elapsed = time.perf_counter() - started
+    if server is not None:
+        server.shutdown()
+
+    return {
+        'requests': total,
+        'seconds': round(elapsed, 2),
+        'rps': round(total / elapsed, 1),
+        'p50_ms': round(metrics.percentile(timings, 0.5), 2),
+        'p95_ms': round(metrics.percentile(timings, 0.95), 2),
+        'errors': errors,
+        'threads': peak_threads,
+    }
+
+
+def run(fixtures, total=600, concurrency=64, threads=8, latency_ms=2.0, modes=MODES):
+    requests = build_requests(fixtures)
+    results = {}
+    with db_latency(latency_ms / 1000):
+        for mode in modes:
+            results[mode] = run_mode(mode, requests, total, concurrency, threads)
+    return results
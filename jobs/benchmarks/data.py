@@ -0,0 +1,144 @@
+import datetime
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from jobs import search, similarity, stats
+from jobs.models import ContactMessage, Job, JobApplication, Profile, Testimonial, UserProfile
+
+TITLES = ['Python Developer', 'Senior React Engineer', 'Data Analyst', 'Accountant',
+          'Marketing Officer', 'DevOps Engineer', 'Graphic Designer', 'Sales Executive',
+          'Project Manager', 'QA Tester', 'Content Writer', 'Network Administrator']
+COMPANIES = ['Himalayan Tech', 'Everest Bank', 'Annapurna Media', 'Lumbini Soft',
+             'Gorkha Logistics', 'Koshi Health', 'Sagarmatha Labs', 'Bagmati Foods']
+LOCATIONS = ['Kathmandu', 'Lalitpur', 'Bhaktapur', 'Pokhara', 'Biratnagar', 'Butwal',
+             'Chitwan', 'Remote']
+SKILLS = ['python', 'django', 'react', 'sql', 'excel', 'communication', 'linux', 'aws',
+          'figma', 'testing', 'leadership', 'negotiation', 'docker', 'accounting']
+FIRST_NAMES = ['Aarav', 'Sita', 'Bikash', 'Anjali', 'Roshan', 'Pooja', 'Suman', 'Nisha']
+LAST_NAMES = ['Shrestha', 'Gurung', 'Tamang', 'Rai', 'Thapa', 'Karki', 'Magar', 'Adhikari']
+DESIGNATIONS = ['Software Engineer', 'Accountant', 'Designer', 'Sales Lead', 'Analyst']
+
+SCALES = {
+    'small': {'users': 200, 'jobs': 500, 'applications': 2_000, 'testimonials': 50, 'messages': 200},
+    'medium': {'users': 2_000, 'jobs': 5_000, 'applications': 20_000, 'testimonials': 500, 'messages': 2_000},
+    'large': {'users': 20_000, 'jobs': 50_000, 'applications': 200_000, 'testimonials': 5_000, 'messages': 20_000},
+}
+
+PASSWORD = 'benchmark'
+
+
+def generate_jobs(count, poster, rng, inactive_ratio=0, featured_ratio=0):
+    for _ in range(count):
+        skills = rng.sample(SKILLS, 4)
+        salary_min = rng.randrange(15, 150) * 1_000
+        yield Job(
+            title=rng.choice(TITLES),
+            company_name=rng.choice(COMPANIES),
+            location=rng.choice(LOCATIONS),
+            job_type=rng.choice(Job.JOB_TYPE_CHOICES)[0],
+            salary_min=salary_min,
+            salary_max=salary_min + rng.choice((0, 10_000, 20_000, 50_000)),
+            description=f"We are hiring. You will work with {', '.join(skills)}.",
+            requirements=f"Experience with {skills[0]} and {skills[1]}.",
+            posted_by=poster,
+            is_active=rng.random() >= inactive_ratio,
+            featured=rng.random() < featured_ratio,
+        )
+
+
+def _batched(model, objects, batch_size):
+    created = []
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == batch_size:
+            created += model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        created += model.objects.bulk_create(batch)
+    return created
+
+
+def seed(counts, seed=42, batch_size=2_000):
+    """
+    Create ``counts`` (see ``SCALES``) rows of each kind plus a staff user,
+    then rebuild the search index, job vectors and dashboard counters that
+    ``bulk_create`` bypassed. Returns the staff user and a job seeker
+    who has applications.
+    """
+    rng = random.Random(seed)
+    password = make_password(PASSWORD)
+    now = timezone.now()
+
+    admin = User.objects.create_user(
+        username='bench-admin@example.com', password=PASSWORD, is_staff=True
+    )
+    users = _batched(User, (
+        User(
+            username=f'seeker{i}@example.com',
+            email=f'seeker{i}@example.com',
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            password=password,
+        )
+        for i in range(counts['users'])
+    ), batch_size)
+    _batched(UserProfile, (UserProfile(user=user, role='jobseeker') for user in users), batch_size)
+    _batched(Profile, (
+        Profile(user=user, location=rng.choice(LOCATIONS), bio='Looking for my next role.')
+        for user in users
+    ), batch_size)
+
+    jobs = _batched(
+        Job, generate_jobs(counts['jobs'], admin, rng, inactive_ratio=0.1, featured_ratio=0.02), batch_size
+    )
+
+    pairs = set()
+    target = min(counts['applications'], len(jobs) * len(users))
+    while len(pairs) < target:
+        pairs.add((rng.randrange(len(jobs)), rng.randrange(len(users))))
+    statuses = [status for status, _ in JobApplication.STATUS_CHOICES]
+    _batched(JobApplication, (
+        JobApplication(
+            job=jobs[job],
+            user=users[user],
+            full_name=users[user].get_full_name(),
+            email=users[user].email,
+            phone='98' + ''.join(rng.choices('0123456789', k=8)),
+            status=rng.choice(statuses),
+            applied_at=now - datetime.timedelta(minutes=rng.randrange(90 * 24 * 60)),
+        )
+        for job, user in sorted(pairs)
+    ), batch_size)
+
+    _batched(Testimonial, (
+        Testimonial(
+            user=user,
+            designation=rng.choice(DESIGNATIONS),
+            message='This portal helped me find a great job.',
+            is_approved=rng.random() < 0.7,
+        )
+        for user in users[:counts['testimonials']]
+    ), batch_size)
+
+    _batched(ContactMessage, (
+        ContactMessage(
+            name=f'Visitor {i}',
+            email=f'visitor{i}@example.com',
+            message='I have a question about a posting.',
+        )
+        for i in range(counts['messages'])
+    ), batch_size)
+
+    search.rebuild_index()
+    similarity.rebuild()
+    stats.rebuild()
+
+    seeker = (
+        User.objects.filter(jobapplication__isnull=False, is_staff=False)
+        .order_by('id').first()
+    ) or users[0]
+    return {'admin': admin, 'seeker': seeker}
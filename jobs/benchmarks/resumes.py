@@ -0,0 +1,85 @@
+"""
+Sample resume PDFs for the resume pipeline benchmark and tests.
+
+``make_pdf`` writes a minimal but valid PDF (Helvetica text in
+Flate-compressed content streams, like most exported resumes) without
+any PDF library.
+"""
+import zlib
+
+from .data import DESIGNATIONS, FIRST_NAMES, LAST_NAMES, LOCATIONS, SKILLS
+
+LINES_PER_PAGE = 50
+
+EXTRA_SKILLS = ['React.js', 'Node.js', 'C++', 'PostgreSQL', 'Kubernetes', 'machine learning', 'Tally', 'SEO']
+DUTIES = [
+    'Built and maintained {skill} services used by {count} customers.',
+    'Led a team of {count} working with {skill} and {other}.',
+    'Cut reporting time by {count}% by automating {skill} workflows.',
+    'Trained {count} new colleagues in {skill} and {other}.',
+]
+
+
+def _escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(lines):
+    """PDF bytes showing ``lines`` of text, ``LINES_PER_PAGE`` to a page."""
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    font = 3 + 2 * len(pages)
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % (3 + 2 * i) for i in range(len(pages))), len(pages)
+        ),
+    ]
+    for i, page in enumerate(pages):
+        content = ['BT', '/F1 11 Tf', '14 TL', '50 770 Td']
+        content += [f'({_escape(line)}) Tj T*' for line in page]
+        content.append('ET')
+        stream = zlib.compress('\n'.join(content).encode('latin-1', 'replace'))
+        objects += [
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            b'/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>' % (font, 4 + 2 * i),
+            b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream),
+        ]
+    objects.append(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def generate_resume(rng, jobs=4):
+    """The lines of a made-up resume."""
+    skills = rng.sample(SKILLS + EXTRA_SKILLS, 6)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [
+        name,
+        f"{rng.choice(DESIGNATIONS)} - {rng.choice(LOCATIONS)}",
+        f"{name.split()[0].lower()}@example.com | +977 98{rng.randrange(10**8):08d}",
+        '',
+        'Summary',
+        f"{rng.choice(DESIGNATIONS)} with {rng.randrange(1, 15)} years of experience in {skills[0]} and {skills[1]}.",
+        '',
+        'Skills',
+        ', '.join(skills),
+        '',
+        'Experience',
+    ]
+    for _ in range(jobs):
+        lines.append(f"{rng.choice(DESIGNATIONS)}, {rng.choice(['Himalayan Tech', 'Everest Bank', 'Lumbini Soft'])}")
+        for _ in range(rng.randrange(3, 7)):
+            skill, other = rng.sample(skills, 2)
+            lines.append('- ' + rng.choice(DUTIES).format(skill=skill, other=other, count=rng.randrange(2, 90)))
+        lines.append('')
+    lines += ['Education', f"BSc, Tribhuvan University, {rng.randrange(2000, 2024)}"]
+    return lines
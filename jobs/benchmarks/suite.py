@@ -0,0 +1,151 @@
+import itertools
+import platform
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from jobs import metrics
+from jobs.models import Job
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class Scenario:
+    def __init__(self, name, url, client, method='get', data=None):
+        self.name = name
+        # ``url`` is a string or a callable taking the iteration number.
+        self.url = url
+        self.client = client
+        self.method = method
+        self.data = data
+
+    def request(self, iteration):
+        url = self.url(iteration) if callable(self.url) else self.url
+        response = getattr(self.client, self.method)(url, self.data or {})
+        if response.status_code not in (200, 302):
+            raise BenchmarkError(f"{self.name}: {url} returned {response.status_code}")
+        return response
+
+
+def build_scenarios(fixtures):
+    anonymous = Client()
+    seeker = Client()
+    seeker.force_login(fixtures['seeker'])
+    admin = Client()
+    admin.force_login(fixtures['admin'])
+
+    # A fresh job seeker applies to a different job on every iteration.
+    applicant = User.objects.create_user(username='bench-applicant@example.com')
+    applicant_client = Client()
+    applicant_client.force_login(applicant)
+    open_jobs = list(Job.objects.filter(is_active=True).order_by('id').values_list('id', flat=True))
+
+    job_id = open_jobs[0]
+    return [
+        Scenario('home', reverse('home'), anonymous),
+        Scenario('job_list', reverse('job_list'), anonymous),
+        Scenario('job_list ?q', reverse('job_list') + '?q=developer', anonymous),
+        Scenario('job_list ?location', reverse('job_list') + '?location=kathmandu', anonymous),
+        Scenario('job_list ?q&location', reverse('job_list') + '?q=python&location=remote', anonymous),
+        Scenario('job_list ?type&salary', reverse('job_list') + '?job_type=FT&salary_from=60000&salary_to=90000', anonymous),
+        Scenario('job_detail', reverse('job_detail', args=[job_id]), anonymous),
+        Scenario('home (signed in)', reverse('home'), seeker),
+        Scenario('job_list (signed in)', reverse('job_list'), seeker),
+        Scenario('job_list (for you)', reverse('job_list') + '?sort=for_you', seeker),
+        Scenario(
+            'apply_job',
+            lambda i: reverse('apply_job', args=[open_jobs[i % len(open_jobs)]]),
+            applicant_client,
+            method='post',
+            data={'full_name': 'Bench Applicant', 'email': 'applicant@example.com', 'phone': '9800000000'},
+        ),
+        Scenario('my_jobs', reverse('my_jobs'), seeker),
+        Scenario('admin_dashboard', reverse('admin_dashboard'), admin),
+        Scenario('admin_jobs', reverse('admin_jobs'), admin),
+        Scenario('admin_applications', reverse('admin_applications'), admin),
+        Scenario('admin_users', reverse('admin_users'), admin),
+        Scenario('admin_messages', reverse('admin_messages'), admin),
+        Scenario('admin_testimonials', reverse('admin_testimonials'), admin),
+        Scenario('admin_testimonials ?pending', reverse('admin_testimonials') + '?status=pending', admin),
+    ]
+
+
+def run_scenario(scenario, repeat, warmup=2, memory_runs=3):
+    """
+    Time ``repeat`` requests after ``warmup`` untimed ones, then measure
+    peak Python memory over ``memory_runs`` more (tracemalloc slows
+    requests down, so it stays out of the timed runs).
+    """
+    counter = itertools.count()
+    for _ in range(warmup):
+        scenario.request(next(counter))
+
+    timings, queries = [], []
+    for _ in range(repeat):
+        recorder = metrics.Recorder()
+        with connection.execute_wrapper(recorder):
+            started = time.perf_counter()
+            scenario.request(next(counter))
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(recorder.queries)
+
+    tracemalloc.start()
+    try:
+        for _ in range(memory_runs):
+            scenario.request(next(counter))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'p50_ms': round(metrics.percentile(timings, 0.5), 2),
+        'p95_ms': round(metrics.percentile(timings, 0.95), 2),
+        'p99_ms': round(metrics.percentile(timings, 0.99), 2),
+        'mean_ms': round(sum(timings) / len(timings), 2),
+        'queries': max(queries),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run(fixtures, repeat=30, warmup=2, only=None):
+    results = {}
+    for scenario in build_scenarios(fixtures):
+        if only and scenario.name not in only:
+            continue
+        results[scenario.name] = run_scenario(scenario, repeat, warmup)
+    return results
+
+
+def environment(counts):
+    return {
+        'counts': counts,
+        'database': connection.vendor,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+    }
+
+
+def compare(results, baseline, tolerance=0.25, min_delta_ms=2.0):
+    """
+    Regressions of ``results`` against ``baseline['results']``: a median
+    latency more than ``tolerance`` and ``min_delta_ms`` above the
+    baseline, or more queries. The median and the absolute floor keep
+    run-to-run noise on millisecond-scale views from failing CI.
+    """
+    problems = []
+    for name, before in baseline.get('results', {}).items():
+        now = results.get(name)
+        if now is None:
+            continue
+        slower = now['p50_ms'] - before['p50_ms']
+        if slower > before['p50_ms'] * tolerance and slower > min_delta_ms:
+            problems.append(f"{name}: p50 {now['p50_ms']} ms, baseline {before['p50_ms']} ms")
+        if now['queries'] > before['queries']:
+            problems.append(f"{name}: {now['queries']} queries, baseline {before['queries']}")
+    return problems
@@ -0,0 +1,64 @@
+"""
+Bulk changes from the staff dashboard, the Django admin and imports.
+
+``update()`` applies a change with one ``UPDATE ... WHERE`` statement and
+``create()`` inserts with ``bulk_create``, so no ``save()`` runs and no
+per-row signals fire. Each sends one batched signal instead
+(``objects_updated`` with the previous values of the changed fields
+grouped and counted, ``objects_created`` with the new rows), and the
+receivers in ``jobs.signals`` adjust counters, caches and the search
+index from that.
+"""
+from django.db import transaction
+from django.db.models import Count
+from django.dispatch import Signal
+
+# Sent with sender=<model>, values={field: new value} and
+# previous=[({field: old value}, row count), ...] for the rows that changed;
+# the dicts also hold the model's GROUP_BY fields.
+objects_updated = Signal()
+# Sent with sender=<model> and objects=[saved instances with their pks].
+objects_created = Signal()
+
+# Fields, per model, that ``previous`` is also grouped by, so receivers can
+# tell where the changed rows belong (an application's job, for counters).
+GROUP_BY = {
+    'jobs.JobApplication': ('job_id',),
+}
+
+
+def update(queryset, **values):
+    """Set ``values`` on every row of ``queryset``. Returns the number of rows changed."""
+    model = queryset.model
+    fields = list(values)
+    group_by = fields + [field for field in GROUP_BY.get(model._meta.label, ()) if field not in fields]
+    # Rows that already hold every value are left alone and not reported.
+    changing = model._base_manager.filter(pk__in=queryset.exclude(**values).values('pk'))
+
+    with transaction.atomic():
+        previous = [
+            ({field: row[field] for field in group_by}, row['rows'])
+            for row in changing.values(*group_by).annotate(rows=Count('pk')).order_by()
+        ]
+        if not previous:
+            return 0
+        updated = changing.update(**values)
+        objects_updated.send(sender=model, values=values, previous=previous)
+    return updated
+
+
+def create(model, objects, batch_size=None):
+    """``bulk_create`` ``objects`` and send ``objects_created``, in one transaction."""
+    with transaction.atomic():
+        created = model.objects.bulk_create(objects, batch_size=batch_size)
+        if created:
+            objects_created.send(sender=model, objects=created)
+    return created
+
+
+def ids_from(data, key='ids'):
+    """Integer ids posted as ``key`` (repeated or comma separated); junk is ignored."""
+    ids = []
+    for value in data.getlist(key):
+        ids += [int(part) for part in value.split(',') if part.strip().isdigit()]
+    return ids
@@ -1,7 +1,10 @@
-from .models import Profile
+from django.utils.functional import SimpleLazyObject
+
+from .profiles import get_profile
+
 
 def user_profile(request):
     if request.user.is_authenticated:
-        profile, _ = Profile.objects.get_or_create(user=request.user)
-        return {'profile': profile}
+        # Only resolved if the template actually uses ``profile``.
+        return {'profile': SimpleLazyObject(lambda: get_profile(request.user))}
     return {}
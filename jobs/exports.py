@@ -0,0 +1,149 @@
+"""
+Streaming exports of applications, users and contact messages.
+
+Rows are read in id order with ``iterator(chunk_size=...)`` (a server-side
+cursor on PostgreSQL) and encoded one at a time, so memory stays flat
+however many rows there are. Because the order is by id, an interrupted
+export is resumed by passing the last id it wrote as ``after``.
+"""
+import csv
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_date
+
+from .models import ContactMessage, JobApplication
+
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+class InvalidExport(ValueError):
+    pass
+
+
+class Dataset:
+    def __init__(self, model, fields, date_field, filters=None):
+        self.model = model
+        self.fields = fields
+        self.date_field = date_field
+        # {param: lookup} for the extra filters the dataset accepts.
+        self.filters = filters or {}
+
+    def queryset(self, params):
+        """
+        Rows matching ``params`` (``since``/``until`` dates, ``after`` id and
+        the dataset's own filters), ordered by id. ``params`` is any mapping
+        with ``get``, such as ``request.GET`` or the command's options.
+        """
+        queryset = self.model._default_manager.order_by('pk')
+        lookups = {}
+        for param, lookup in self.filters.items():
+            if params.get(param):
+                lookups[lookup] = params.get(param)
+
+        for param, lookup in (('since', 'gte'), ('until', 'lte')):
+            if params.get(param):
+                day = parse_date(str(params.get(param)))
+                if day is None:
+                    raise InvalidExport(f"{param} must be a date (YYYY-MM-DD).")
+                lookups[f'{self.date_field}__date__{lookup}'] = day
+
+        after = params.get('after')
+        if after:
+            if not str(after).isdigit():
+                raise InvalidExport("after must be an id.")
+            lookups['pk__gt'] = int(after)
+
+        try:
+            return queryset.filter(**lookups)
+        except (ValueError, ValidationError) as e:
+            raise InvalidExport(str(e)) from e
+
+    def rows(self, queryset, chunk_size=None):
+        chunk_size = chunk_size or getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+        for row in queryset.values_list(*self.fields).iterator(chunk_size=chunk_size):
+            yield [plain(value) for value in row]
+
+
+DATASETS = {
+    'applications': Dataset(
+        JobApplication,
+        (
+            'id', 'job_id', 'job__title', 'job__company_name', 'user_id', 'full_name',
+            'email', 'phone', 'status', 'applied_at', 'photo', 'resume',
+        ),
+        'applied_at',
+        {'job': 'job_id', 'status': 'status'},
+    ),
+    'users': Dataset(
+        User,
+        (
+            'id', 'username', 'email', 'first_name', 'last_name', 'userprofile__role',
+            'is_active', 'is_staff', 'date_joined', 'last_login',
+        ),
+        'date_joined',
+        {'is_active': 'is_active'},
+    ),
+    'messages': Dataset(
+        ContactMessage,
+        ('id', 'name', 'email', 'phone', 'message', 'created_at'),
+        'created_at',
+    ),
+}
+
+
+def get_dataset(name):
+    try:
+        return DATASETS[name]
+    except KeyError:
+        raise InvalidExport(f"Unknown export {name!r}; choose from {', '.join(DATASETS)}.")
+
+
+def plain(value):
+    # Cloudinary fields come back as resources; export their URL.
+    if hasattr(value, 'build_url'):
+        return value.url
+    return value
+
+
+# Leading characters that make spreadsheet apps read a cell as a formula.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def csv_cell(value):
+    """``value``, with a ``'`` in front of text a spreadsheet would evaluate."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(fields, rows, header=True):
+    writer = csv.writer(_Echo())
+    if header:
+        yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([csv_cell(value) for value in row])
+
+
+def jsonl_lines(fields, rows, header=True):
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def export_lines(dataset, queryset, fmt, header=True, chunk_size=None):
+    """Encoded lines of ``queryset`` in ``fmt`` ('csv' or 'jsonl')."""
+    if fmt not in FORMATS:
+        raise InvalidExport(f"Unknown format {fmt!r}; choose from {', '.join(FORMATS)}.")
+    encode = csv_lines if fmt == 'csv' else jsonl_lines
+    return encode(dataset.fields, dataset.rows(queryset, chunk_size), header=header)
@@ -0,0 +1,151 @@
+"""
+Facet counts for the ``job_list`` filters.
+
+Counts come from one ``GROUP BY job_type, location, featured`` query over
+a job queryset, folded into per-facet counts in Python. The base counts,
+over every active job, are cached until ``jobs.signals`` sees a job
+change, so a plain job list costs no query; a filtered list runs the
+same single query over its own result set. (Conditional ``COUNT``
+expressions per facet value need no Python fold, but the ORM took longer
+compiling them than the database took to run them.) Locations are free
+text, so only the ``LOCATION_LIMIT`` most common ones are offered.
+"""
+from django.core.cache import cache
+from django.db.models import Count
+
+from . import routers
+from .models import Job
+
+BASE_KEY = 'job_facets:base'
+# Upper bound on staleness for changes that are not signalled, such as
+# raw SQL updates.
+BASE_TIMEOUT = 60 * 60
+LOCATION_LIMIT = 10
+
+
+def invalidate():
+    cache.delete(BASE_KEY)
+    routers.hold_reads_on_primary(BASE_KEY)
+
+
+def _rows(queryset):
+    return (
+        queryset.order_by()
+        .values_list('job_type', 'location', 'featured')
+        .annotate(count=Count('pk'))
+    )
+
+
+def _fold(rows):
+    total, job_types, locations, featured = 0, {}, {}, 0
+    for job_type, location, is_featured, n in rows:
+        total += n
+        job_types[job_type] = job_types.get(job_type, 0) + n
+        locations[location] = locations.get(location, 0) + n
+        if is_featured:
+            featured += n
+    return {
+        'total': total,
+        'job_type': {value: job_types[value] for value, _ in Job.JOB_TYPE_CHOICES if value in job_types},
+        'location': locations,
+        'featured': featured,
+    }
+
+
+def count(queryset):
+    """``{'total': n, 'job_type': {value: n}, 'location': {value: n}, 'featured': n}`` over ``queryset``."""
+    return _fold(_rows(queryset))
+
+
+async def acount(queryset):
+    return _fold([row async for row in _rows(queryset)])
+
+
+def _top_locations(counts):
+    top = sorted(counts['location'].items(), key=lambda item: (-item[1], item[0]))[:LOCATION_LIMIT]
+    counts['location'] = dict(top)
+    return counts
+
+
+def _active_jobs():
+    return Job.objects.filter(is_active=True)
+
+
+def base_counts():
+    """Counts over all active jobs, with only the most common locations; cached."""
+    counts = cache.get(BASE_KEY)
+    if counts is None:
+        with routers.primary_reads(routers.held(BASE_KEY)):
+            counts = _top_locations(count(_active_jobs()))
+        cache.set(BASE_KEY, counts, BASE_TIMEOUT)
+    return counts
+
+
+async def abase_counts():
+    counts = await cache.aget(BASE_KEY)
+    if counts is None:
+        with routers.primary_reads(await routers.aheld(BASE_KEY)):
+            counts = _top_locations(await acount(_active_jobs()))
+        await cache.aset(BASE_KEY, counts, BASE_TIMEOUT)
+    return counts
+
+
+def _limit_locations(counts, base):
+    counts['location'] = {value: counts['location'].get(value, 0) for value in base['location']}
+    return counts
+
+
+def filtered_counts(queryset, base):
+    """Counts over ``queryset`` for the locations offered by ``base``."""
+    return _limit_locations(count(queryset), base)
+
+
+def _option(params, name, value, label, count, selected):
+    # Each link toggles its value and drops the page cursor.
+    params = params.copy()
+    params.pop('cursor', None)
+    if selected:
+        params.pop(name, None)
+    else:
+        params[name] = value
+    return {'label': label, 'count': count, 'url': f'?{params.urlencode()}', 'selected': selected}
+
+
+def build(params, queryset, filtered):
+    """
+    Facet groups for the template, ``[(title, [{'label', 'count', 'url',
+    'selected'}, ...]), ...]``, for the request's query dict ``params``.
+    Only a ``filtered`` list counts ``queryset`` itself.
+    """
+    counts = base_counts()
+    if filtered:
+        counts = filtered_counts(queryset, counts)
+    return _groups(params, counts)
+
+
+async def abuild(params, queryset, filtered):
+    """``build`` for async views."""
+    counts = await abase_counts()
+    if filtered:
+        counts = _limit_locations(await acount(queryset), counts)
+    return _groups(params, counts)
+
+
+def _groups(params, counts):
+    labels = dict(Job.JOB_TYPE_CHOICES)
+    job_type = params.get('job_type', '')
+    location = ' '.join(params.get('location', '').split()).lower()
+    featured = bool(params.get('featured'))
+    return [
+        ('Job type', [
+            _option(params, 'job_type', value, labels[value], count, job_type == value)
+            for value, count in counts['job_type'].items()
+        ]),
+        ('Location', [
+            _option(params, 'location', value, value, count, location == value.lower())
+            for value, count in counts['location'].items()
+        ]),
+        ('Featured', [
+            _option(params, 'featured', '1', 'Featured jobs', counts['featured'], featured),
+        ]),
+    ]
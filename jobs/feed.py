@@ -0,0 +1,88 @@
+"""
+"For you" ranking of ``job_list`` for signed-in job seekers.
+
+A user's taste is a vector in the hashed term space of ``jobs.similarity``:
+the vectors of the jobs they applied to, recent applications counting
+more, plus their ``Profile`` bio and location. Every active job is scored
+against it with one matrix-vector product over the worker's cached
+``similarity.Index``, and the ids of the best ``FEED_SIZE`` jobs not yet
+applied to are cached per user.
+
+The cached feed records the ``similarity.listing_version`` it was ranked
+against, so it is recomputed on the next visit after jobs are posted,
+approved or closed. Edits to a job's text reach feeds when they expire
+(``FEED_TIMEOUT``) rather than throwing every user's feed away.
+``jobs.signals`` drops it when the user applies or edits their profile.
+"""
+import numpy as np
+from django.core.cache import cache
+
+from . import similarity
+from .models import JobApplication, JobVector, Profile
+
+FOR_YOU = 'for_you'
+
+FEED_SIZE = 500
+# Also how long an edit to a job's text can take to reach a cached feed.
+FEED_TIMEOUT = 60 * 60
+# Most recent applications that shape the feed; each one counts
+# HISTORY_DECAY times as much as the one after it.
+HISTORY = 50
+HISTORY_DECAY = 0.9
+PROFILE_WEIGHT = 0.5
+
+# Ranking every active job for one user, checked by bench_feed.
+RANK_BUDGET_MS = 50
+
+
+def feed_cache_key(user_id):
+    return f'jobs:feed:{user_id}'
+
+
+def _unit(vector):
+    length = np.linalg.norm(vector)
+    return vector / length if length else vector
+
+
+def user_vector(history, bio='', location=''):
+    """``history`` holds the raw vectors of applied jobs, most recent first."""
+    vector = np.zeros(similarity.DIMENSIONS, dtype=np.float32)
+    for age, job_vector in enumerate(history):
+        vector += HISTORY_DECAY ** age * _unit(job_vector)
+    profile = similarity.vectorize_fields({'description': bio, 'location': location})
+    return _unit(vector) + PROFILE_WEIGHT * _unit(profile)
+
+
+def rank(index, vector, exclude=(), k=FEED_SIZE):
+    """``[(job id, score)]`` for the ``k`` jobs in ``index`` closest to ``vector``."""
+    scores = index.scores(vector)
+    rows = [index.rows[job_id] for job_id in exclude if job_id in index.rows]
+    scores[rows] = -np.inf
+    return index.top(scores, k)
+
+
+def compute_feed(user):
+    applied = list(
+        JobApplication.objects.filter(user=user).order_by('-applied_at').values_list('job_id', flat=True)
+    )
+    recent = applied[:HISTORY]
+    vectors = dict(JobVector.objects.filter(job_id__in=recent).values_list('job_id', 'vector'))
+    history = [similarity.from_bytes(vectors[job_id]) for job_id in recent if job_id in vectors]
+    bio, location = Profile.objects.filter(user=user).values_list('bio', 'location').first() or ('', '')
+    return rank(similarity.get_index(), user_vector(history, bio, location), exclude=applied)
+
+
+def get_feed(user):
+    """Ids of the jobs recommended to ``user``, best first; empty with nothing to go on."""
+    version = similarity.listing_version()
+    key = feed_cache_key(user.pk)
+    cached = cache.get(key)
+    if cached is not None and cached['version'] == version:
+        return cached['ids']
+    ids = [job_id for job_id, _ in compute_feed(user)]
+    cache.set(key, {'version': version, 'ids': ids}, FEED_TIMEOUT)
+    return ids
+
+
+def invalidate(*user_ids):
+    cache.delete_many([feed_cache_key(user_id) for user_id in user_ids])
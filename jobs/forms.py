@@ -3,6 +3,7 @@ from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm, PasswordChangeForm
 from .models import Profile, JobApplication, Job
 from .models import Testimonial
+from .salaries import DEFAULT_CURRENCY, DEFAULT_PERIOD
 
 
 class RegisterForm(UserCreationForm):
@@ -108,7 +109,11 @@ class JobCreateForm(forms.ModelForm):
             "company_name",
             "location",
             "job_type",
-            "salary",
+            "salary_min",
+            "salary_max",
+            "salary_currency",
+            "salary_period",
+            "salary_note",
             "description",
             "requirements",
             "featured",
@@ -119,12 +124,69 @@ class JobCreateForm(forms.ModelForm):
             "requirements": forms.Textarea(attrs={'placeholder': 'Enter company name', 'class': 'w-full border rounded px-3 py-2'}),
             'location': forms.TextInput(attrs={'placeholder': 'Enter job location', 'class': 'w-full border rounded px-3 py-2'}),
             'job_type': forms.Select(attrs={'class': 'w-full border rounded px-3 py-2'}),
-            'salary': forms.NumberInput(attrs={'placeholder': 'Enter salary', 'class': 'w-full border rounded px-3 py-2'}),
+            'salary_min': forms.NumberInput(attrs={'placeholder': 'Minimum salary', 'class': 'w-full border rounded px-3 py-2'}),
+            'salary_max': forms.NumberInput(attrs={'placeholder': 'Maximum salary (blank for a fixed salary)', 'class': 'w-full border rounded px-3 py-2'}),
+            'salary_currency': forms.Select(attrs={'class': 'w-full border rounded px-3 py-2'}),
+            'salary_period': forms.Select(attrs={'class': 'w-full border rounded px-3 py-2'}),
+            'salary_note': forms.TextInput(attrs={'placeholder': 'e.g. Negotiable (shown when no salary is given)', 'class': 'w-full border rounded px-3 py-2'}),
             'requirements': forms.Textarea(attrs={'placeholder': 'Enter job requirements', 'class': 'w-full border rounded px-3 py-2', 'rows': 4}),
             'company_name': forms.TextInput(attrs={'placeholder': 'Enter company name', 'class': 'w-full border rounded px-3 py-2'}),
             'title': forms.TextInput(attrs={'placeholder': 'Enter company name', 'class': 'w-full border rounded px-3 py-2'}),
         }
 
+class JobFilterForm(forms.Form):
+    # job_list writes these inputs by hand, like its search box: rendering
+    # the form widgets added over a millisecond to every page.
+    job_type = forms.ChoiceField(choices=Job.JOB_TYPE_CHOICES, required=False)
+    salary_from = forms.IntegerField(min_value=0, required=False)
+    salary_to = forms.IntegerField(min_value=0, required=False)
+    salary_currency = forms.ChoiceField(choices=Job.CURRENCY_CHOICES, required=False)
+    salary_period = forms.ChoiceField(choices=Job.SALARY_PERIOD_CHOICES, required=False)
+    featured = forms.BooleanField(required=False)
+
+    def clean(self):
+        data = super().clean()
+        # Amounts only compare within one currency and period: a range
+        # without them means the site's defaults (NPR a month).
+        if data.get('salary_from') is not None or data.get('salary_to') is not None:
+            data['salary_currency'] = data.get('salary_currency') or DEFAULT_CURRENCY
+            data['salary_period'] = data.get('salary_period') or DEFAULT_PERIOD
+        return data
+
+    def filter(self, jobs):
+        """
+        Narrow ``jobs`` by the filters that are valid; invalid values are
+        ignored. A salary range matches jobs in its currency and period
+        whose own range overlaps it, as two comparisons on the indexed
+        bounds; jobs without a salary drop out once a range is given.
+        """
+        self.is_valid()
+        data = self.cleaned_data
+        if data.get('job_type'):
+            jobs = jobs.filter(job_type=data['job_type'])
+        if data.get('salary_from') is not None:
+            jobs = jobs.filter(salary_max__gte=data['salary_from'])
+        if data.get('salary_to') is not None:
+            jobs = jobs.filter(salary_min__lte=data['salary_to'])
+        if data.get('salary_currency'):
+            jobs = jobs.filter(salary_currency=data['salary_currency'])
+        if data.get('salary_period'):
+            jobs = jobs.filter(salary_period=data['salary_period'])
+        if data.get('featured'):
+            jobs = jobs.filter(featured=True)
+        return jobs
+
+class JobImportForm(forms.Form):
+    file = forms.FileField(
+        help_text="CSV with a header row, or JSON Lines; columns as on the create job form.",
+        widget=forms.ClearableFileInput(attrs={'accept': '.csv,.jsonl,.ndjson,.json', 'class': 'w-full border rounded px-3 py-2'}),
+    )
+    format = forms.ChoiceField(
+        choices=[('', 'From file name'), ('csv', 'CSV'), ('jsonl', 'JSON Lines')],
+        required=False,
+        widget=forms.Select(attrs={'class': 'w-full border rounded px-3 py-2'}),
+    )
+
 class CustomPasswordChangeForm(PasswordChangeForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -0,0 +1,24 @@
+"""
+Template fragment caching for the home page.
+
+``home.html`` wraps its featured-jobs and testimonials blocks in
+``{% cache %}`` tags named below; ``jobs.signals`` deletes them when the
+underlying rows change. For a short while after that the views render
+them from the primary (see ``jobs.routers``).
+"""
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from . import routers
+
+HOME_FEATURED_JOBS = 'home_featured_jobs'
+HOME_TESTIMONIALS = 'home_testimonials'
+
+# Upper bound on staleness for changes that are not signalled, such as a
+# testimonial author renaming themselves.
+FRAGMENT_TIMEOUT = 60 * 15
+
+
+def invalidate(*fragment_names):
+    cache.delete_many([make_template_fragment_key(name) for name in fragment_names])
+    routers.hold_reads_on_primary(*fragment_names)
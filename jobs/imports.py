@@ -0,0 +1,197 @@
+"""
+Bulk job import from CSV or JSON Lines.
+
+Rows are read one at a time and validated with ``JobCreateForm``'s rules,
+the same as the staff create page, in chunks of ``chunk_size``. The
+valid rows of each chunk are written with one ``bulk_create`` in their
+own transaction. Invalid rows are reported by line number and skipped,
+so one bad row never aborts the file and memory stays bounded by the
+chunk size.
+"""
+import csv
+import io
+import itertools
+import json
+import time
+
+from django.core.exceptions import ValidationError
+
+from . import bulk
+from .forms import JobCreateForm
+from .models import Job
+from .salaries import parse_salary
+
+FORMATS = ('csv', 'jsonl')
+FIELDS = JobCreateForm._meta.fields
+BOOLEAN_FIELDS = ('featured', 'is_active')
+TRUE_VALUES = ('1', 'true', 't', 'yes', 'y', 'on')
+
+
+class ImportResult:
+    def __init__(self, max_errors=1000):
+        self.rows = 0
+        self.created = 0
+        self.failed = 0
+        # (line number, {field: [messages]}); only the first max_errors are kept.
+        self.errors = []
+        self.max_errors = max_errors
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line, errors))
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0
+
+
+def guess_format(name):
+    return 'jsonl' if name.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def text_stream(fileobj):
+    """A text view of a binary file or upload, decoded as UTF-8 (with or without BOM)."""
+    return io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+
+
+def undecodable(error):
+    return f"Not UTF-8 text ({error.reason}); the rest of the file was not read."
+
+
+def read_rows(stream, fmt):
+    """
+    Yield ``(line number, row dict or error message)`` from a text stream.
+
+    Malformed CSV is reported against the row it was found in and reading
+    goes on; bytes that are not UTF-8 end the file with one error, as
+    nothing after them can be trusted.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield reader.line_num, f"Malformed CSV: {e}"
+                continue
+            except UnicodeDecodeError as e:
+                yield reader.line_num + 1, undecodable(e)
+                return
+            yield reader.line_num, row
+
+    line_number = 0
+    lines = iter(stream)
+    while True:
+        try:
+            line = next(lines)
+        except StopIteration:
+            return
+        except UnicodeDecodeError as e:
+            yield line_number + 1, undecodable(e)
+            return
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, "Each line must be a JSON object."
+            continue
+        yield line_number, row
+
+
+def form_data(row):
+    # Files written before salaries were structured have one free-text column;
+    # text without an amount ("Negotiable") is kept as the salary note.
+    if row.get('salary') and not (row.get('salary_min') or row.get('salary_max')):
+        text = str(row['salary']).strip()
+        row = {**row, **(parse_salary(text) or {'salary_note': row.get('salary_note') or text})}
+    data = {}
+    for name in FIELDS:
+        value = row.get(name)
+        field = Job._meta.get_field(name)
+        if (value is None or value == '') and field.has_default():
+            value = field.default
+        elif name in BOOLEAN_FIELDS and not isinstance(value, bool):
+            value = str(value).strip().lower() in TRUE_VALUES
+        elif value is not None:
+            value = str(value).strip()
+        data[name] = value
+    return data
+
+
+class RowValidator:
+    """
+    ``JobCreateForm``'s rules for many rows: every form field's ``clean()``
+    and then the model's ``full_clean()``, as a bound ModelForm would run
+    them, but with one set of field objects instead of a deep copy per row.
+    """
+
+    def __init__(self, posted_by):
+        self.fields = JobCreateForm().fields
+        self.posted_by = posted_by
+
+    def build_job(self, row):
+        """A validated, unsaved ``Job`` and no errors, or None and ``{field: [messages]}``."""
+        data = form_data(row)
+        cleaned, errors = {}, {}
+        for name, field in self.fields.items():
+            try:
+                cleaned[name] = field.clean(field.widget.value_from_datadict(data, {}, name))
+            except ValidationError as e:
+                errors[name] = e.messages
+        if errors:
+            return None, errors
+
+        job = Job(posted_by=self.posted_by, **cleaned)
+        try:
+            job.full_clean(validate_unique=False)
+        except ValidationError as e:
+            return None, e.message_dict
+        return job, None
+
+
+def import_jobs(stream, fmt, posted_by, chunk_size=1000, max_errors=1000, progress=None):
+    """
+    Import every row of ``stream`` (text, ``fmt`` 'csv' or 'jsonl') as jobs
+    posted by ``posted_by``. ``progress(result)`` is called after each chunk.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; choose from {', '.join(FORMATS)}.")
+
+    result = ImportResult(max_errors)
+    validator = RowValidator(posted_by)
+    rows = read_rows(stream, fmt)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        jobs = []
+        for line_number, row in chunk:
+            result.rows += 1
+            if isinstance(row, str):
+                result.add_error(line_number, {'__all__': [row]})
+                continue
+            job, errors = validator.build_job(row)
+            if errors:
+                result.add_error(line_number, errors)
+            else:
+                jobs.append(job)
+
+        if jobs:
+            result.created += len(bulk.create(Job, jobs))
+        result.elapsed = time.perf_counter() - result.started
+        if progress:
+            progress(result)
+
+    result.elapsed = time.perf_counter() - result.started
+    return result
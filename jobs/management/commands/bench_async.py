@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from jobs.benchmarks import concurrency, data
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput of the public read paths (home, job_list, "
+        "job_detail, my_jobs) as sync views under WSGI and as async views "
+        "under ASGI, with many clients at once. Runs against a throwaway "
+        "test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(data.SCALES), default='small')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--requests', type=int, default=600, help="Requests per mode.")
+        parser.add_argument('--concurrency', type=int, default=64, help="Clients sending at once.")
+        parser.add_argument('--threads', type=int, default=8, help="WSGI server threads.")
+        parser.add_argument(
+            '--db-latency-ms', type=float, default=2.0,
+            help="Simulated database round trip added to every query.",
+        )
+        parser.add_argument('--modes', nargs='+', choices=concurrency.MODES, default=list(concurrency.MODES))
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # Anonymous pages would all be served by the page cache.
+            with override_settings(PAGE_CACHE_ENABLED=False):
+                self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def run(self, options):
+        fixtures = data.seed(data.SCALES[options['scale']], seed=options['seed'])
+        self.stdout.write(
+            f"{options['requests']} requests per mode, {options['concurrency']} concurrent clients, "
+            f"{options['threads']} WSGI threads, {options['db_latency_ms']} ms per query"
+        )
+        results = concurrency.run(
+            fixtures,
+            total=options['requests'],
+            concurrency=options['concurrency'],
+            threads=options['threads'],
+            latency_ms=options['db_latency_ms'],
+            modes=options['modes'],
+        )
+        self.stdout.write(
+            f"\n{'mode':<6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7} {'threads':>8}"
+        )
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<6} {result['rps']:>8.1f} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+                f"{result['errors']:>7} {result['threads']:>8}"
+            )
@@ -0,0 +1,54 @@
+import random
+import time
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import feed, metrics, similarity
+from jobs.benchmarks.data import LOCATIONS, SKILLS, generate_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Time ranking every active job for one user's \"For you\" feed, at "
+        "several catalogue sizes, and fail if the p95 at the largest size "
+        "is over the latency budget. Runs in memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+        parser.add_argument('--users', type=int, default=200, help="Feeds ranked per size.")
+        parser.add_argument('--history', type=int, default=10, help="Applications per user.")
+        parser.add_argument('--budget-ms', type=float, default=feed.RANK_BUDGET_MS)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        poster = User(username='bench@example.com')
+
+        self.stdout.write(f"{'jobs':>9} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for size in sorted(options['sizes']):
+            vectors = np.stack([similarity.vectorize(job) for job in generate_jobs(size, poster, rng)])
+            started = time.perf_counter()
+            index = similarity.Index(np.arange(1, size + 1), vectors)
+            built = time.perf_counter() - started
+
+            timings = []
+            for _ in range(options['users']):
+                applied = rng.sample(range(1, size + 1), min(options['history'], size))
+                bio = f"I work with {', '.join(rng.sample(SKILLS, 3))}."
+                started = time.perf_counter()
+                history = [index.vectors[index.rows[job_id]] for job_id in applied]
+                feed.rank(index, feed.user_vector(history, bio, rng.choice(LOCATIONS)), exclude=applied)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            p95 = metrics.percentile(timings, 0.95)
+            self.stdout.write(
+                f"{size:>9,} {built:>8.2f} {metrics.percentile(timings, 0.5):>8.2f} "
+                f"{p95:>8.2f} {metrics.percentile(timings, 0.99):>8.2f}"
+            )
+
+        if p95 > options['budget_ms']:
+            raise CommandError(f"p95 {p95:.1f} ms at {size:,} jobs is over the {options['budget_ms']} ms budget.")
+        self.stdout.write(self.style.SUCCESS(f"p95 within the {options['budget_ms']} ms budget."))
@@ -0,0 +1,119 @@
+import pathlib
+import random
+import statistics
+import tempfile
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from jobs import resumes, uploads
+from jobs.benchmarks.data import generate_jobs
+from jobs.benchmarks.resumes import generate_resume, make_pdf
+from jobs.models import Job, JobApplication, ResumeText
+
+QUERIES = ['python', 'django aws', 'react.js', 'c++', 'machine learning', 'accounting tally']
+
+
+class SlowUploader(uploads.LocalUploader):
+    """Local files, with a sleep standing in for the fetch from remote storage."""
+
+    def __init__(self, root, latency):
+        super().__init__(root)
+        self.latency = latency
+
+    def download(self, value, field):
+        time.sleep(self.latency)
+        return super().download(value, field)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure resume pipeline throughput (read, extract, normalize, "
+        "index) at several worker counts, on generated sample PDFs or a "
+        "directory of real ones. Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=500, help="Resumes to generate without --corpus.")
+        parser.add_argument('--corpus', help="Directory of *.pdf files to use instead (read recursively).")
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument(
+            '--download-latency-ms', type=float, default=20.0,
+            help="Simulated remote storage round trip added to every download.",
+        )
+        parser.add_argument('--repeat', type=int, default=5, help="Runs of each search query.")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with tempfile.TemporaryDirectory() as root:
+                self.run(options, pathlib.Path(root))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def corpus(self, options):
+        if options['corpus']:
+            files = sorted(pathlib.Path(options['corpus']).rglob('*.pdf'))
+            if not files:
+                raise CommandError(f"No PDF files under {options['corpus']}.")
+            return [path.read_bytes() for path in files]
+        rng = random.Random(options['seed'])
+        return [make_pdf(generate_resume(rng, jobs=rng.randrange(2, 8))) for _ in range(options['count'])]
+
+    def run(self, options, root):
+        pdfs = self.corpus(options)
+        field = JobApplication._meta.get_field('resume')
+        (root / field.resource_type).mkdir()
+        for i, data in enumerate(pdfs):
+            (root / field.resource_type / f'resume{i}.pdf').write_bytes(data)
+
+        poster = User.objects.create_user(username='bench@example.com')
+        job = Job.objects.bulk_create(generate_jobs(1, poster, random.Random(options['seed'])))[0]
+        users = User.objects.bulk_create(User(username=f'applicant{i}@example.com') for i in range(len(pdfs)))
+        JobApplication.objects.bulk_create(
+            JobApplication(
+                job=job, user=user, full_name=user.username, email=user.username, phone='9800000000',
+                resume=f'{field.resource_type}/upload/v1/resume{i}.pdf',
+            )
+            for i, user in enumerate(users)
+        )
+
+        uploader = SlowUploader(str(root), options['download_latency_ms'] / 1000)
+        extractor = resumes.get_extractor()
+        megabytes = sum(len(data) for data in pdfs) / 2**20
+        self.stdout.write(
+            f"{len(pdfs)} resumes, {megabytes:.1f} MB, {options['download_latency_ms']} ms per download, "
+            f"extractor {extractor.name}, index {resumes.get_index().name}"
+        )
+        self.stdout.write(f"\n{'workers':>7} {'seconds':>8} {'resumes/s':>10} {'MB/s':>7} {'done':>6} {'failed':>7}")
+        for workers in options['workers']:
+            ResumeText.objects.all().delete()
+            resumes.rebuild_index()
+            started = time.perf_counter()
+            totals = resumes.run(workers, options['batch_size'], extractor=extractor, uploader=uploader)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{workers:>7} {elapsed:>8.2f} {len(pdfs) / elapsed:>10.1f} {megabytes / elapsed:>7.2f} "
+                f"{totals['done']:>6} {totals['failed']:>7}"
+            )
+
+        started = time.perf_counter()
+        totals = resumes.run(max(options['workers']), options['batch_size'], extractor=extractor, uploader=uploader)
+        self.stdout.write(
+            f"\nIncremental run with nothing new: {sum(totals.values())} read "
+            f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+
+        self.stdout.write("\nSearch")
+        for query in QUERIES:
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                hits = JobApplication.objects.filter(resumes.matching(query)).count()
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(f"  {query!r:<20} {statistics.median(timings):8.2f} ms ({hits} hits)")
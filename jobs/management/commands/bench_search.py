@@ -0,0 +1,72 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from jobs import search
+from jobs.benchmarks.data import generate_jobs
+from jobs.models import Job
+
+QUERIES = [
+    ('python', ''),
+    ('engineer', ''),
+    ('everest', ''),
+    ('developer', 'kathmandu'),
+    ('', 'pokhara'),
+    ('senior react', 'remote'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the icontains job search against the full-text index. "
+        "Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, options):
+        rng = random.Random(options['seed'])
+        poster = User.objects.create_user(username='bench@example.com')
+        backends = [search.LikeBackend(), search.get_backend()]
+
+        seeded = 0
+        for size in sorted(options['sizes']):
+            while seeded < size:
+                batch = min(options['batch_size'], size - seeded)
+                Job.objects.bulk_create(generate_jobs(batch, poster, rng), batch_size=batch)
+                seeded += batch
+
+            started = time.perf_counter()
+            search.rebuild_index()
+            self.stdout.write(
+                f"\n{size:,} jobs (index rebuilt in {time.perf_counter() - started:.2f}s)"
+            )
+
+            for query, location in QUERIES:
+                row = [f"  q={query!r:<16} location={location!r:<12}"]
+                for backend in backends:
+                    timings = []
+                    for _ in range(options['repeat']):
+                        started = time.perf_counter()
+                        jobs = backend.search(Job.objects.filter(is_active=True), query, location)
+                        list(jobs[:20])
+                        total = jobs.count()
+                        timings.append((time.perf_counter() - started) * 1000)
+                    row.append(f"{backend.name}: {statistics.median(timings):8.1f} ms ({total} hits)")
+                self.stdout.write('  '.join(row))
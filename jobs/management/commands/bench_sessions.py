@@ -0,0 +1,83 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+SLIDING = 'jobs.sessions.SlidingSessionMiddleware'
+
+SCENARIOS = [
+    # (label, engine, save every request, sliding refresh)
+    ('before: db, save every request', 'django.contrib.sessions.backends.db', True, False),
+    ('db, sliding refresh', 'django.contrib.sessions.backends.db', False, True),
+    ('cached_db, sliding refresh', 'django.contrib.sessions.backends.cached_db', False, True),
+    ('signed_cookies, sliding refresh', 'django.contrib.sessions.backends.signed_cookies', False, True),
+]
+
+
+def is_session_write(sql):
+    return 'django_session' in sql and sql.lstrip().split(' ', 1)[0] in ('INSERT', 'UPDATE', 'DELETE')
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure django_session writes per second while signed-in users "
+        "browse job_list, for the old save-every-request setup and each "
+        "session backend. Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--requests', type=int, default=500, help="Page views per scenario.")
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def run(self, options):
+        users = [
+            User.objects.create_user(username=f'bench{i}@example.com')
+            for i in range(options['users'])
+        ]
+        url = reverse('job_list')
+
+        self.stdout.write(f"{options['requests']} page views by {len(users)} signed-in users\n")
+        self.stdout.write(f"{'scenario':<34} {'req/s':>8} {'writes':>7} {'writes/s':>9} {'writes/req':>11}")
+        for label, engine, every_request, sliding in SCENARIOS:
+            middleware = [name for name in settings.MIDDLEWARE if name != SLIDING]
+            if sliding:
+                middleware.insert(middleware.index('django.contrib.sessions.middleware.SessionMiddleware') + 1, SLIDING)
+
+            with override_settings(
+                SESSION_ENGINE=engine, SESSION_SAVE_EVERY_REQUEST=every_request, MIDDLEWARE=middleware
+            ):
+                cache.clear()
+                clients = []
+                for user in users:
+                    client = Client()
+                    client.force_login(user)
+                    client.get(url)  # first view after login: one write either way
+                    clients.append(client)
+
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    for i in range(options['requests']):
+                        clients[i % len(clients)].get(url)
+                    elapsed = time.perf_counter() - started
+
+            writes = sum(1 for query in queries if is_session_write(query['sql']))
+            self.stdout.write(
+                f"{label:<34} {options['requests'] / elapsed:8.1f} {writes:7d} "
+                f"{writes / elapsed:9.1f} {writes / options['requests']:11.2f}"
+            )
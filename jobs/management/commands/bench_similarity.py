@@ -0,0 +1,62 @@
+import random
+import time
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from jobs import metrics, similarity
+from jobs.benchmarks.data import generate_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Time vectorizing jobs, building the \"similar jobs\" index and "
+        "ranking against it, at several catalogue sizes. Runs in memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+        parser.add_argument('--repeat', type=int, default=200, help="Similar-jobs queries per size.")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        poster = User(username='bench@example.com')
+
+        self.stdout.write(
+            f"{'jobs':>9} {'vectorize s':>12} {'build s':>8} {'sync ms':>8} {'matrix MB':>10} "
+            f"{'p50 ms':>8} {'p95 ms':>8}"
+        )
+        for size in sorted(options['sizes']):
+            jobs = list(generate_jobs(size, poster, rng))
+
+            started = time.perf_counter()
+            vectors = [similarity.vectorize(job) for job in jobs]
+            vectorized = time.perf_counter() - started
+
+            started = time.perf_counter()
+            index = similarity.Index(np.arange(1, size + 1), np.stack(vectors))
+            built = time.perf_counter() - started
+
+            # A sync after a few saves: some jobs edited, one closed, some new.
+            changed = [
+                (rng.randrange(1, size + 1), vectors[rng.randrange(size)].tobytes(), True) for _ in range(5)
+            ] + [(rng.randrange(1, size + 1), b'', False)] + [
+                (size + i, vectors[rng.randrange(size)].tobytes(), True) for i in range(1, 5)
+            ]
+            started = time.perf_counter()
+            index.updated(changed)
+            synced = (time.perf_counter() - started) * 1000
+
+            timings = []
+            for _ in range(options['repeat']):
+                job_id = rng.randrange(1, size + 1)
+                started = time.perf_counter()
+                index.similar(job_id, similarity.SIMILAR_COUNT * 2)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            self.stdout.write(
+                f"{size:>9,} {vectorized:>12.2f} {built:>8.2f} {synced:>8.2f} {index.vectors.nbytes / 2**20:>10.1f} "
+                f"{metrics.percentile(timings, 0.5):>8.2f} {metrics.percentile(timings, 0.95):>8.2f}"
+            )
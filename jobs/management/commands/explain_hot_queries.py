@@ -0,0 +1,104 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from jobs import search
+from jobs.models import ContactMessage, Job, JobApplication, Testimonial
+from jobs.pagination import CursorPaginator
+
+INDEX_PATTERNS = (
+    # SQLite
+    re.compile(r'USING (?:COVERING )?INDEX (\w+)'),
+    re.compile(r'USING INTEGER (PRIMARY KEY)'),
+    re.compile(r'SCAN (\w+) VIRTUAL TABLE'),
+    # PostgreSQL
+    re.compile(r'Index (?:Only )?Scan (?:Backward )?using (\w+)'),
+    re.compile(r'Bitmap Index Scan on (\w+)'),
+)
+SCAN_PATTERNS = (
+    re.compile(r'\bSCAN (\w+)(?!.*\bUSING\b)(?!.*VIRTUAL TABLE)'),
+    re.compile(r'Seq Scan on (\w+)'),
+)
+SORT_PATTERNS = (
+    re.compile(r'USE TEMP B-TREE FOR ORDER BY'),
+    re.compile(r'^\W*Sort\b'),
+)
+
+
+def page(queryset):
+    # What the paginated views actually run: the first page plus one probe row.
+    paginator = CursorPaginator(queryset)
+    return paginator.queryset[:paginator.page_size + 1]
+
+
+def hot_queries(job_id, user_id):
+    return [
+        ('home: featured jobs', Job.objects.filter(featured=True, is_active=True).order_by('-posted_at')),
+        ('home: testimonials', Testimonial.objects.filter(is_approved=True)
+            .select_related('user__profile').order_by('-created_at')[:6]),
+        ('job_list', page(Job.objects.filter(is_active=True).order_by('-posted_at'))),
+        ('job_list: search', page(search.search_jobs(
+            Job.objects.filter(is_active=True).order_by('-posted_at'), query='developer'))),
+        ('job_detail', Job.objects.filter(id=job_id, is_active=True)),
+        ('apply_job: duplicate check', JobApplication.objects.filter(job_id=job_id, user_id=user_id)[:1]),
+        ('my_jobs', page(JobApplication.objects.filter(user_id=user_id).select_related('job'))),
+        ('admin_jobs', page(Job.objects.order_by('-posted_at'))),
+        ('admin_applications', page(JobApplication.objects.select_related('job', 'user'))),
+        ('admin_testimonials', page(Testimonial.objects.select_related('user').order_by('-created_at'))),
+        ('admin_testimonials: pending', page(Testimonial.objects.filter(is_approved=False)
+            .select_related('user').order_by('-created_at'))),
+        ('admin_messages', page(ContactMessage.objects.order_by('-created_at'))),
+    ]
+
+
+def analyze(plan):
+    indexes, scans, sorts = [], [], False
+    for line in plan.splitlines():
+        for pattern in INDEX_PATTERNS:
+            indexes += pattern.findall(line)
+        for pattern in SCAN_PATTERNS:
+            scans += pattern.findall(line)
+        sorts = sorts or any(pattern.search(line) for pattern in SORT_PATTERNS)
+    return indexes, scans, sorts
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the queries behind the hot views and report whether "
+        "they use an index, scan a whole table or sort in memory. Plans depend "
+        "on table statistics, so run it against realistic data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--plans', action='store_true', help="Print the full plans.")
+        parser.add_argument(
+            '--fail-on-scan', action='store_true',
+            help="Exit with an error if any query scans a full table.",
+        )
+
+    def handle(self, *args, **options):
+        job_id = Job.objects.values_list('id', flat=True).first() or 1
+        user_id = JobApplication.objects.values_list('user_id', flat=True).first() or 1
+
+        problems = []
+        for label, queryset in hot_queries(job_id, user_id):
+            plan = queryset.explain()
+            indexes, scans, sorts = analyze(plan)
+
+            notes = []
+            if scans:
+                notes.append(f"full scan of {', '.join(sorted(set(scans)))}")
+            if sorts:
+                notes.append("sorts in memory")
+            status = self.style.WARNING('WARN') if notes else self.style.SUCCESS('OK  ')
+            used = ', '.join(dict.fromkeys(indexes)) or '-'
+            self.stdout.write(f"{status} {label:<30} indexes: {used}" + (f"  ({'; '.join(notes)})" if notes else ''))
+            if options['plans']:
+                self.stdout.write(f"{plan}\n")
+            if scans:
+                problems.append(label)
+
+        self.stdout.write(f"\nDatabase: {connection.vendor}")
+        if problems and options['fail_on_scan']:
+            raise CommandError(f"Full table scans in: {', '.join(problems)}")
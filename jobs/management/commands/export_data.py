@@ -0,0 +1,84 @@
+import csv
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import exports
+
+
+def last_exported_id(path, fmt):
+    """Id of the last complete row in an earlier export, or None."""
+    if not os.path.exists(path) or not os.path.getsize(path):
+        return None
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read() != b'\n':
+            raise CommandError(f"{path} ends with a partial row; trim it before resuming.")
+
+    # Read through rather than seeking back: CSV values may contain newlines.
+    last = None
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'jsonl':
+            for line in f:
+                last = json.loads(line)['id']
+        else:
+            for row in csv.reader(f):
+                last = row[0]
+    return None if last in (None, 'id') else int(last)
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream applications, users or contact messages to CSV or JSON Lines "
+        "in id order, with flat memory use. --resume continues an interrupted "
+        "export from the last id in the output file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(exports.DATASETS))
+        parser.add_argument('--format', choices=sorted(exports.FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help="File to write (default: stdout).")
+        parser.add_argument('--job', help="Applications: job id.")
+        parser.add_argument('--status', help="Applications: status.")
+        parser.add_argument('--is-active', dest='is_active', help="Users: True or False.")
+        parser.add_argument('--since', help="Created on or after this date (YYYY-MM-DD).")
+        parser.add_argument('--until', help="Created on or before this date (YYYY-MM-DD).")
+        parser.add_argument('--after', type=int, help="Only rows with an id above this one.")
+        parser.add_argument(
+            '--resume', action='store_true',
+            help="Append to --output, starting after the last id already in it.",
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        fmt, path = options['format'], options['output']
+        if options['resume']:
+            if not path:
+                raise CommandError("--resume needs --output.")
+            last = last_exported_id(path, fmt)
+            if last is not None:
+                options['after'] = last
+        appending = bool(options['resume'] and path and os.path.exists(path) and os.path.getsize(path))
+
+        dataset = exports.get_dataset(options['dataset'])
+        try:
+            queryset = dataset.queryset(options)
+        except exports.InvalidExport as e:
+            raise CommandError(str(e))
+        lines = exports.export_lines(
+            dataset, queryset, fmt, header=not appending, chunk_size=options['chunk_size']
+        )
+
+        if not path:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        written = 0
+        with open(path, 'a' if appending else 'w', newline='', encoding='utf-8') as out:
+            for line in lines:
+                out.write(line)
+                written += 1
+        rows = written - (0 if appending or fmt == 'jsonl' else 1)
+        self.stderr.write(f"Wrote {rows} {options['dataset']} row(s) to {path}.")
@@ -0,0 +1,64 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import imports
+
+
+class Command(BaseCommand):
+    help = (
+        "Import jobs from a CSV or JSON Lines file in chunks, validating every "
+        "row like the staff create form. Invalid rows are reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=imports.FORMATS, help="Default: from the file extension.")
+        parser.add_argument(
+            '--posted-by', help="Username of the staff user the jobs are posted by (default: first superuser)."
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Rows per transaction.")
+        parser.add_argument('--max-errors', type=int, default=1000, help="Row errors to keep and report.")
+        parser.add_argument('--errors-file', help="Write the kept row errors to this file as JSON Lines.")
+
+    def handle(self, *args, **options):
+        if options['posted_by']:
+            posted_by = User.objects.filter(username=options['posted_by']).first()
+            if posted_by is None:
+                raise CommandError(f"No user {options['posted_by']!r}.")
+        else:
+            posted_by = User.objects.filter(is_superuser=True).order_by('id').first()
+            if posted_by is None:
+                raise CommandError("No superuser to post the jobs; pass --posted-by.")
+
+        fmt = options['format'] or imports.guess_format(options['path'])
+        try:
+            f = open(options['path'], 'rb')
+        except OSError as e:
+            raise CommandError(str(e))
+        with f:
+            result = imports.import_jobs(
+                imports.text_stream(f), fmt, posted_by,
+                chunk_size=options['chunk_size'],
+                max_errors=options['max_errors'],
+                progress=self.progress if options['verbosity'] > 1 else None,
+            )
+
+        for line, errors in result.errors[:20]:
+            self.stderr.write(f"line {line}: {json.dumps(errors)}")
+        if options['errors_file']:
+            with open(options['errors_file'], 'w') as out:
+                for line, errors in result.errors:
+                    out.write(json.dumps({'line': line, 'errors': errors}) + '\n')
+
+        self.stdout.write(
+            f"{result.rows} rows, {result.created} jobs created, {result.failed} rejected "
+            f"in {result.elapsed:.1f}s ({result.rows_per_second:,.0f} rows/s)."
+        )
+
+    def progress(self, result):
+        self.stderr.write(
+            f"  {result.rows:,} rows, {result.created:,} created, {result.failed:,} rejected, "
+            f"{result.rows_per_second:,.0f} rows/s"
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from jobs import page_cache, views  # noqa: F401  (importing views registers the cached views)
+
+
+class Command(BaseCommand):
+    help = (
+        "Show hit/miss counters of the anonymous page cache. The counters live "
+        "in the cache, so this needs a shared backend (file or redis)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Zero the counters after printing.")
+
+    def handle(self, *args, **options):
+        view_names = page_cache.CACHED_VIEWS
+        for view_name, counts in page_cache.get_stats(view_names).items():
+            total = counts['hits'] + counts['misses']
+            ratio = counts['hits'] / total if total else 0
+            self.stdout.write(
+                f"{view_name:<12} hits {counts['hits']:>8}  misses {counts['misses']:>8}  hit ratio {ratio:6.1%}"
+            )
+        if options['reset']:
+            page_cache.reset_stats(view_names)
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
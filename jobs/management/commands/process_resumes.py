@@ -0,0 +1,53 @@
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from jobs import resumes
+
+
+class Command(BaseCommand):
+    help = (
+        "Extract text and skills from new or replaced resumes and add them "
+        "to the resume search index. Runs until interrupted; use --once to "
+        "process what is pending and exit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Resumes downloaded and read at once.")
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--retry-failed', action='store_true', help="Try unreadable resumes again.")
+        parser.add_argument('--rebuild-index', action='store_true', help="Rebuild the index from stored keywords first.")
+        parser.add_argument('--poll-interval', type=float, default=30.0)
+        parser.add_argument('--once', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['rebuild_index']:
+            index = resumes.rebuild_index()
+            self.stdout.write(f"Rebuilt the {index.name} resume index.")
+
+        extractor = resumes.get_extractor()
+        totals = Counter()
+        retry_failed = options['retry_failed']
+        while True:
+            started = time.perf_counter()
+            results = resumes.run(
+                workers=options['workers'],
+                batch_size=options['batch_size'],
+                retry_failed=retry_failed,
+                extractor=extractor,
+            )
+            retry_failed = False
+            if results:
+                totals.update(results)
+                self.stdout.write(
+                    ", ".join(f"{k}: {v}" for k, v in sorted(results.items()))
+                    + f" in {time.perf_counter() - started:.1f}s"
+                )
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Resumes read with {extractor.name}: {totals['done']}, unreadable: {totals['failed']}."
+        ))
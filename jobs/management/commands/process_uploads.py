@@ -0,0 +1,58 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs import uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Push queued resume/photo uploads to remote storage. Runs until "
+        "interrupted; use --once to drain the queue and exit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument('--backoff', type=int, default=30, help="Base retry delay in seconds.")
+        parser.add_argument('--lease', type=int, default=300, help="Seconds before a stuck task is retried.")
+        parser.add_argument('--poll-interval', type=float, default=2.0)
+        parser.add_argument('--once', action='store_true')
+
+    def handle(self, *args, **options):
+        uploader = uploads.get_uploader()
+        totals = Counter()
+
+        def run(task_id):
+            try:
+                return uploads.process(
+                    task_id, uploader,
+                    max_attempts=options['max_attempts'],
+                    backoff_seconds=options['backoff'],
+                )
+            finally:
+                if options['workers'] > 1:
+                    connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                ids = uploads.claim(options['batch_size'], options['lease'])
+                if ids:
+                    if options['workers'] > 1:
+                        results = list(pool.map(run, ids))
+                    else:
+                        results = [run(task_id) for task_id in ids]
+                    totals.update(results)
+                    self.stdout.write(", ".join(f"{k}: {v}" for k, v in sorted(Counter(results).items())))
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Uploads done: {totals['done']}, retrying: {totals['retry']}, failed: {totals['failed']}."
+        ))
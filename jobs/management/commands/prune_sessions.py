@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs import sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions in small batches, so the session table is "
+        "never locked for long. Nothing to do for cookie or cache sessions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--pause', type=float, default=0, help="Seconds to sleep between batches.")
+
+    def handle(self, *args, **options):
+        if sessions.get_session_model() is None:
+            self.stdout.write(f"{settings.SESSION_ENGINE} does not store sessions in the database.")
+            return
+
+        total = 0
+        for deleted in sessions.prune_expired(options['batch_size'], options['pause']):
+            total += deleted
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  deleted {deleted}")
+        self.stdout.write(self.style.SUCCESS(f"Deleted {total} expired session(s)."))
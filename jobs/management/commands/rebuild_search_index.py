@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs import search
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text job search index from the jobs table."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            backend = search.rebuild_index()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {Job.objects.count()} jobs with {backend.name} in {elapsed:.2f}s."
+        ))
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs import similarity
+
+
+class Command(BaseCommand):
+    help = "Recompute the \"similar jobs\" vector of every job."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            total = similarity.rebuild()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(f"Vectorized {total} jobs in {elapsed:.2f}s."))
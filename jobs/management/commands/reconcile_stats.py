@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from jobs import stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard counters and daily series from the source tables."
+
+    def handle(self, *args, **options):
+        before = stats.get_counters()
+        after = stats.rebuild()
+
+        for name in sorted(set(before) | set(after)):
+            old, new = before.get(name, 0), after.get(name, 0)
+            marker = '' if old == new else f"  (was {old})"
+            self.stdout.write(f"{name:<28} {new}{marker}")
+        self.stdout.write(self.style.SUCCESS("Dashboard counters reconciled."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs import application_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute every job's application counters from the applications table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help="Jobs locked and checked per transaction.")
+
+    def handle(self, *args, **options):
+        corrected = application_counts.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Application counters repaired: {corrected} job(s) corrected."))
@@ -0,0 +1,41 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from jobs import metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the per-view request metrics collected by RequestMetricsMiddleware. "
+        "Workers publish them through the cache, so this needs a shared backend "
+        "(file or redis)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help="Print the report as JSON.")
+        parser.add_argument('--reset', action='store_true', help="Clear the metrics after printing.")
+
+    def handle(self, *args, **options):
+        rows = metrics.report()
+        if options['json']:
+            self.stdout.write(json.dumps(rows, indent=2))
+        else:
+            self.stdout.write(
+                f"{'view':<28} {'reqs':>6} {'p50':>8} {'p95':>8} {'p99':>8} "
+                f"{'sql p95':>8} {'tpl p95':>8} {'queries':>8} {'repeats':>8}"
+            )
+            for row in rows:
+                self.stdout.write(
+                    f"{row['view']:<28} {row['requests']:>6} {row['wall_p50']:>8.1f} "
+                    f"{row['wall_p95']:>8.1f} {row['wall_p99']:>8.1f} {row['sql_p95']:>8.1f} "
+                    f"{row['template_p95']:>8.1f} {row['queries_avg']:>8.1f} {row['duplicated_avg']:>8.1f}"
+                )
+                for sql, count in row['top_duplicates']:
+                    self.stdout.write(f"    {count}x {sql[:120]}")
+            if not rows:
+                self.stdout.write("No requests recorded.")
+
+        if options['reset']:
+            metrics.reset()
+            self.stdout.write(self.style.SUCCESS("Metrics reset."))
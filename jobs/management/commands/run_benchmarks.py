@@ -0,0 +1,101 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from jobs.benchmarks import data, suite
+
+DEFAULT_BASELINE = settings.BASE_DIR / 'jobs' / 'benchmarks' / 'baseline.json'
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database and benchmark the main views: latency "
+        "percentiles, queries per request and peak memory. With --compare, "
+        "exit with an error when a view is slower or runs more queries than "
+        "the baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(data.SCALES), default='small')
+        parser.add_argument('--repeat', type=int, default=30, help="Timed requests per view.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--only', nargs='+', help="Run only these scenarios.")
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument('--save-baseline', action='store_true', help="Write the results to --baseline.")
+        parser.add_argument('--compare', action='store_true', help="Compare the results with --baseline.")
+        parser.add_argument(
+            '--tolerance', type=float, default=0.5,
+            help="Allowed median slowdown against the baseline (0.5 = 50%%).",
+        )
+        parser.add_argument(
+            '--min-delta', type=float, default=2.0,
+            help="Ignore slowdowns smaller than this many milliseconds.",
+        )
+        parser.add_argument('--output', help="Also write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # Anonymous pages would all be served by the page cache after
+            # the first request; the point is to measure the views.
+            with override_settings(PAGE_CACHE_ENABLED=False):
+                report = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['output']:
+            self.write(options['output'], report)
+        if options['save_baseline']:
+            self.write(options['baseline'], report)
+            self.stdout.write(f"Baseline written to {options['baseline']}.")
+        if options['compare']:
+            self.compare(report, options)
+
+    def run(self, options):
+        counts = data.SCALES[options['scale']]
+        started = time.perf_counter()
+        fixtures = data.seed(counts, seed=options['seed'])
+        self.stdout.write(
+            f"Seeded {options['scale']} data set in {time.perf_counter() - started:.1f}s: "
+            + ', '.join(f"{count:,} {name}" for name, count in counts.items())
+        )
+
+        results = suite.run(fixtures, repeat=options['repeat'], only=options['only'])
+        self.stdout.write(
+            f"\n{'scenario':<30} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'peak KB':>9}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<30} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+                f"{result['queries']:>8} {result['peak_kb']:>9.1f}"
+            )
+        return {'scale': options['scale'], 'environment': suite.environment(counts), 'results': results}
+
+    def write(self, path, report):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    def compare(self, report, options):
+        try:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            raise CommandError(f"No baseline at {options['baseline']}; create one with --save-baseline.")
+
+        if baseline.get('scale') != report['scale']:
+            self.stderr.write(
+                self.style.WARNING(f"Baseline was recorded at scale {baseline.get('scale')!r}.")
+            )
+        problems = suite.compare(report['results'], baseline, options['tolerance'], options['min_delta'])
+        if problems:
+            raise CommandError("Regressions against the baseline:\n  " + "\n  ".join(problems))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
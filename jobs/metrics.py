@@ -0,0 +1,264 @@
+"""
+Per-view request metrics.
+
+``RequestMetricsMiddleware`` records for every request the number of SQL
+queries, time spent in SQL, queries repeated with the same shape (the
+N+1 signature), template render time and wall time, keyed by the URL
+name the request resolved to. Samples are kept in memory per process and
+copied to the cache every ``REQUEST_METRICS_FLUSH_INTERVAL`` seconds, so
+the staff page and the ``request_metrics`` command can merge every
+worker's numbers (with a shared cache backend).
+
+With ``REQUEST_METRICS_ENABLED`` off the middleware removes itself at
+startup and nothing here runs.
+"""
+import collections
+import contextlib
+import contextvars
+import functools
+import math
+import os
+import re
+import socket
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+KEY_PREFIX = 'request_metrics'
+WORKERS_KEY = f'{KEY_PREFIX}:workers'
+UNRESOLVED = '<unresolved>'
+
+_current = contextvars.ContextVar('request_metrics_recorder', default=None)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_LIST_RE = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """``sql`` with literals and IN lists collapsed, so repeats of one query match."""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _LIST_RE.sub('(...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of ``values`` (0 for an empty list)."""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class Recorder:
+    """What one request spent; also the ``execute_wrapper`` that measures SQL."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.fingerprints = collections.Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self):
+        return {sql: count for sql, count in self.fingerprints.items() if count > 1}
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        self.flushed_at = 0.0
+
+    def add(self, view_name, wall_time, recorder):
+        # Sample: (wall ms, sql ms, template ms, queries, duplicated queries)
+        sample = (
+            wall_time * 1000,
+            recorder.sql_time * 1000,
+            recorder.template_time * 1000,
+            recorder.queries,
+            sum(count - 1 for count in recorder.duplicates().values()),
+        )
+        max_samples = getattr(settings, 'REQUEST_METRICS_SAMPLES', 1000)
+        with self.lock:
+            view = self.views.setdefault(view_name, {
+                'requests': 0,
+                'samples': collections.deque(maxlen=max_samples),
+                'duplicates': collections.Counter(),
+            })
+            view['requests'] += 1
+            view['samples'].append(sample)
+            for sql, count in recorder.duplicates().items():
+                view['duplicates'][sql] += count - 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: {
+                    'requests': view['requests'],
+                    'samples': list(view['samples']),
+                    'duplicates': dict(view['duplicates']),
+                }
+                for name, view in self.views.items()
+            }
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+
+registry = Registry()
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _worker_key(worker):
+    return f'{KEY_PREFIX}:worker:{worker}'
+
+
+def flush(force=False):
+    """Copy this process's samples to the cache, at most once per interval."""
+    now = time.monotonic()
+    interval = getattr(settings, 'REQUEST_METRICS_FLUSH_INTERVAL', 10)
+    if not force and now - registry.flushed_at < interval:
+        return
+    registry.flushed_at = now
+    worker = worker_id()
+    cache.set(_worker_key(worker), registry.snapshot(), None)
+    workers = cache.get(WORKERS_KEY) or []
+    if worker not in workers:
+        cache.set(WORKERS_KEY, workers + [worker], None)
+
+
+def collect():
+    """Snapshots of every worker merged into ``{view name: {...}}``."""
+    workers = cache.get(WORKERS_KEY) or []
+    snapshots = cache.get_many([_worker_key(worker) for worker in workers])
+    # This process's own numbers are fresher than its last flush.
+    snapshots[_worker_key(worker_id())] = registry.snapshot()
+
+    merged = {}
+    for snapshot in snapshots.values():
+        for name, view in snapshot.items():
+            target = merged.setdefault(name, {
+                'requests': 0, 'samples': [], 'duplicates': collections.Counter(),
+            })
+            target['requests'] += view['requests']
+            target['samples'] += view['samples']
+            target['duplicates'].update(view['duplicates'])
+    return merged
+
+
+def reset():
+    registry.reset()
+    workers = cache.get(WORKERS_KEY) or []
+    cache.delete_many([_worker_key(worker) for worker in workers] + [WORKERS_KEY])
+
+
+def report(views=None, top_duplicates=3):
+    """One summary row per view, slowest total wall time first."""
+    rows = []
+    for name, view in (collect() if views is None else views).items():
+        samples = view['samples']
+        wall, sql, template, queries, duplicated = (
+            [sample[i] for sample in samples] for i in range(5)
+        )
+        rows.append({
+            'view': name,
+            'requests': view['requests'],
+            'wall_p50': percentile(wall, 0.5),
+            'wall_p95': percentile(wall, 0.95),
+            'wall_p99': percentile(wall, 0.99),
+            'sql_p95': percentile(sql, 0.95),
+            'template_p95': percentile(template, 0.95),
+            'queries_avg': sum(queries) / len(queries) if queries else 0,
+            'queries_max': max(queries, default=0),
+            'duplicated_avg': sum(duplicated) / len(duplicated) if duplicated else 0,
+            'top_duplicates': collections.Counter(view['duplicates']).most_common(top_duplicates),
+            'total_wall': sum(wall),
+        })
+    return sorted(rows, key=lambda row: row['total_wall'], reverse=True)
+
+
+def _install_template_timer():
+    """Time the top-level render of Django templates for the current request."""
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, 'timed', False):
+        return
+    original = Template.render
+
+    @functools.wraps(original)
+    def render(self, context=None, request=None):
+        recorder = _current.get()
+        if recorder is None:
+            return original(self, context, request)
+        started = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            recorder.template_time += time.perf_counter() - started
+
+    render.timed = True
+    Template.render = render
+
+
+class RequestMetricsMiddleware:
+    """Goes first in MIDDLEWARE so wall time covers the other middleware."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        _install_template_timer()
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with self.measure(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with self.measure(request):
+            return await self.get_response(request)
+
+    @contextlib.contextmanager
+    def measure(self, request):
+        recorder = Recorder()
+        token = _current.set(recorder)
+        started = time.perf_counter()
+        try:
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                yield
+        finally:
+            _current.reset(token)
+        wall_time = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        registry.add(match.view_name if match else UNRESOLVED, wall_time, recorder)
+        flush()
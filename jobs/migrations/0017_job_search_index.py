@@ -0,0 +1,62 @@
+# Generated by Django 6.0.1 on 2026-10-17 04:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The SQL of jobs.search's backends as of this migration, written out so
+# later changes to them cannot change what it does.
+SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_job_search USING fts5("
+    "job_id UNINDEXED, title, company_name, location, description, requirements, "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "INSERT INTO jobs_job_search (rowid, job_id, title, company_name, location, description, requirements) "
+    "SELECT id, id, COALESCE(title, ''), COALESCE(company_name, ''), COALESCE(location, ''), "
+    "COALESCE(description, ''), COALESCE(requirements, '') FROM jobs_job",
+    "INSERT INTO jobs_job_search (jobs_job_search) VALUES ('optimize')",
+]
+POSTGRESQL = [
+    "CREATE TABLE IF NOT EXISTS jobs_job_search ("
+    "job_id bigint PRIMARY KEY REFERENCES jobs_job (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS jobs_job_search_document_gin ON jobs_job_search USING GIN (document)",
+    "INSERT INTO jobs_job_search (job_id, document) SELECT id, "
+    "setweight(to_tsvector('english', COALESCE(title, '')), 'A') || "
+    "setweight(to_tsvector('english', COALESCE(company_name, '')), 'B') || "
+    "setweight(to_tsvector('english', COALESCE(location, '')), 'C') || "
+    "setweight(to_tsvector('english', COALESCE(description, '')), 'D') || "
+    "setweight(to_tsvector('english', COALESCE(requirements, '')), 'D') "
+    "FROM jobs_job",
+]
+CREATE = {'sqlite': SQLITE, 'postgresql': POSTGRESQL}
+
+
+def create_search_index(apps, schema_editor):
+    # Other databases use the icontains search and need no table.
+    for sql in CREATE.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql, params=None)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE:
+        schema_editor.execute("DROP TABLE IF EXISTS jobs_job_search", params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0016_testimonial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSearchIndex',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='jobs.job')),
+            ],
+            options={
+                'db_table': 'jobs_job_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
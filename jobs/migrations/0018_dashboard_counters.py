@@ -0,0 +1,78 @@
+# Generated by Django 6.0.1 on 2026-10-17 04:41
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+# The counters jobs.stats kept when this migration was written; later
+# changes to it cannot change what the migration does.
+DAILY_SERIES = {
+    'users': ('auth', 'User', 'date_joined'),
+    'jobs': ('jobs', 'Job', 'posted_at'),
+    'applications': ('jobs', 'JobApplication', 'applied_at'),
+    'testimonials': ('jobs', 'Testimonial', 'created_at'),
+}
+
+
+def populate_counters(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    Testimonial = apps.get_model('jobs', 'Testimonial')
+    SiteCounter = apps.get_model('jobs', 'SiteCounter')
+    DailyCounter = apps.get_model('jobs', 'DailyCounter')
+
+    totals = {
+        'users': apps.get_model('auth', 'User').objects.count(),
+        'jobs': Job.objects.count(),
+        'jobs_inactive': Job.objects.filter(is_active=False).count(),
+        'applications': JobApplication.objects.count(),
+    }
+    for status, count in JobApplication.objects.values_list('status').annotate(Count('id')).order_by():
+        totals[f'applications_{status}'] = count
+    for approved, count in Testimonial.objects.values_list('is_approved').annotate(Count('id')).order_by():
+        totals['testimonials_approved' if approved else 'testimonials_pending'] = count
+    SiteCounter.objects.bulk_create(SiteCounter(name=name, value=value) for name, value in totals.items())
+
+    for name, (app_label, model_name, date_field) in DAILY_SERIES.items():
+        rows = (
+            apps.get_model(app_label, model_name).objects
+            .annotate(day=TruncDate(date_field))
+            .values_list('day')
+            .annotate(value=Count('pk'))
+            .order_by()
+        )
+        DailyCounter.objects.bulk_create(
+            (DailyCounter(name=name, day=day, value=value) for day, value in rows), batch_size=1000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0017_job_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('day', models.DateField()),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['name', 'day'],
+                'unique_together': {('name', 'day')},
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
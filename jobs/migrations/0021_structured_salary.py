@@ -0,0 +1,142 @@
+# Generated by Django 6.0.1 on 2026-10-17 05:10
+
+import re
+
+from django.db import migrations, models
+
+# jobs.salaries as of this migration, copied so later changes to the
+# parser cannot change what the migration does.
+CURRENCY_ALIASES = (
+    ('NPR', ('npr', 'nrs', 'rs', 'रु')),
+    ('INR', ('inr', '₹')),
+    ('USD', ('usd', '$')),
+    ('EUR', ('eur', '€')),
+)
+PERIOD_ALIASES = (
+    ('hour', ('hour', 'hr', 'hourly')),
+    ('day', ('day', 'daily')),
+    ('week', ('week', 'wk', 'weekly')),
+    ('month', ('month', 'mo', 'monthly', 'pm')),
+    ('year', ('year', 'yr', 'annum', 'annual', 'annually', 'pa', 'yearly')),
+)
+MULTIPLIERS = {'k': 1_000, 'lakh': 100_000, 'lakhs': 100_000, 'lac': 100_000, 'm': 1_000_000}
+
+AMOUNT_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*(k|lakhs?|lac|m)?\b', re.IGNORECASE)
+WORD_RE = re.compile(r'[a-z]+|[$₹€]|रु', re.IGNORECASE)
+
+FIELDS = ['salary_min', 'salary_max', 'salary_currency', 'salary_period', 'salary_note']
+
+
+def _lookup(words, aliases):
+    for value, names in aliases:
+        if any(name in words for name in names):
+            return value
+    return None
+
+
+def parse_salary(text):
+    text = (text or '').strip()
+    matches = AMOUNT_RE.findall(text)[:2]
+    if not matches:
+        return None
+    amounts = [
+        round(float(number.replace(',', '')) * MULTIPLIERS.get(unit.lower(), 1))
+        for number, unit in matches
+    ]
+    if len(matches) == 2 and not matches[0][1] and matches[1][1] and amounts[0] < amounts[1] / 100:
+        amounts[0] *= MULTIPLIERS[matches[1][1].lower()]
+
+    words = {word.lower() for word in WORD_RE.findall(text)}
+    return {
+        'salary_min': min(amounts),
+        'salary_max': max(amounts),
+        'salary_currency': _lookup(words, CURRENCY_ALIASES) or 'NPR',
+        'salary_period': _lookup(words, PERIOD_ALIASES) or 'month',
+    }
+
+
+def format_salary(salary_min, salary_max, currency, period):
+    if salary_min is None and salary_max is None:
+        return ''
+    low = salary_min if salary_min is not None else salary_max
+    high = salary_max if salary_max is not None else salary_min
+    amount = f"{low:,}" if low == high else f"{low:,} - {high:,}"
+    return f"{currency} {amount} / {period}"
+
+
+def parse_salaries(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    batch = []
+    for job in Job.objects.exclude(salary__isnull=True).exclude(salary='').only('id', 'salary').iterator(chunk_size=2000):
+        # Text without an amount ("Negotiable") is kept as the note.
+        parsed = parse_salary(job.salary) or {'salary_note': job.salary.strip()[:100]}
+        for field, value in parsed.items():
+            setattr(job, field, value)
+        batch.append(job)
+        if len(batch) == 2000:
+            Job.objects.bulk_update(batch, FIELDS)
+            batch = []
+    Job.objects.bulk_update(batch, FIELDS)
+
+
+def format_salaries(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    jobs = list(Job.objects.filter(models.Q(salary_min__isnull=False) | ~models.Q(salary_note='')))
+    for job in jobs:
+        job.salary = (
+            format_salary(job.salary_min, job.salary_max, job.salary_currency, job.salary_period)
+            or job.salary_note
+        )
+    Job.objects.bulk_update(jobs, ['salary'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0020_deferred_uploads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='salary_currency',
+            field=models.CharField(choices=[('NPR', 'NPR'), ('INR', 'INR'), ('USD', 'USD'), ('EUR', 'EUR')], default='NPR', max_length=3),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_max',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_min',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_period',
+            field=models.CharField(choices=[('hour', 'Per hour'), ('day', 'Per day'), ('week', 'Per week'), ('month', 'Per month'), ('year', 'Per year')], default='month', max_length=5),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_note',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.RunPython(parse_salaries, format_salaries),
+        migrations.RemoveField(
+            model_name='job',
+            name='salary',
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['job_type', '-posted_at', '-id'], name='job_active_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['salary_max'], name='job_active_salary_max_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['salary_min'], name='job_active_salary_min_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 6.0.1 on 2026-10-17 06:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+STATUSES = ('applied', 'reviewing', 'shortlisted', 'rejected', 'selected')
+
+
+def count_applications(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+
+    def count(**filters):
+        applications = (
+            JobApplication.objects.filter(job=OuterRef('pk'), **filters)
+            .order_by().values('job').annotate(rows=Count('pk')).values('rows')
+        )
+        return Coalesce(Subquery(applications), 0)
+
+    Job.objects.update(
+        application_count=count(),
+        **{f'{status}_count': count(status=status) for status in STATUSES},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0021_structured_salary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='application_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applied_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='rejected_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='reviewing_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='selected_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='shortlisted_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_applications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 6.0.1 on 2026-10-17 05:39
+
+import array
+import math
+import re
+import zlib
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# A copy of jobs.similarity's vectorizer as it was when this migration was
+# written, so later changes to it cannot change what the migration does.
+# rebuild_similar_jobs recomputes the vectors with the current one.
+DIMENSIONS = 512
+FIELD_WEIGHTS = (('title', 3), ('requirements', 2), ('description', 1), ('location', 1))
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def vectorize(job):
+    counts = Counter()
+    for field, weight in FIELD_WEIGHTS:
+        prefix = 'location:' if field == 'location' else ''
+        for token in TOKEN_RE.findall((getattr(job, field) or '').lower()):
+            if len(token) > 1:
+                counts[prefix + token] += weight
+
+    vector = array.array('f', bytes(4 * DIMENSIONS))
+    for token, count in counts.items():
+        digest = zlib.crc32(token.encode())
+        sign = 1.0 if digest & 0x80000000 else -1.0
+        vector[digest % DIMENSIONS] += sign * (1 + math.log(count))
+    return vector.tobytes()
+
+
+def vectorize_jobs(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    JobVector = apps.get_model('jobs', 'JobVector')
+    batch = []
+    for job in Job.objects.only('id', *(field for field, _ in FIELD_WEIGHTS)).iterator(chunk_size=2000):
+        batch.append(JobVector(job_id=job.pk, vector=vectorize(job)))
+        if len(batch) == 2000:
+            JobVector.objects.bulk_create(batch)
+            batch = []
+    JobVector.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0022_application_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobVector',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='vector', serialize=False, to='jobs.job')),
+                ('vector', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+        ),
+        migrations.RunPython(vectorize_jobs, migrations.RunPython.noop),
+    ]
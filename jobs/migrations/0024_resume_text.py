@@ -0,0 +1,55 @@
+# Generated by Django 6.0.1 on 2026-10-17 05:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The side table of jobs.resumes' index as of this migration. It starts
+# empty; process_resumes fills it.
+CREATE = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_resume_search USING fts5("
+        "skills, keywords, tokenize='unicode61 remove_diacritics 2')",
+    ],
+    'postgresql': [
+        "CREATE TABLE IF NOT EXISTS jobs_resume_search ("
+        "application_id bigint PRIMARY KEY REFERENCES jobs_jobapplication (id) "
+        "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+        "document tsvector NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS jobs_resume_search_document_gin ON jobs_resume_search USING GIN (document)",
+    ],
+}
+
+
+def create_resume_index(apps, schema_editor):
+    # Other databases search ResumeText.keywords directly.
+    for sql in CREATE.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql, params=None)
+
+
+def drop_resume_index(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE:
+        schema_editor.execute("DROP TABLE IF EXISTS jobs_resume_search", params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0023_job_vectors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeText',
+            fields=[
+                ('application', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resume_text', serialize=False, to='jobs.jobapplication')),
+                ('source', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('done', 'Done'), ('failed', 'Failed')], max_length=10)),
+                ('error', models.TextField(blank=True)),
+                ('text', models.TextField(blank=True)),
+                ('skills', models.TextField(blank=True)),
+                ('keywords', models.TextField(blank=True)),
+                ('processed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_resume_index, drop_resume_index),
+    ]
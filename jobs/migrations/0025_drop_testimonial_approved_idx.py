@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-17 06:03
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0024_resume_text'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='testimonial',
+            name='testimonial_approved_idx',
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-17 06:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0025_drop_testimonial_approved_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_active_salary_max_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_active_salary_min_idx',
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['salary_currency', 'salary_period', 'salary_max'], name='job_active_salary_max_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['salary_currency', 'salary_period', 'salary_min'], name='job_active_salary_min_idx'),
+        ),
+    ]
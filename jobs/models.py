@@ -1,11 +1,12 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 from django.utils import timezone
 from cloudinary.models import CloudinaryField
 
+from .salaries import format_salary
+
 class UserProfile(models.Model):
     ROLE_CHOICES = (
         ('jobseeker', 'Job Seeker'),
@@ -37,12 +38,34 @@ class Job(models.Model):
         ('IN', 'Internship'),
         ('CT', 'Contract'),
     )
+    CURRENCY_CHOICES = (
+        ('NPR', 'NPR'),
+        ('INR', 'INR'),
+        ('USD', 'USD'),
+        ('EUR', 'EUR'),
+    )
+    SALARY_PERIOD_CHOICES = (
+        ('hour', 'Per hour'),
+        ('day', 'Per day'),
+        ('week', 'Per week'),
+        ('month', 'Per month'),
+        ('year', 'Per year'),
+    )
+    COUNTER_FIELDS = (
+        'application_count', 'applied_count', 'reviewing_count',
+        'shortlisted_count', 'rejected_count', 'selected_count',
+    )
 
     title = models.CharField(max_length=200)
     company_name = models.CharField(max_length=200)
     location = models.CharField(max_length=200)
     job_type = models.CharField(max_length=2, choices=JOB_TYPE_CHOICES)
-    salary = models.CharField(max_length=100, blank=True, null=True)
+    salary_min = models.PositiveIntegerField(blank=True, null=True)
+    salary_max = models.PositiveIntegerField(blank=True, null=True)
+    salary_currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, default='NPR')
+    salary_period = models.CharField(max_length=5, choices=SALARY_PERIOD_CHOICES, default='month')
+    # Salary wording without an amount ("Negotiable"), shown when there is no range.
+    salary_note = models.CharField(max_length=100, blank=True)
     description = models.TextField()
     requirements = models.TextField()
     posted_by = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -50,9 +73,113 @@ class Job(models.Model):
     is_active = models.BooleanField(default=True)
     featured = models.BooleanField(default=False) 
 
+    # Denormalized from JobApplication by jobs.application_counts: the total
+    # and one "<status>_count" per JobApplication status.
+    application_count = models.IntegerField(default=0, editable=False)
+    applied_count = models.IntegerField(default=0, editable=False)
+    reviewing_count = models.IntegerField(default=0, editable=False)
+    shortlisted_count = models.IntegerField(default=0, editable=False)
+    rejected_count = models.IntegerField(default=0, editable=False)
+    selected_count = models.IntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # job_list and admin_jobs: newest first, keyset on (posted_at, id).
+            models.Index(fields=['-posted_at', '-id'], name='job_posted_idx'),
+            models.Index(
+                fields=['-posted_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_posted_idx'
+            ),
+            # home: featured jobs.
+            models.Index(
+                fields=['-posted_at'],
+                condition=models.Q(is_active=True, featured=True),
+                name='job_featured_idx'
+            ),
+            # job_list filters: job type keeps the newest-first order. A salary
+            # range always comes with a currency and period (JobFilterForm),
+            # so those lead and the scan covers one bound within them.
+            models.Index(
+                fields=['job_type', '-posted_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_type_idx'
+            ),
+            models.Index(
+                fields=['salary_currency', 'salary_period', 'salary_max'],
+                condition=models.Q(is_active=True),
+                name='job_active_salary_max_idx'
+            ),
+            models.Index(
+                fields=['salary_currency', 'salary_period', 'salary_min'],
+                condition=models.Q(is_active=True),
+                name='job_active_salary_min_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # The counters only change through F() updates; a full save of an
+        # instance loaded earlier must not write its stale copies back.
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+        # jobs.stats locks the row to read its old is_active; hold the lock until commit.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+    def clean(self):
+        # One amount is a fixed salary: store it as both bounds so range
+        # filters only ever compare non-null columns.
+        if self.salary_min is None:
+            self.salary_min = self.salary_max
+        elif self.salary_max is None:
+            self.salary_max = self.salary_min
+        if self.salary_min is not None and self.salary_min > self.salary_max:
+            raise ValidationError({'salary_max': "Maximum salary must not be below the minimum."})
+
+    @property
+    def salary(self):
+        return (
+            format_salary(self.salary_min, self.salary_max, self.salary_currency, self.salary_period)
+            or self.salary_note
+        )
+
+
+class JobSearchIndex(models.Model):
+    # Read-only mapping of the full-text side table maintained by jobs.search,
+    # so searches can join it. The table itself is created per database
+    # vendor in migration 0017.
+    job = models.OneToOneField(
+        Job,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        related_name='search_index'
+    )
+
+    class Meta:
+        managed = False
+        db_table = 'jobs_job_search'
+
+
+class JobVector(models.Model):
+    # Hashed bag-of-words vector of a job for "similar jobs", float32 bytes
+    # maintained by jobs.similarity.
+    job = models.OneToOneField(
+        Job,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='vector'
+    )
+    vector = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
 
 class JobApplication(models.Model):
     STATUS_CHOICES = (
@@ -86,9 +213,27 @@ class JobApplication(models.Model):
         default='applied'
     )
 
+    # Photo/resume are pushed to Cloudinary by the process_uploads worker.
+    UPLOAD_STATUS_CHOICES = (
+        ('complete', 'Complete'),
+        ('pending', 'Uploading'),
+        ('failed', 'Upload failed'),
+    )
+    upload_status = models.CharField(
+        max_length=10,
+        choices=UPLOAD_STATUS_CHOICES,
+        default='complete'
+    )
+
     class Meta:
         unique_together = ('job', 'user')
         ordering = ['-applied_at']
+        indexes = [
+            # my_jobs.
+            models.Index(fields=['user', '-applied_at', '-id'], name='application_user_idx'),
+            # admin_applications.
+            models.Index(fields=['-applied_at', '-id'], name='application_applied_idx'),
+        ]
 
     def clean(self):
         if self.user and (self.user.is_staff or self.user.is_superuser):
@@ -98,24 +243,44 @@ class JobApplication(models.Model):
         if self.user:
             self.full_name = self.full_name or self.user.get_full_name()
             self.email = self.email or self.user.email
-        self.full_clean()
-        super().save(*args, **kwargs)
+        # The job and user foreign keys and one application per job and
+        # user are enforced by the database (IntegrityError), which also
+        # holds for concurrent submits; checking them here cost a query each.
+        self.full_clean(exclude=['job', 'user'], validate_unique=False)
+        # The counter receivers lock the row to read its old job and status
+        # (see jobs.stats.stored_copy); hold the lock until commit.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.username} → {self.job.title} ({self.status})"
 
 
+class ResumeText(models.Model):
+    # Text, keywords and skills read from an application's resume by
+    # jobs.resumes; the keywords are also in the jobs_resume_search index.
+    STATUS_CHOICES = (
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    application = models.OneToOneField(
+        JobApplication,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='resume_text'
+    )
+    # The stored resume value this row was read from; a new upload differs.
+    source = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    error = models.TextField(blank=True)
+    text = models.TextField(blank=True)
+    skills = models.TextField(blank=True)
+    keywords = models.TextField(blank=True)
+    processed_at = models.DateTimeField(auto_now=True)
+
 
 
-# Signal: automatically create UserProfile for each new User
-@receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
-        UserProfile.objects.create(
-            user=instance,
-            role='jobseeker'
-        )
-        Profile.objects.create(user=instance)
 
 class ContactMessage(models.Model):
     name = models.CharField(max_length=100)
@@ -124,6 +289,11 @@ class ContactMessage(models.Model):
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='contact_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.email}"
     
@@ -135,5 +305,71 @@ class Testimonial(models.Model):
     is_approved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # admin_testimonials, with and without the status filter.
+            models.Index(fields=['-created_at', '-id'], name='testimonial_created_idx'),
+            # Also serves home's approved testimonials (is_approved=True, newest first).
+            models.Index(fields=['is_approved', '-created_at', '-id'], name='testimonial_status_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # jobs.stats locks the row to read its old is_approved; hold the lock until commit.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.user.get_full_name() or self.user.username} - {self.designation}"
+
+
+class SiteCounter(models.Model):
+    # Running totals for the admin dashboard, maintained by jobs.stats.
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class DailyCounter(models.Model):
+    # Per-day counts of rows created that day (and not deleted), maintained by jobs.stats.
+    name = models.CharField(max_length=50)
+    day = models.DateField()
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('name', 'day')
+        ordering = ['name', 'day']
+
+    def __str__(self):
+        return f"{self.name} {self.day} = {self.value}"
+
+
+class PendingUpload(models.Model):
+    # A file received by a view and waiting for the process_uploads worker to
+    # push it to remote storage and set it on ``field_name`` of the target row.
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('failed', 'Failed'),
+    )
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    field_name = models.CharField(max_length=50)
+    file_name = models.CharField(max_length=255)
+    data = models.BinaryField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='pending_upload_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.file_name} → {self.content_type.model}#{self.object_id}.{self.field_name} ({self.status})"
@@ -0,0 +1,195 @@
+"""
+Whole-page caching for anonymous visitors.
+
+Pages are keyed on the path plus a normalized subset of the query string
+and on the current version of every data set they depend on. Bumping a
+version (``invalidate('jobs')``) orphans every page built from the old
+data instead of hunting down individual keys. Hits and misses are counted
+per view in the cache so they can be compared across workers.
+"""
+import functools
+import hashlib
+import time
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from . import routers
+
+JOBS = 'jobs'
+TESTIMONIALS = 'testimonials'
+
+KEY_PREFIX = 'page_cache'
+
+
+def _version_key(name):
+    return f'{KEY_PREFIX}:version:{name}'
+
+
+def _stats_key(view_name, outcome):
+    return f'{KEY_PREFIX}:stats:{view_name}:{outcome}'
+
+
+def get_versions(names):
+    keys = {name: _version_key(name) for name in names}
+    found = cache.get_many(keys.values())
+    versions = []
+    for name, key in keys.items():
+        version = found.get(key)
+        if version is None:
+            # Time-based rather than starting from 0, so an evicted version
+            # can never come back as one that older pages were stored under.
+            cache.add(key, time.time_ns(), None)
+            version = cache.get(key)
+        versions.append(f'{name}{version}')
+    return versions
+
+
+def invalidate(*names):
+    for name in names:
+        cache.set(_version_key(name), time.time_ns(), None)
+    routers.hold_reads_on_primary(*(_version_key(name) for name in names))
+
+
+# Free-text parameters, where case and spacing don't change the results.
+# Everything else (cursors above all, which are case-sensitive base64) is
+# keyed on its exact value.
+FOLDED_PARAMS = {'q', 'location'}
+
+
+def normalize(param, value):
+    if param in FOLDED_PARAMS:
+        return ' '.join(value.split()).lower()
+    return value
+
+
+def page_key(request, view_name, params, depends_on):
+    query = '&'.join(
+        f'{param}={normalize(param, request.GET.get(param, ""))}'
+        for param in params
+        if request.GET.get(param, '').strip()
+    )
+    raw = '|'.join([request.path, query] + get_versions(depends_on))
+    digest = hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+    return f'{KEY_PREFIX}:page:{view_name}:{digest}'
+
+
+def record(view_name, outcome):
+    key = _stats_key(view_name, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_stats(view_names):
+    keys = {
+        (view_name, outcome): _stats_key(view_name, outcome)
+        for view_name in view_names
+        for outcome in ('hit', 'miss')
+    }
+    found = cache.get_many(keys.values())
+    return {
+        view_name: {
+            'hits': found.get(keys[(view_name, 'hit')], 0),
+            'misses': found.get(keys[(view_name, 'miss')], 0),
+        }
+        for view_name in view_names
+    }
+
+
+def reset_stats(view_names):
+    cache.delete_many([
+        _stats_key(view_name, outcome)
+        for view_name in view_names
+        for outcome in ('hit', 'miss')
+    ])
+
+
+# Views wrapped with cache_anonymous_page, for reporting.
+CACHED_VIEWS = []
+
+
+def _lookup(request, view_name, params, depends_on):
+    """
+    ``(key, cached response or None, refill from the primary)`` for an
+    anonymous GET; the last is true after a recent ``invalidate`` of
+    something the page depends on (see ``jobs.routers``).
+    """
+    key = page_key(request, view_name, params, depends_on)
+    cached = cache.get(key)
+    if cached is None:
+        record(view_name, 'miss')
+        return key, None, routers.held(*(_version_key(name) for name in depends_on))
+    record(view_name, 'hit')
+    content, content_type = cached
+    response = HttpResponse(content, content_type=content_type)
+    response['X-Page-Cache'] = 'hit'
+    return key, response, False
+
+
+def _store(key, response):
+    if response.status_code == 200 and not response.streaming:
+        cache.set(
+            key,
+            (response.content, response['Content-Type']),
+            getattr(settings, 'PAGE_CACHE_TIMEOUT', 300),
+        )
+    response['X-Page-Cache'] = 'miss'
+    return response
+
+
+def cache_anonymous_page(view_name, depends_on=(JOBS,), params=()):
+    """
+    Cache successful anonymous GET responses of a view.
+
+    Only the query parameters in ``params`` are part of the key, and the
+    free-text ones are trimmed and lowercased, so ``?q=Python`` and
+    ``?q= python&utm=x`` share an entry. Works on sync and async views; an async view and its
+    sync twin share entries and statistics.
+    """
+    if view_name not in CACHED_VIEWS:
+        CACHED_VIEWS.append(view_name)
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if (
+                    not getattr(settings, 'PAGE_CACHE_ENABLED', True)
+                    or request.method != 'GET'
+                    or (await request.auser()).is_authenticated
+                ):
+                    return await view(request, *args, **kwargs)
+
+                key, response, from_primary = await sync_to_async(_lookup)(request, view_name, params, depends_on)
+                if response is not None:
+                    return response
+                with routers.primary_reads(from_primary):
+                    response = await view(request, *args, **kwargs)
+                return await sync_to_async(_store)(key, response)
+
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (
+                not getattr(settings, 'PAGE_CACHE_ENABLED', True)
+                or request.method != 'GET'
+                or request.user.is_authenticated
+            ):
+                return view(request, *args, **kwargs)
+
+            key, response, from_primary = _lookup(request, view_name, params, depends_on)
+            if response is not None:
+                return response
+            with routers.primary_reads(from_primary):
+                response = view(request, *args, **kwargs)
+            return _store(key, response)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,341 @@
+"""
+Keyset (cursor) pagination.
+
+A page is addressed by the ordering values of the row it starts after, not
+by an offset, so page 500 costs the same indexed range scan as page 1. No
+``COUNT(*)`` is issued: one extra row is fetched to tell whether another
+page exists.
+
+Ordering columns must be non-null; a primary-key tie-breaker is appended
+automatically so cursors stay stable when timestamps collide.
+"""
+import base64
+import datetime
+import decimal
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+# RankedPaginator cursors: a ranked row, or one after the ranked rows.
+RANKED = 'r'
+REST = 'o'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _json_default(value):
+    # Full precision on purpose: DjangoJSONEncoder truncates microseconds,
+    # which would skip rows whose timestamps differ below a millisecond.
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(values, direction=NEXT):
+    payload = json.dumps({'v': values, 'd': direction}, default=_json_default, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        values, direction = payload['v'], payload['d']
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(cursor) from e
+    if not isinstance(values, list) or direction not in (NEXT, PREVIOUS):
+        raise InvalidCursor(cursor)
+    return values, direction
+
+
+class CursorPage:
+    def __init__(self, object_list, has_next, has_previous, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.next_url = None
+        self.previous_url = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class CursorPaginator:
+    """
+    Paginate ``queryset`` by ``ordering`` (``'-posted_at'`` style names).
+
+    Without an explicit ordering the queryset's own ``order_by()`` or the
+    model's ``Meta.ordering`` is used. Works with model instances and with
+    ``values()`` rows, so JSON endpoints can reuse it.
+    """
+
+    def __init__(self, queryset, ordering=None, page_size=None):
+        ordering = list(ordering or queryset.query.order_by or queryset.model._meta.ordering)
+        if not all(isinstance(name, str) for name in ordering):
+            raise ValueError("Cursor pagination only supports field-name ordering.")
+
+        names = [name.lstrip('-') for name in ordering]
+        if 'pk' not in names and queryset.model._meta.pk.attname not in names:
+            descending = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append('-pk' if descending else 'pk')
+
+        self.ordering = ordering
+        self.queryset = queryset.order_by(*ordering)
+        self.page_size = page_size or get_page_size()
+
+    def _field(self, name):
+        opts = self.queryset.model._meta
+        if name == 'pk':
+            return opts.pk
+        try:
+            return opts.get_field(name)
+        except FieldDoesNotExist:
+            # Annotation, e.g. a search rank.
+            return None
+
+    def _row_values(self, row):
+        values = []
+        for name in self.ordering:
+            name = name.lstrip('-')
+            values.append(row[name] if isinstance(row, dict) else getattr(row, name))
+        return values
+
+    def _parse_values(self, values):
+        if len(values) != len(self.ordering):
+            raise InvalidCursor(values)
+        parsed = []
+        for name, value in zip(self.ordering, values):
+            field = self._field(name.lstrip('-'))
+            try:
+                parsed.append(field.to_python(value) if field is not None else value)
+            except ValidationError as e:
+                raise InvalidCursor(values) from e
+        return parsed
+
+    def _keyset_filter(self, values, direction):
+        # (a, b, c) after (x, y, z) == a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, values):
+            field = name.lstrip('-')
+            descending = name.startswith('-')
+            if direction == PREVIOUS:
+                descending = not descending
+            condition |= equal & Q(**{f"{field}__{'lt' if descending else 'gt'}": value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def _query(self, cursor):
+        """The page's queryset, holding one extra row, and the cursor direction."""
+        if not cursor:
+            return self.queryset[:self.page_size + 1], None
+
+        values, direction = decode_cursor(cursor)
+        queryset = self.queryset.filter(self._keyset_filter(self._parse_values(values), direction))
+        if direction == PREVIOUS:
+            return queryset.reverse()[:self.page_size + 1], direction
+        return queryset[:self.page_size + 1], direction
+
+    def _page(self, rows, direction):
+        if direction == PREVIOUS:
+            has_previous = len(rows) > self.page_size
+            rows = rows[:self.page_size][::-1]
+            return self._make_page(rows, has_next=True, has_previous=has_previous)
+
+        has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        return self._make_page(rows, has_next=has_next, has_previous=direction == NEXT)
+
+    def page(self, cursor=None):
+        queryset, direction = self._query(cursor)
+        return self._page(list(queryset), direction)
+
+    async def apage(self, cursor=None):
+        queryset, direction = self._query(cursor)
+        return self._page([row async for row in queryset], direction)
+
+    def _make_page(self, rows, has_next, has_previous):
+        if not rows:
+            return CursorPage(rows, has_next=False, has_previous=has_previous)
+        return CursorPage(
+            rows,
+            has_next=has_next,
+            has_previous=has_previous,
+            next_cursor=encode_cursor(self._row_values(rows[-1]), NEXT) if has_next else None,
+            previous_cursor=encode_cursor(self._row_values(rows[0]), PREVIOUS) if has_previous else None,
+        )
+
+
+class RankedPaginator(CursorPaginator):
+    """
+    Paginate the rows of ``queryset`` in the order of ``ids`` (best first),
+    such as a recommendation list, then the rows not in ``ids`` in the
+    queryset's own order, so a filter never loses rows the list left out.
+    The cursor holds the rank of the row a page starts after, or its
+    ordering values once past the ranked rows. Model instances only.
+    """
+
+    def __init__(self, queryset, ids, page_size=None):
+        self.queryset = queryset
+        self.ids = list(ids)
+        self.ranks = {pk: rank for rank, pk in enumerate(self.ids)}
+        self.page_size = page_size or get_page_size()
+
+    @cached_property
+    def rest(self):
+        # Only built for pages that reach past the ranked rows.
+        return CursorPaginator(self.queryset.exclude(pk__in=self.ids), page_size=self.page_size)
+
+    def _row_values(self, row):
+        if row.pk in self.ranks:
+            return [RANKED, self.ranks[row.pk]]
+        return [REST, *self.rest._row_values(row)]
+
+    def _parse_cursor(self, cursor):
+        """``(rank or None, rest ordering values or None, direction)``."""
+        if not cursor:
+            return None, None, None
+        values, direction = decode_cursor(cursor)
+        if values[:1] == [RANKED] and len(values) == 2 and type(values[1]) is int:
+            return values[1], None, direction
+        if values[:1] == [REST]:
+            return None, self.rest._parse_values(values[1:]), direction
+        raise InvalidCursor(cursor)
+
+    def _matched(self):
+        return self.queryset.filter(pk__in=self.ids).values_list('pk', flat=True)
+
+    def _plan(self, matched, after, values, direction):
+        """
+        Ranks to show, in query direction, and the query for the rest of the
+        page (None when the page holds ranked rows only). Going back from
+        the unranked rows, the ranks are a superset: trim them with
+        ``_fill`` once the rest is known.
+        """
+        limit = self.page_size + 1
+        ranks = sorted(self.ranks[pk] for pk in matched)
+        if direction == PREVIOUS:
+            if values is None:
+                return [rank for rank in reversed(ranks) if rank < after][:limit], None
+            rest = self.rest.queryset.filter(self.rest._keyset_filter(values, PREVIOUS)).reverse()
+            return ranks[::-1][:limit], rest[:limit]
+
+        if values is not None:
+            return [], self.rest.queryset.filter(self.rest._keyset_filter(values, NEXT))[:limit]
+        ranks = [rank for rank in ranks if after is None or rank > after][:limit]
+        return ranks, self.rest.queryset[:limit - len(ranks)] if len(ranks) < limit else None
+
+    def _fill(self, ranks, rest_rows, direction):
+        if direction == PREVIOUS and rest_rows is not None:
+            return ranks[:self.page_size + 1 - len(rest_rows)]
+        return ranks
+
+    def _rows(self, ranks):
+        return self.queryset.filter(pk__in=[self.ids[rank] for rank in ranks])
+
+    def _in_order(self, ranks, ranked_rows, rest_rows, direction):
+        by_pk = {row.pk: row for row in ranked_rows}
+        ranked = [by_pk[self.ids[rank]] for rank in ranks if self.ids[rank] in by_pk]
+        if direction == PREVIOUS:
+            return (rest_rows or []) + ranked
+        return ranked + (rest_rows or [])
+
+    def page(self, cursor=None):
+        after, values, direction = self._parse_cursor(cursor)
+        ranks, rest = self._plan(set(self._matched()), after, values, direction)
+        rest_rows = list(rest) if rest is not None else None
+        ranks = self._fill(ranks, rest_rows, direction)
+        ranked_rows = list(self._rows(ranks)) if ranks else []
+        return self._page(self._in_order(ranks, ranked_rows, rest_rows, direction), direction)
+
+    async def apage(self, cursor=None):
+        after, values, direction = self._parse_cursor(cursor)
+        ranks, rest = self._plan({pk async for pk in self._matched()}, after, values, direction)
+        rest_rows = [row async for row in rest] if rest is not None else None
+        ranks = self._fill(ranks, rest_rows, direction)
+        ranked_rows = [row async for row in self._rows(ranks)] if ranks else []
+        return self._page(self._in_order(ranks, ranked_rows, rest_rows, direction), direction)
+
+
+def get_page_size(request=None):
+    default = getattr(settings, 'PAGINATION_PAGE_SIZE', 20)
+    maximum = getattr(settings, 'PAGINATION_MAX_PAGE_SIZE', 100)
+    if request is None:
+        return default
+    try:
+        size = int(request.GET.get('page_size', default))
+    except ValueError:
+        return default
+    return max(1, min(size, maximum))
+
+
+def _page_url(request, param, cursor):
+    query = request.GET.copy()
+    query[param] = cursor
+    return f"?{query.urlencode()}"
+
+
+def _add_urls(request, param, page):
+    if page.has_next:
+        page.next_url = _page_url(request, param, page.next_cursor)
+    if page.has_previous and page.previous_cursor:
+        page.previous_url = _page_url(request, param, page.previous_cursor)
+    return page
+
+
+def _paginate(request, paginator, param):
+    try:
+        page = paginator.page(request.GET.get(param))
+    except InvalidCursor:
+        page = paginator.page()
+    return _add_urls(request, param, page)
+
+
+async def _apaginate(request, paginator, param):
+    try:
+        page = await paginator.apage(request.GET.get(param))
+    except InvalidCursor:
+        page = await paginator.apage()
+    return _add_urls(request, param, page)
+
+
+def paginate(request, queryset, ordering=None, page_size=None, param='cursor'):
+    """
+    Return the ``CursorPage`` for ``request``, with ``next_url`` and
+    ``previous_url`` that keep the other query parameters. A malformed
+    cursor falls back to the first page.
+    """
+    paginator = CursorPaginator(queryset, ordering, page_size or get_page_size(request))
+    return _paginate(request, paginator, param)
+
+
+async def apaginate(request, queryset, ordering=None, page_size=None, param='cursor'):
+    """``paginate`` for async views."""
+    paginator = CursorPaginator(queryset, ordering, page_size or get_page_size(request))
+    return await _apaginate(request, paginator, param)
+
+
+def paginate_ranked(request, queryset, ids, page_size=None, param='cursor'):
+    """``paginate`` in the order of ``ids``; see ``RankedPaginator``."""
+    paginator = RankedPaginator(queryset, ids, page_size or get_page_size(request))
+    return _paginate(request, paginator, param)
+
+
+async def apaginate_ranked(request, queryset, ids, page_size=None, param='cursor'):
+    """``paginate_ranked`` for async views."""
+    paginator = RankedPaginator(queryset, ids, page_size or get_page_size(request))
+    return await _apaginate(request, paginator, param)
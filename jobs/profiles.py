@@ -0,0 +1,32 @@
+"""
+Per-user cache of ``Profile`` rows.
+
+The ``user_profile`` context processor renders the navbar avatar on every
+page, so the profile is cached per user and dropped from ``jobs.signals``
+whenever it is saved or deleted.
+"""
+from django.core.cache import cache
+
+from .models import Profile
+
+PROFILE_CACHE_TIMEOUT = 60 * 60
+
+
+def profile_cache_key(user_id):
+    return f'jobs:profile:{user_id}'
+
+
+def get_profile(user):
+    key = profile_cache_key(user.pk)
+    profile = cache.get(key)
+    if profile is None:
+        # Profiles are created with the user (jobs.signals); get_or_create
+        # only covers accounts that predate that.
+        profile, _ = Profile.objects.get_or_create(user_id=user.pk)
+        cache.set(key, profile, PROFILE_CACHE_TIMEOUT)
+    profile.user = user
+    return profile
+
+
+def invalidate_profile(user_id):
+    cache.delete(profile_cache_key(user_id))
@@ -0,0 +1,346 @@
+"""
+Keyword search over the text of applicants' resumes.
+
+``process_resumes`` reads resume PDFs back from upload storage, extracts
+their text (with ``pypdf``, or ``settings.RESUME_TEXT_EXTRACTOR``),
+normalizes it into keywords and known skills and stores the result in
+``ResumeText``. ``ResumeText.source`` records which stored file a row was
+read from, so each run only picks up applications whose resume is new or
+was replaced; a file that could not be read is not tried again until it
+changes (or ``--retry-failed``).
+
+Keywords are indexed in the ``jobs_resume_search`` side table: FTS5 on
+SQLite, a tsvector column with a GIN index on PostgreSQL, and a plain
+``icontains`` over ``ResumeText`` anywhere else. Queries are normalized
+the same way, so "React.js" finds "ReactJS" and "c++" finds "C++".
+"""
+import io
+import logging
+import re
+import unicodedata
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from . import uploads
+from .models import JobApplication, ResumeText
+from .search import tokenize
+
+logger = logging.getLogger(__name__)
+
+DONE = 'done'
+FAILED = 'failed'
+
+MAX_TEXT_CHARS = 200_000
+MAX_KEYWORDS = 5_000
+
+# Skills written with symbols that ``tokenize`` would split or drop.
+SYMBOL_SKILLS = {
+    'c++': 'cpp', 'c#': 'csharp', 'f#': 'fsharp', '.net': 'dotnet',
+    'node.js': 'nodejs', 'react.js': 'react', 'vue.js': 'vue', 'next.js': 'nextjs',
+}
+SYMBOL_RE = re.compile(
+    r'(?<![\w.+#])(' + '|'.join(re.escape(symbol) for symbol in SYMBOL_SKILLS) + r')(?![\w+#])',
+    re.IGNORECASE,
+)
+SKILL_ALIASES = {
+    'js': 'javascript', 'ts': 'typescript', 'py': 'python', 'golang': 'go',
+    'reactjs': 'react', 'vuejs': 'vue', 'node': 'nodejs', 'angularjs': 'angular',
+    'postgres': 'postgresql', 'psql': 'postgresql', 'mongo': 'mongodb',
+    'k8s': 'kubernetes', 'ml': 'machinelearning', 'powerpoint': 'ppt',
+}
+# Multi-word skills, indexed as one more term next to their words.
+PHRASE_SKILLS = {
+    ('machine', 'learning'): 'machinelearning',
+    ('data', 'analysis'): 'dataanalysis',
+    ('power', 'bi'): 'powerbi',
+    ('amazon', 'web', 'services'): 'aws',
+    ('google', 'cloud'): 'gcp',
+    ('customer', 'service'): 'customerservice',
+    ('project', 'management'): 'projectmanagement',
+}
+KNOWN_SKILLS = frozenset('''
+    python django flask fastapi javascript typescript react vue angular nodejs nextjs
+    java kotlin swift cpp csharp fsharp dotnet go rust php laravel ruby rails
+    sql postgresql mysql sqlite mongodb redis elasticsearch
+    aws azure gcp docker kubernetes linux git terraform
+    html css tailwind figma photoshop illustrator seo
+    excel ppt tally accounting auditing bookkeeping taxation
+    machinelearning dataanalysis powerbi tableau pandas numpy
+    testing selenium communication leadership negotiation sales marketing
+    customerservice projectmanagement
+'''.split())
+STOPWORDS = frozenset('''
+    a an and are as at be by for from has have in into is it its of on or that the
+    to was were with i me my we our you your he she they their this will
+'''.split())
+
+
+# ==========================
+# TEXT
+# ==========================
+class PypdfExtractor:
+    name = 'pypdf'
+
+    def extract(self, data):
+        from pypdf import PdfReader
+
+        reader = PdfReader(io.BytesIO(data))
+        return '\n'.join(page.extract_text() or '' for page in reader.pages)
+
+
+def get_extractor():
+    """An instance of ``settings.RESUME_TEXT_EXTRACTOR``, else of ``PypdfExtractor``."""
+    path = getattr(settings, 'RESUME_TEXT_EXTRACTOR', None)
+    return import_string(path)() if path else PypdfExtractor()
+
+
+def normalize(text):
+    """Lower-case terms of ``text``, with each skill spelled one way."""
+    text = unicodedata.normalize('NFKC', text or '')
+    text = SYMBOL_RE.sub(lambda match: f" {SYMBOL_SKILLS[match.group(1).lower()]} ", text)
+    tokens = [SKILL_ALIASES.get(token, token) for token in tokenize(text)]
+    terms = []
+    for i, token in enumerate(tokens):
+        terms.append(token)
+        for size in (2, 3):
+            phrase = PHRASE_SKILLS.get(tuple(tokens[i + 1 - size:i + 1])) if i + 1 >= size else None
+            if phrase:
+                terms.append(phrase)
+    return terms
+
+
+def keywords(terms):
+    """Distinct searchable ``terms``, in order of first appearance."""
+    kept = dict.fromkeys(
+        term for term in terms
+        if term not in STOPWORDS and not term.isdigit() and (len(term) > 1 or term in KNOWN_SKILLS)
+    )
+    return list(kept)[:MAX_KEYWORDS]
+
+
+def read(application, extractor, uploader):
+    """An unsaved ``ResumeText`` for ``application``; runs on worker threads."""
+    field = JobApplication._meta.get_field('resume')
+    row = ResumeText(application_id=application.pk, source=field.get_prep_value(application.resume))
+    try:
+        text = extractor.extract(uploader.download(application.resume, field))
+    except Exception as e:
+        logger.warning("Could not read the resume of application %s.", application.pk, exc_info=True)
+        row.status, row.error = FAILED, repr(e)
+        return row
+
+    terms = keywords(normalize(text))
+    row.status = DONE
+    row.text = text[:MAX_TEXT_CHARS]
+    row.keywords = ' '.join(terms)
+    row.skills = ' '.join(term for term in terms if term in KNOWN_SKILLS)
+    return row
+
+
+# ==========================
+# INDEX
+# ==========================
+class LikeIndex:
+    """No side table: ``icontains`` over ``ResumeText.keywords``."""
+
+    name = 'like'
+
+    def create(self, cursor):
+        pass
+
+    def drop(self, cursor):
+        pass
+
+    def update(self, cursor, rows):
+        pass
+
+    def remove(self, cursor, application_ids):
+        pass
+
+    def rebuild(self, cursor):
+        pass
+
+    def matching(self, terms):
+        condition = Q(resume_text__status=DONE)
+        for term in terms:
+            condition &= Q(resume_text__keywords__icontains=term)
+        return condition
+
+
+class SqliteFTSIndex(LikeIndex):
+    name = 'sqlite_fts5'
+    table = 'jobs_resume_search'
+
+    def create(self, cursor):
+        # rowid is the application id.
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+            f"skills, keywords, tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def update(self, cursor, rows):
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {self.table} (rowid, skills, keywords) VALUES (%s, %s, %s)",
+            [[row.application_id, row.skills, row.keywords] for row in rows],
+        )
+
+    def remove(self, cursor, application_ids):
+        cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", [[pk] for pk in application_ids])
+
+    def rebuild(self, cursor):
+        cursor.execute(f"DELETE FROM {self.table}")
+        cursor.execute(
+            f"INSERT INTO {self.table} (rowid, skills, keywords) "
+            f"SELECT application_id, skills, keywords FROM jobs_resumetext WHERE status = %s",
+            [DONE],
+        )
+        cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+
+    def matching(self, terms):
+        match = ' AND '.join(f'"{term}"*' for term in terms)
+        return Q(pk__in=RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [match]))
+
+
+class PostgresIndex(LikeIndex):
+    name = 'postgres_tsvector'
+    table = 'jobs_resume_search'
+    # Terms are already normalized; 'simple' keeps skill names as they are.
+    config = 'simple'
+
+    def create(self, cursor):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            f"application_id bigint PRIMARY KEY REFERENCES jobs_jobapplication (id) "
+            f"ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            f"document tsvector NOT NULL)"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_document_gin "
+            f"ON {self.table} USING GIN (document)"
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def document_sql(self, skills, keywords):
+        return (
+            f"setweight(to_tsvector('{self.config}', {skills}), 'A') || "
+            f"to_tsvector('{self.config}', {keywords})"
+        )
+
+    def update(self, cursor, rows):
+        cursor.executemany(
+            f"INSERT INTO {self.table} (application_id, document) "
+            f"VALUES (%s, {self.document_sql('%s', '%s')}) "
+            f"ON CONFLICT (application_id) DO UPDATE SET document = EXCLUDED.document",
+            [[row.application_id, row.skills, row.keywords] for row in rows],
+        )
+
+    def remove(self, cursor, application_ids):
+        cursor.execute(f"DELETE FROM {self.table} WHERE application_id = ANY(%s)", [list(application_ids)])
+
+    def rebuild(self, cursor):
+        cursor.execute(f"TRUNCATE {self.table}")
+        cursor.execute(
+            f"INSERT INTO {self.table} (application_id, document) "
+            f"SELECT application_id, {self.document_sql('skills', 'keywords')} "
+            f"FROM jobs_resumetext WHERE status = %s",
+            [DONE],
+        )
+
+    def matching(self, terms):
+        match = ' & '.join(f"{term}:*" for term in terms)
+        return Q(pk__in=RawSQL(
+            f"SELECT application_id FROM {self.table} "
+            f"WHERE document @@ to_tsquery('{self.config}', %s)",
+            [match],
+        ))
+
+
+def get_index(conn=None):
+    """Return the resume index matching the database vendor."""
+    vendor = (conn or connection).vendor
+    if vendor == 'sqlite':
+        return SqliteFTSIndex()
+    if vendor == 'postgresql':
+        return PostgresIndex()
+    return LikeIndex()
+
+
+def matching(query):
+    """Filter for ``JobApplication`` querysets: resumes containing every word of ``query``."""
+    terms = keywords(normalize(query))
+    if not terms:
+        return Q(pk__in=[])
+    return get_index().matching(terms)
+
+
+def remove(application_id):
+    with connection.cursor() as cursor:
+        get_index().remove(cursor, [application_id])
+
+
+def rebuild_index():
+    index = get_index()
+    with connection.cursor() as cursor:
+        index.rebuild(cursor)
+    return index
+
+
+# ==========================
+# PIPELINE
+# ==========================
+def pending(retry_failed=False):
+    """Applications whose resume was never read, or was replaced since."""
+    applications = JobApplication.objects.exclude(resume__isnull=True).exclude(resume='')
+    changed = ~Q(resume_text__source=F('resume')) | Q(resume_text__isnull=True)
+    if retry_failed:
+        changed |= Q(resume_text__status=FAILED)
+    return applications.filter(changed)
+
+
+def store(rows):
+    """Save the ``read`` results and bring the index in line, in one transaction."""
+    with transaction.atomic():
+        ResumeText.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['application'],
+            update_fields=['source', 'status', 'error', 'text', 'skills', 'keywords', 'processed_at'],
+        )
+        index = get_index()
+        with connection.cursor() as cursor:
+            index.update(cursor, [row for row in rows if row.status == DONE])
+            index.remove(cursor, [row.application_id for row in rows if row.status != DONE])
+
+
+def run(workers=4, batch_size=50, retry_failed=False, extractor=None, uploader=None):
+    """
+    Read every pending resume, ``batch_size`` at a time. Downloads and
+    extraction run on at most ``workers`` threads; each batch is saved
+    from the calling thread. Returns a ``Counter`` of statuses.
+    """
+    extractor = extractor or get_extractor()
+    uploader = uploader or uploads.get_uploader()
+    totals = Counter()
+    last_id = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            batch = list(
+                pending(retry_failed).filter(pk__gt=last_id).order_by('pk').only('pk', 'resume')[:batch_size]
+            )
+            if not batch:
+                return totals
+            last_id = batch[-1].pk
+            rows = list(pool.map(lambda application: read(application, extractor, uploader), batch))
+            store(rows)
+            totals.update(row.status for row in rows)
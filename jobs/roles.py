@@ -0,0 +1,43 @@
+"""
+Per-user cache of ``UserProfile.role``.
+
+Permission checks (only job seekers may apply) read the role from the
+cache instead of querying ``UserProfile`` every time. The entry is
+dropped from ``jobs.signals`` whenever the profile is saved or deleted,
+and the role is kept on the user object for the rest of the request.
+"""
+from django.core.cache import cache
+
+from .models import UserProfile
+
+JOBSEEKER = 'jobseeker'
+EMPLOYER = 'employer'
+
+ROLE_CACHE_TIMEOUT = 60 * 60
+
+
+def role_cache_key(user_id):
+    return f'jobs:role:{user_id}'
+
+
+def get_role(user):
+    """``user``'s role, or None when anonymous or without a ``UserProfile``."""
+    if not user.is_authenticated:
+        return None
+    if not hasattr(user, '_role'):
+        key = role_cache_key(user.pk)
+        role = cache.get(key)
+        if role is None:
+            role = UserProfile.objects.filter(user_id=user.pk).values_list('role', flat=True).first()
+            if role is not None:
+                cache.set(key, role, ROLE_CACHE_TIMEOUT)
+        user._role = role
+    return user._role
+
+
+def has_role(user, role):
+    return get_role(user) == role
+
+
+def invalidate_role(user_id):
+    cache.delete(role_cache_key(user_id))
@@ -0,0 +1,204 @@
+"""
+Read-replica routing.
+
+With ``REPLICA_DATABASE_URLS`` set, settings add one ``replicaN`` database
+per URL and install ``ReplicaRouter``. Reads go to a random replica that
+is reachable; writes, and every read in a request after its first write,
+go to ``default``. ``PrimaryPinningMiddleware`` also sends every read of
+non-GET requests to the primary and, after a request wrote, sets a short
+cookie so the following requests (the redirect after ``apply_job`` to
+``my_jobs``, a login) read their own writes while replicas catch up.
+
+Shared caches (pages, fragments, facet counts) are refilled by whichever
+request misses next, usually someone else's. ``hold_reads_on_primary``,
+called when one is invalidated, marks it for the same window; the code
+that refills it checks ``held`` and does the refill inside
+``primary_reads``, so a lagging replica cannot put the old rows back in
+the cache for the whole cache timeout. Every other read keeps going to
+the replicas.
+
+A replica that cannot be connected to is skipped for
+``REPLICA_RETRY_SECONDS``; with none left, reads fall back to the
+primary.
+"""
+import contextlib
+import contextvars
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = 'primary_pin'
+HOLD_KEY_PREFIX = 'replicas:primary_until'
+
+
+class RequestState:
+    def __init__(self, pinned=False):
+        # Reads go to the primary: the request is not a GET, carried the
+        # cookie, or has written.
+        self.pinned = pinned
+        self.wrote = False
+
+
+_state = contextvars.ContextVar('replica_request_state', default=None)
+# Set inside primary_reads(); per task and thread, like _state.
+_primary_reads = contextvars.ContextVar('replica_primary_reads', default=False)
+
+# Replica alias -> time.monotonic() until which it is not tried again.
+_down_until = {}
+
+
+def replicas():
+    return list(getattr(settings, 'REPLICA_DATABASES', ()))
+
+
+def mark_down(alias):
+    _down_until[alias] = time.monotonic() + getattr(settings, 'REPLICA_RETRY_SECONDS', 30)
+
+
+def is_available(alias):
+    if _down_until.get(alias, 0) > time.monotonic():
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        logger.warning("Read replica %s is unreachable; reading from the primary.", alias, exc_info=True)
+        mark_down(alias)
+        return False
+    _down_until.pop(alias, None)
+    return True
+
+
+def pin():
+    """Send the remaining reads of this request to the primary."""
+    state = _state.get()
+    if state is not None:
+        state.pinned = state.wrote = True
+
+
+def pin_seconds():
+    return getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+
+
+def _hold_key(name):
+    return f'{HOLD_KEY_PREFIX}:{name}'
+
+
+def hold_reads_on_primary(*names):
+    """Refill the caches ``names`` from the primary for a while; see the module docstring."""
+    if replicas():
+        until = time.time() + pin_seconds()
+        cache.set_many({_hold_key(name): until for name in names}, pin_seconds())
+
+
+def _held(found):
+    now = time.time()
+    return any(until > now for until in found.values())
+
+
+def held(*names):
+    """Whether any of the caches ``names`` was invalidated within ``REPLICA_PIN_SECONDS``."""
+    return bool(replicas()) and _held(cache.get_many([_hold_key(name) for name in names]))
+
+
+async def aheld(*names):
+    return bool(replicas()) and _held(await cache.aget_many([_hold_key(name) for name in names]))
+
+
+@contextlib.contextmanager
+def primary_reads(active=True):
+    """Send the reads in this block to the primary, if ``active``."""
+    token = _primary_reads.set(True) if active else None
+    try:
+        yield
+    finally:
+        if token is not None:
+            _primary_reads.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (
+            _primary_reads.get()
+            or (state is not None and state.pinned)
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        candidates = replicas()
+        random.shuffle(candidates)
+        for alias in candidates:
+            if is_available(alias):
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *replicas()}
+        return obj1._state.db in pool and obj2._state.db in pool
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are copies of the primary, migrated by replication.
+        return db not in replicas()
+
+
+class PrimaryPinningMiddleware:
+    """Goes before SessionMiddleware, so a session save counts as a write."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state, token = self.start(request, self.pinned(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        # The async ORM runs queries in a thread with a copy of this
+        # context, so the router sees, and pins, the same state.
+        state, token = self.start(request, self.pinned(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(state, response)
+
+    def pinned(self, request):
+        return request.method not in ('GET', 'HEAD') or PIN_COOKIE in request.COOKIES
+
+    def start(self, request, pinned):
+        state = RequestState(pinned=pinned)
+        return state, _state.set(state)
+
+    def finish(self, state, response):
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=pin_seconds(),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,75 @@
+"""
+Parsing and formatting of job salaries.
+
+Salaries used to be free text. ``parse_salary`` turns the common shapes
+("50000", "Rs. 40,000 - 60,000", "NPR 5 lakh per annum", "$20/hr", "30k")
+into ``Job`` salary fields for the job form and the importer (migration
+0021 keeps its own copy). Text it cannot read ("Negotiable") parses to
+``None`` and is kept as the job's ``salary_note``.
+"""
+import re
+
+DEFAULT_CURRENCY = 'NPR'
+DEFAULT_PERIOD = 'month'
+
+CURRENCY_ALIASES = (
+    ('NPR', ('npr', 'nrs', 'rs', 'रु')),
+    ('INR', ('inr', '₹')),
+    ('USD', ('usd', '$')),
+    ('EUR', ('eur', '€')),
+)
+PERIOD_ALIASES = (
+    ('hour', ('hour', 'hr', 'hourly')),
+    ('day', ('day', 'daily')),
+    ('week', ('week', 'wk', 'weekly')),
+    ('month', ('month', 'mo', 'monthly', 'pm')),
+    ('year', ('year', 'yr', 'annum', 'annual', 'annually', 'pa', 'yearly')),
+)
+MULTIPLIERS = {'k': 1_000, 'lakh': 100_000, 'lakhs': 100_000, 'lac': 100_000, 'm': 1_000_000}
+
+AMOUNT_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*(k|lakhs?|lac|m)?\b', re.IGNORECASE)
+WORD_RE = re.compile(r'[a-z]+|[$₹€]|रु', re.IGNORECASE)
+
+
+def _lookup(words, aliases):
+    for value, names in aliases:
+        if any(name in words for name in names):
+            return value
+    return None
+
+
+def parse_salary(text):
+    """
+    ``{'salary_min', 'salary_max', 'salary_currency', 'salary_period'}``
+    for ``text``, or ``None`` when it holds no amount. A single amount is
+    both the minimum and the maximum.
+    """
+    text = (text or '').strip()
+    matches = AMOUNT_RE.findall(text)[:2]
+    if not matches:
+        return None
+    amounts = [
+        round(float(number.replace(',', '')) * MULTIPLIERS.get(unit.lower(), 1))
+        for number, unit in matches
+    ]
+    # "20-30k" means 20k to 30k: a bare first amount takes the second's unit.
+    if len(matches) == 2 and not matches[0][1] and matches[1][1] and amounts[0] < amounts[1] / 100:
+        amounts[0] *= MULTIPLIERS[matches[1][1].lower()]
+
+    words = {word.lower() for word in WORD_RE.findall(text)}
+    return {
+        'salary_min': min(amounts),
+        'salary_max': max(amounts),
+        'salary_currency': _lookup(words, CURRENCY_ALIASES) or DEFAULT_CURRENCY,
+        'salary_period': _lookup(words, PERIOD_ALIASES) or DEFAULT_PERIOD,
+    }
+
+
+def format_salary(salary_min, salary_max, currency, period):
+    """"NPR 40,000 - 60,000 / month" (one amount when min and max match); '' without a salary."""
+    if salary_min is None and salary_max is None:
+        return ''
+    low = salary_min if salary_min is not None else salary_max
+    high = salary_max if salary_max is not None else salary_min
+    amount = f"{low:,}" if low == high else f"{low:,} - {high:,}"
+    return f"{currency} {amount} / {period}"
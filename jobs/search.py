@@ -0,0 +1,267 @@
+"""
+Full-text search over jobs.
+
+The index lives in the ``jobs_job_search`` side table and is kept in sync
+from ``jobs.signals``. SQLite uses an FTS5 virtual table, PostgreSQL a
+tsvector column with a GIN index; anything else falls back to the old
+``icontains`` scan.
+"""
+import abc
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+INDEXED_FIELDS = ('title', 'company_name', 'location', 'description', 'requirements')
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+class LikeBackend:
+    """The original ``icontains`` search, kept as a fallback and for benchmarks."""
+
+    name = 'like'
+
+    def create(self, cursor):
+        pass
+
+    def drop(self, cursor):
+        pass
+
+    def index_job(self, cursor, job):
+        pass
+
+    def index_jobs(self, cursor, jobs):
+        for job in jobs:
+            self.index_job(cursor, job)
+
+    def remove_job(self, cursor, job_id):
+        pass
+
+    def rebuild(self, cursor):
+        pass
+
+    def search(self, queryset, query='', location=''):
+        if query:
+            queryset = queryset.filter(
+                Q(title__icontains=query) |
+                Q(company_name__icontains=query)
+            )
+        if location:
+            queryset = queryset.filter(location__icontains=location)
+        return queryset
+
+
+class IndexBackend(LikeBackend, abc.ABC):
+    """
+    Shared query shape for the side-table backends.
+
+    ``JobSearchIndex`` maps the side table so the ORM can join it; the
+    match condition and rank are vendor SQL written against the table
+    name, which is also the join alias.
+    """
+
+    table = 'jobs_job_search'
+
+    @abc.abstractmethod
+    def build_query(self, query, location):
+        pass
+
+    @abc.abstractmethod
+    def match(self, match):
+        pass
+
+    @abc.abstractmethod
+    def rank(self, match):
+        pass
+
+    def search(self, queryset, query='', location=''):
+        match = self.build_query(query, location)
+        if not match:
+            return super().search(queryset, query, location)
+
+        return queryset.filter(
+            search_index__isnull=False,
+        ).filter(
+            self.match(match)
+        ).annotate(
+            search_rank=self.rank(match)
+        ).order_by('search_rank', '-posted_at')
+
+
+class SqliteFTSBackend(IndexBackend):
+    name = 'sqlite_fts5'
+
+    # bm25 column weights, job_id first.
+    weights = (0.0, 10.0, 6.0, 4.0, 1.0, 1.0)
+
+    def create(self, cursor):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+            f"job_id UNINDEXED, {', '.join(INDEXED_FIELDS)}, "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def index_job(self, cursor, job):
+        self.index_jobs(cursor, [job])
+
+    def index_jobs(self, cursor, jobs):
+        # rowid mirrors job_id so deletes and replaces are rowid lookups.
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {self.table} (rowid, job_id, {', '.join(INDEXED_FIELDS)}) "
+            f"VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            [[job.pk, job.pk] + [getattr(job, field) or '' for field in INDEXED_FIELDS] for job in jobs],
+        )
+
+    def remove_job(self, cursor, job_id):
+        cursor.execute(f"DELETE FROM {self.table} WHERE rowid = %s", [job_id])
+
+    def rebuild(self, cursor):
+        columns = ', '.join(INDEXED_FIELDS)
+        coalesced = ', '.join(f"COALESCE({field}, '')" for field in INDEXED_FIELDS)
+        cursor.execute(f"DELETE FROM {self.table}")
+        cursor.execute(
+            f"INSERT INTO {self.table} (rowid, job_id, {columns}) "
+            f"SELECT id, id, {coalesced} FROM jobs_job"
+        )
+        cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+
+    def build_query(self, query, location):
+        terms = [f'"{token}"*' for token in tokenize(query)]
+        location_terms = [f'"{token}"*' for token in tokenize(location)]
+        if location_terms:
+            terms.append(f"location : ({' AND '.join(location_terms)})")
+        return ' AND '.join(terms)
+
+    def match(self, match):
+        return RawSQL(f"{self.table} MATCH %s", [match], output_field=BooleanField())
+
+    def rank(self, match):
+        # bm25() is negative; lower means a better match.
+        weights = ', '.join(str(weight) for weight in self.weights)
+        return RawSQL(f"bm25({self.table}, {weights})", [], output_field=FloatField())
+
+
+class PostgresSearchBackend(IndexBackend):
+    name = 'postgres_tsvector'
+    config = 'english'
+
+    # Weight letter per indexed field; location gets its own letter so the
+    # location filter can be restricted to it.
+    field_weights = (
+        ('title', 'A'),
+        ('company_name', 'B'),
+        ('location', 'C'),
+        ('description', 'D'),
+        ('requirements', 'D'),
+    )
+
+    def document_sql(self, value):
+        # ``value`` is formatted with each field name, e.g. "%s" or "COALESCE({field}, '')".
+        return ' || '.join(
+            f"setweight(to_tsvector('{self.config}', {value.format(field=field)}), '{weight}')"
+            for field, weight in self.field_weights
+        )
+
+    def create(self, cursor):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            f"job_id bigint PRIMARY KEY REFERENCES jobs_job (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            f"document tsvector NOT NULL)"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_document_gin "
+            f"ON {self.table} USING GIN (document)"
+        )
+
+    def drop(self, cursor):
+        cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def index_job(self, cursor, job):
+        self.index_jobs(cursor, [job])
+
+    def index_jobs(self, cursor, jobs):
+        cursor.executemany(
+            f"INSERT INTO {self.table} (job_id, document) "
+            f"VALUES (%s, {self.document_sql('%s')}) "
+            f"ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document",
+            [[job.pk] + [getattr(job, field) or '' for field, _ in self.field_weights] for job in jobs],
+        )
+
+    def remove_job(self, cursor, job_id):
+        cursor.execute(f"DELETE FROM {self.table} WHERE job_id = %s", [job_id])
+
+    def rebuild(self, cursor):
+        document = self.document_sql("COALESCE({field}, '')")
+        cursor.execute(f"TRUNCATE {self.table}")
+        cursor.execute(f"INSERT INTO {self.table} (job_id, document) SELECT id, {document} FROM jobs_job")
+
+    def build_query(self, query, location):
+        terms = [f"{token}:*" for token in tokenize(query)]
+        terms += [f"{token}:*C" for token in tokenize(location)]
+        return ' & '.join(terms)
+
+    def match(self, match):
+        return RawSQL(
+            f"{self.table}.document @@ to_tsquery('{self.config}', %s)",
+            [match],
+            output_field=BooleanField(),
+        )
+
+    def rank(self, match):
+        # Negated so that, like bm25, lower sorts first.
+        return RawSQL(
+            f"-ts_rank({self.table}.document, to_tsquery('{self.config}', %s))",
+            [match],
+            output_field=FloatField(),
+        )
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (LikeBackend, SqliteFTSBackend, PostgresSearchBackend)
+}
+
+
+def get_backend(conn=None):
+    """Return the search backend matching the database vendor."""
+    vendor = (conn or connection).vendor
+    if vendor == 'sqlite':
+        return SqliteFTSBackend()
+    if vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return LikeBackend()
+
+
+def search_jobs(queryset, query='', location=''):
+    return get_backend().search(queryset, query=query, location=location)
+
+
+def index_job(job):
+    with connection.cursor() as cursor:
+        get_backend().index_job(cursor, job)
+
+
+def index_jobs(jobs):
+    with connection.cursor() as cursor:
+        get_backend().index_jobs(cursor, jobs)
+
+
+def remove_job(job_id):
+    with connection.cursor() as cursor:
+        get_backend().remove_job(cursor, job_id)
+
+
+def rebuild_index():
+    backend = get_backend()
+    with connection.cursor() as cursor:
+        backend.rebuild(cursor)
+    return backend
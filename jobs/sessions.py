@@ -0,0 +1,101 @@
+"""
+Session write reduction.
+
+Sessions are only saved when they change (``SESSION_SAVE_EVERY_REQUEST``
+is off). ``SlidingSessionMiddleware`` keeps active users signed in by
+extending a session once it is within ``SESSION_REFRESH_WINDOW`` seconds
+of expiring, so a busy user costs one session write per window instead
+of one per page view. ``prune_expired`` clears old rows in small batches
+for the database-backed engines.
+"""
+import time
+from importlib import import_module
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils import timezone
+
+# When the session was last saved, in epoch seconds.
+REFRESHED_KEY = '_refreshed_at'
+
+
+def refresh_window():
+    return getattr(settings, 'SESSION_REFRESH_WINDOW', settings.SESSION_COOKIE_AGE // 2)
+
+
+class SlidingSessionMiddleware:
+    """Must come after ``SessionMiddleware`` so it runs first on the response."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        session = getattr(request, 'session', None)
+        if session is None or session.is_empty():
+            return response
+
+        now = int(time.time())
+        refreshed = session.get(REFRESHED_KEY)
+        if needs_refresh(session, refreshed, session.get_expiry_age(), now):
+            # Marks the session modified, so SessionMiddleware saves it and
+            # sends a cookie with a fresh expiry.
+            session[REFRESHED_KEY] = now
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        session = getattr(request, 'session', None)
+        if session is None or session.is_empty():
+            return response
+
+        now = int(time.time())
+        refreshed = await session.aget(REFRESHED_KEY)
+        if needs_refresh(session, refreshed, await session.aget_expiry_age(), now):
+            await session.aset(REFRESHED_KEY, now)
+        return response
+
+
+def needs_refresh(session, refreshed, expiry_age, now):
+    return (
+        session.modified
+        or refreshed is None
+        or now - refreshed >= expiry_age - refresh_window()
+    )
+
+
+def get_session_model():
+    """The model behind ``SESSION_ENGINE``, or None for cookie/cache-only engines."""
+    store = import_module(settings.SESSION_ENGINE).SessionStore
+    if hasattr(store, 'get_model_class'):
+        return store.get_model_class()
+    return None
+
+
+def prune_expired(batch_size=5000, pause=0):
+    """
+    Delete expired sessions ``batch_size`` rows at a time, sleeping ``pause``
+    seconds between batches. Yields the number deleted per batch.
+    """
+    model = get_session_model()
+    if model is None:
+        return
+    while True:
+        keys = list(
+            model.objects.filter(expire_date__lt=timezone.now())
+            .values_list('session_key', flat=True)[:batch_size]
+        )
+        if not keys:
+            return
+        deleted, _ = model.objects.filter(session_key__in=keys).delete()
+        yield deleted
+        if pause:
+            time.sleep(pause)
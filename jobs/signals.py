@@ -1,17 +1,238 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile, Profile
+from .models import UserProfile, Profile, Job, JobApplication, Testimonial
+from . import application_counts, bulk, facets, feed, fragments, page_cache, profiles, resumes, roles, search, similarity, stats
 
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
-        UserProfile.objects.get_or_create(user=instance)
+def create_user_profiles(sender, instance, created, raw=False, **kwargs):
+    # One INSERT per table; a row that already exists is left alone.
+    if created and not raw:
+        UserProfile.objects.bulk_create([UserProfile(user=instance)], ignore_conflicts=True)
+        Profile.objects.bulk_create([Profile(user=instance)], ignore_conflicts=True)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    profiles.invalidate_profile(instance.user_id)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_cached_role(sender, instance, **kwargs):
+    roles.invalidate_role(instance.user_id)
+
+
+# ==========================
+# SEARCH INDEX
+# ==========================
+@receiver(post_save, sender=Job)
+def index_job(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_job(instance)
+
+
+@receiver(post_delete, sender=Job)
+def unindex_job(sender, instance, **kwargs):
+    search.remove_job(instance.pk)
+
+
+# ==========================
+# DASHBOARD STATISTICS
+# ==========================
+@receiver(post_init, sender=Job)
+@receiver(post_init, sender=JobApplication)
+@receiver(post_init, sender=Testimonial)
+def remember_counted_state(sender, instance, **kwargs):
+    stats.remember(instance)
+
+
+@receiver(pre_save, sender=Job)
+@receiver(pre_save, sender=JobApplication)
+@receiver(pre_save, sender=Testimonial)
+def read_counted_state(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    # Counters move by the change from what the row held before this save,
+    # so take that from the database rather than from a copy that may have
+    # been loaded before someone else's save.
+    stored = None if raw else stats.stored_copy(instance, using, update_fields)
+    if stored is not None:
+        stats.remember(instance, stored)
+        if sender is JobApplication:
+            application_counts.remember(instance, stored)
 
 
 @receiver(post_save, sender=User)
-def create_profile(sender, instance, created, **kwargs):
-    if created:
-        Profile.objects.get_or_create(user=instance)
+@receiver(post_save, sender=Job)
+@receiver(post_save, sender=JobApplication)
+@receiver(post_save, sender=Testimonial)
+def count_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        stats.record_save(instance, created)
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Job)
+@receiver(post_delete, sender=JobApplication)
+@receiver(post_delete, sender=Testimonial)
+def count_deleted(sender, instance, **kwargs):
+    stats.record_delete(instance)
+
+
+# ==========================
+# PER-JOB APPLICATION COUNTERS
+# ==========================
+@receiver(post_init, sender=JobApplication)
+def remember_counted_application(sender, instance, **kwargs):
+    application_counts.remember(instance)
+
+
+@receiver(post_save, sender=JobApplication)
+def count_saved_application(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        application_counts.record_save(instance, created)
+
+
+@receiver(post_delete, sender=JobApplication)
+def count_deleted_application(sender, instance, **kwargs):
+    application_counts.record_delete(instance)
+
+
+# ==========================
+# HOME PAGE FRAGMENTS
+# ==========================
+@receiver(post_init, sender=Job)
+def remember_featured(sender, instance, **kwargs):
+    instance._was_featured = instance.__dict__.get('featured', True)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_featured_jobs(sender, instance, **kwargs):
+    featured = instance.__dict__.get('featured', True)
+    if featured or instance._was_featured:
+        fragments.invalidate(fragments.HOME_FEATURED_JOBS)
+    instance._was_featured = featured
+
+
+@receiver(post_init, sender=Testimonial)
+def remember_approved(sender, instance, **kwargs):
+    instance._was_approved = instance.__dict__.get('is_approved', True)
+
+
+@receiver(post_save, sender=Testimonial)
+@receiver(post_delete, sender=Testimonial)
+def invalidate_testimonials(sender, instance, **kwargs):
+    approved = instance.__dict__.get('is_approved', True)
+    if approved or instance._was_approved:
+        fragments.invalidate(fragments.HOME_TESTIMONIALS)
+    instance._was_approved = approved
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_testimonial_photos(sender, instance, created, **kwargs):
+    if not created:
+        fragments.invalidate(fragments.HOME_TESTIMONIALS)
+
+
+# ==========================
+# ANONYMOUS PAGE CACHE
+# ==========================
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_pages(sender, instance, raw=False, **kwargs):
+    if not raw:
+        page_cache.invalidate(page_cache.JOBS)
+
+
+@receiver(post_save, sender=Testimonial)
+@receiver(post_delete, sender=Testimonial)
+@receiver(post_save, sender=Profile)
+def invalidate_testimonial_pages(sender, instance, raw=False, **kwargs):
+    if not raw:
+        page_cache.invalidate(page_cache.TESTIMONIALS)
+
+
+# ==========================
+# JOB LIST FACETS
+# ==========================
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_facets(sender, instance, raw=False, **kwargs):
+    if not raw:
+        facets.invalidate()
+
+
+# ==========================
+# SIMILAR JOBS
+# ==========================
+# Deleted jobs need nothing here: their vectors go with them (cascade),
+# and similar_jobs and the feed only show jobs that still exist.
+@receiver(post_init, sender=Job)
+def remember_vectorized_fields(sender, instance, **kwargs):
+    similarity.remember(instance)
+
+
+@receiver(post_save, sender=Job)
+def vectorize_job(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        similarity.index_job(instance, created, update_fields)
+
+
+# ==========================
+# PERSONAL FEED
+# ==========================
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+@receiver(post_save, sender=Profile)
+def invalidate_feed(sender, instance, raw=False, **kwargs):
+    # __dict__: a deferred user_id would be loaded from a row already deleted.
+    user_id = instance.__dict__.get('user_id')
+    if not raw and user_id is not None:
+        feed.invalidate(user_id)
+
+
+# ==========================
+# RESUME SEARCH
+# ==========================
+@receiver(post_delete, sender=JobApplication)
+def drop_resume_keywords(sender, instance, **kwargs):
+    resumes.remove(instance.pk)
+
+
+# ==========================
+# BULK CHANGES
+# ==========================
+@receiver(bulk.objects_updated)
+def bulk_updated(sender, values, previous, **kwargs):
+    stats.record_bulk_update(sender, values, previous)
+    if sender is JobApplication:
+        application_counts.record_bulk_update(values, previous)
+    elif sender is Job:
+        fragments.invalidate(fragments.HOME_FEATURED_JOBS)
+        page_cache.invalidate(page_cache.JOBS)
+        facets.invalidate()
+        if set(values) & set(search.INDEXED_FIELDS):
+            search.rebuild_index()
+        if set(values) & set(similarity.TEXT_FIELDS):
+            similarity.rebuild()
+        else:
+            similarity.invalidate(reload=True)
+    elif sender is Testimonial:
+        fragments.invalidate(fragments.HOME_TESTIMONIALS)
+        page_cache.invalidate(page_cache.TESTIMONIALS)
 
 
+@receiver(bulk.objects_created)
+def bulk_created(sender, objects, **kwargs):
+    stats.record_bulk_create(objects)
+    if sender is JobApplication:
+        application_counts.record_bulk_create(objects)
+        feed.invalidate(*{application.user_id for application in objects})
+    elif sender is Job:
+        search.index_jobs(objects)
+        similarity.index_jobs(objects)
+        if any(job.featured for job in objects):
+            fragments.invalidate(fragments.HOME_FEATURED_JOBS)
+        page_cache.invalidate(page_cache.JOBS)
+        facets.invalidate()
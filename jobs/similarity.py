@@ -0,0 +1,394 @@
+"""
+"Similar jobs" for ``job_detail``.
+
+Every job gets a hashed bag-of-words vector over its title, requirements,
+description and location: log-scaled term counts in ``DIMENSIONS``
+signed buckets, title and requirement words counting extra. Vectors are
+stored as float32 bytes in ``JobVector`` (2 KB a job) and rewritten from
+``jobs.signals`` when a job is created or a save changes its text or
+``is_active``; other saves leave the vector and the cache version alone.
+
+Each worker keeps the vectors of the active jobs in one NumPy matrix
+(``Index``) with inverse document frequencies and row norms, so the
+jobs most similar to one come from a single matrix-vector product. A
+cache version bumped on every write makes workers fetch the vectors
+written since their last sync and append them to the matrix (see
+``Index.updated``). A coarser ``listing_version`` only changes when the
+set of active jobs does; per-user feeds are keyed on that. Bulk changes force a full reload, built by one
+thread per worker while the others keep using the old index. Deleted
+jobs stay in the matrix until the next full reload and are dropped from
+results when the rows are loaded. ``rebuild_similar_jobs`` recomputes
+every vector.
+"""
+import collections
+import datetime
+import functools
+import math
+import threading
+import time
+import zlib
+
+import numpy as np
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Job, JobVector
+from .search import tokenize
+
+DIMENSIONS = 512
+FIELD_WEIGHTS = (('title', 3), ('requirements', 2), ('description', 1), ('location', 1))
+TEXT_FIELDS = tuple(field for field, _ in FIELD_WEIGHTS)
+# Saves that change none of these leave the vector as it is.
+TRACKED_FIELDS = TEXT_FIELDS + ('is_active',)
+
+SIMILAR_COUNT = 4
+
+VERSION_KEY = 'similar_jobs:version'
+RELOAD_KEY = 'similar_jobs:reload'
+# Bumped when jobs are created, opened or closed, or changed in bulk.
+LISTING_KEY = 'similar_jobs:listing'
+# Upper bound on how long a worker goes without a full reload.
+RELOAD_SECONDS = 60 * 60
+# Vectors written this long before a sync are fetched again by the next
+# one, in case they were not committed yet or worker clocks disagree.
+SYNC_OVERLAP = datetime.timedelta(seconds=60)
+
+
+@functools.lru_cache(maxsize=100_000)
+def _bucket(token):
+    digest = zlib.crc32(token.encode())
+    return digest % DIMENSIONS, 1.0 if digest & 0x80000000 else -1.0
+
+
+def vectorize(job):
+    """The raw (unweighted) float32 vector of ``job``'s text fields."""
+    return vectorize_fields({field: getattr(job, field) for field in TEXT_FIELDS})
+
+
+def vectorize_fields(texts):
+    """``vectorize`` for a ``{field: text}`` mapping; missing fields are empty."""
+    counts = collections.Counter()
+    for field, weight in FIELD_WEIGHTS:
+        prefix = 'location:' if field == 'location' else ''
+        for token in tokenize(texts.get(field)):
+            if len(token) > 1:
+                counts[prefix + token] += weight
+
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    for token, count in counts.items():
+        bucket, sign = _bucket(token)
+        vector[bucket] += sign * (1 + math.log(count))
+    return vector
+
+
+def from_bytes(data):
+    return np.frombuffer(data, dtype=np.float32)
+
+
+class _Storage:
+    """Preallocated rows, shared by an ``Index`` and the ones ``updated`` makes from it."""
+
+    def __init__(self, capacity):
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.vectors = np.empty((capacity, DIMENSIONS), dtype=np.float32)
+        self.norms = np.empty(capacity, dtype=np.float32)
+        # Rows written so far; everything past it is spare.
+        self.used = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def for_rows(cls, rows):
+        # Room for a while of edits before ``updated`` has to copy.
+        return cls(rows + rows // 8 + 64)
+
+
+class Index:
+    """
+    Raw vectors of the active jobs, with IDF weights and weighted row norms.
+
+    An index never changes once built, so requests keep ranking against it
+    while a newer one is prepared. ``updated`` shares its storage rather
+    than copying it: changed and new jobs go to spare rows past the end,
+    which this index never reads, and the rows they replace are masked
+    out. IDF weights stay as computed by the last full build, so a sync
+    costs the changed rows rather than the matrix; the full reload every
+    ``RELOAD_SECONDS`` refreshes them and drops the masked rows.
+    """
+
+    def __init__(self, ids, vectors):
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), DIMENSIONS)
+        frequency = np.count_nonzero(vectors, axis=0)
+        self.idf = (np.log((1 + len(ids)) / (1 + frequency)) + 1).astype(np.float32)
+
+        self.storage = _Storage.for_rows(len(ids))
+        self.storage.ids[:len(ids)] = ids
+        self.storage.vectors[:len(ids)] = vectors
+        self.storage.norms[:len(ids)] = self._norms(vectors)
+        self.storage.used = self.size = len(ids)
+        self.live = np.ones(len(ids), dtype=bool)
+        self.rows = {job_id: row for row, job_id in enumerate(ids.tolist())}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """From ``(job id, vector bytes)`` rows."""
+        ids, vectors = [], []
+        for job_id, data in rows:
+            ids.append(job_id)
+            vectors.append(bytes(data))
+        return cls(ids, from_bytes(b''.join(vectors)))
+
+    def _norms(self, vectors):
+        norms = np.sqrt(np.square(vectors) @ np.square(self.idf))
+        norms[norms == 0] = 1
+        return norms
+
+    @property
+    def ids(self):
+        return self.storage.ids[:self.size]
+
+    @property
+    def vectors(self):
+        return self.storage.vectors[:self.size]
+
+    @property
+    def norms(self):
+        return self.storage.norms[:self.size]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def updated(self, rows):
+        """A new index with ``(job id, vector bytes, is_active)`` rows applied."""
+        changed = {job_id: from_bytes(data) if is_active else None for job_id, data, is_active in rows}
+        if not changed:
+            return self
+        added = [(job_id, vector) for job_id, vector in changed.items() if vector is not None]
+
+        storage = self.storage
+        if storage.used != self.size or self.size + len(added) > len(storage):
+            # Full, or already extended from this index by an earlier sync.
+            storage = _Storage.for_rows(self.size + len(added))
+            storage.ids[:self.size] = self.ids
+            storage.vectors[:self.size] = self.vectors
+            storage.norms[:self.size] = self.norms
+        size = self.size + len(added)
+        if added:
+            vectors = np.stack([vector for _, vector in added])
+            storage.ids[self.size:size] = [job_id for job_id, _ in added]
+            storage.vectors[self.size:size] = vectors
+            storage.norms[self.size:size] = self._norms(vectors)
+        storage.used = size
+
+        index = Index.__new__(Index)
+        index.idf, index.storage, index.size = self.idf, storage, size
+        index.live = np.ones(size, dtype=bool)
+        index.live[:self.size] = self.live
+        index.rows = dict(self.rows)
+        for job_id in changed:
+            row = index.rows.pop(job_id, None)
+            if row is not None:
+                index.live[row] = False
+        for row, (job_id, _) in enumerate(added, self.size):
+            index.rows[job_id] = row
+        return index
+
+    def scores(self, vector):
+        """Cosine similarity of every indexed job to the raw ``vector``."""
+        query = vector * self.idf
+        length = np.linalg.norm(query)
+        if length:
+            scores = (self.vectors @ (query * self.idf / length)) / self.norms
+        else:
+            scores = np.zeros(self.size, dtype=np.float32)
+        scores[~self.live] = -np.inf
+        return scores
+
+    def top(self, scores, k):
+        """``[(job id, score)]`` for the ``k`` best positive ``scores``, best first."""
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(int(self.ids[row]), float(scores[row])) for row in best if scores[row] > 0]
+
+    def similar(self, job_id, k):
+        row = self.rows.get(job_id)
+        if row is None:
+            return []
+        scores = self.scores(self.vectors[row])
+        scores[row] = -np.inf
+        return self.top(scores, k)
+
+
+# ==========================
+# MAINTENANCE
+# ==========================
+def invalidate(reload=False, listing=False):
+    """
+    Tell workers to sync; ``reload`` makes them load every vector again,
+    and it or ``listing`` (the set of active jobs changed) bumps
+    ``listing_version``.
+    """
+    now = time.time_ns()
+    values = {VERSION_KEY: now}
+    if reload:
+        values[RELOAD_KEY] = now
+    if reload or listing:
+        values[LISTING_KEY] = now
+    cache.set_many(values, None)
+
+
+def _upsert(jobs):
+    JobVector.objects.bulk_create(
+        [JobVector(job_id=job.pk, vector=vectorize(job).tobytes()) for job in jobs],
+        update_conflicts=True,
+        unique_fields=['job'],
+        update_fields=['vector', 'updated_at'],
+    )
+
+
+def _tracked(job):
+    values = job.__dict__
+    return {field: values[field] for field in TRACKED_FIELDS if field in values}
+
+
+def remember(job):
+    """Note ``job``'s loaded text and ``is_active``, for ``index_job`` to compare against."""
+    job._similarity_fields = _tracked(job)
+
+
+def index_job(job, created=False, update_fields=None):
+    """
+    Rewrite ``job``'s vector if it is new or the save (of ``update_fields``,
+    if given) changed its text or ``is_active`` since it was loaded.
+    """
+    before, after = getattr(job, '_similarity_fields', {}), _tracked(job)
+    written = [field for field in TRACKED_FIELDS if update_fields is None or field in update_fields]
+    changed = {field for field in written if field not in before or before[field] != after.get(field)}
+    job._similarity_fields = after
+    if created or changed:
+        _upsert([job])
+        invalidate(listing=created or 'is_active' in changed)
+
+
+def index_jobs(jobs):
+    _upsert(jobs)
+    invalidate(listing=True)
+
+
+def rebuild(batch_size=2000):
+    """Recompute every job's vector; returns the number of jobs."""
+    total = 0
+    batch = []
+    for job in Job.objects.only('pk', *TEXT_FIELDS).iterator(chunk_size=batch_size):
+        batch.append(job)
+        if len(batch) == batch_size:
+            _upsert(batch)
+            total += len(batch)
+            batch = []
+    _upsert(batch)
+    total += len(batch)
+    JobVector.objects.exclude(job__in=Job.objects.all()).delete()
+    invalidate(reload=True)
+    return total
+
+
+# ==========================
+# QUERIES
+# ==========================
+class _Worker:
+    index = None
+    version = None
+    reload = None
+    synced_at = None
+    loaded_at = 0.0
+
+    def current(self, version):
+        fresh = time.monotonic() - self.loaded_at < RELOAD_SECONDS
+        return self.index is not None and self.version == version and fresh
+
+
+_worker = _Worker()
+# Held by the one thread of a worker that is syncing its index.
+_lock = threading.Lock()
+
+
+def _versions():
+    found = cache.get_many([VERSION_KEY, RELOAD_KEY])
+    if VERSION_KEY not in found:
+        # Evicted or never set: start a version the workers cannot have seen.
+        invalidate(reload=True)
+        found = cache.get_many([VERSION_KEY, RELOAD_KEY])
+    return found.get(VERSION_KEY), found.get(RELOAD_KEY)
+
+
+def version():
+    """Changes whenever a job vector is written or jobs are closed in bulk."""
+    return _versions()[0]
+
+
+def listing_version():
+    """Changes when jobs are created, opened or closed, not when one is edited."""
+    found = cache.get(LISTING_KEY)
+    if found is None:
+        cache.add(LISTING_KEY, time.time_ns(), None)
+        found = cache.get(LISTING_KEY)
+    return found
+
+
+def _sync(state, version, reload):
+    synced_at = timezone.now()
+    stale = time.monotonic() - state.loaded_at >= RELOAD_SECONDS
+    if state.index is None or stale or state.reload != reload:
+        index = Index.from_rows(
+            JobVector.objects.filter(job__is_active=True).values_list('job_id', 'vector').iterator()
+        )
+        state.loaded_at = time.monotonic()
+    else:
+        index = state.index.updated(
+            JobVector.objects.filter(updated_at__gte=state.synced_at - SYNC_OVERLAP)
+            .values_list('job_id', 'vector', 'job__is_active')
+        )
+    # Publish the index first: a reader that sees the new version gets it.
+    state.index = index
+    state.version, state.reload, state.synced_at = version, reload, synced_at
+    return index
+
+
+def get_index():
+    """
+    This worker's ``Index``, synced with ``JobVector`` if it changed.
+
+    One thread per worker syncs; the others go on ranking against the
+    index they have instead of waiting, unless there is none yet.
+    """
+    version, reload = _versions()
+    state = _worker
+    if state.current(version):
+        return state.index
+    if not _lock.acquire(blocking=state.index is None):
+        return state.index
+    try:
+        if state.current(version):
+            # Synced by the thread this one waited for.
+            return state.index
+        return _sync(state, version, reload)
+    finally:
+        _lock.release()
+
+
+def similar_jobs(job, k=SIMILAR_COUNT):
+    """Up to ``k`` active jobs most similar to ``job``, best first."""
+    # Ask for spares: jobs closed since the last reload are skipped.
+    ranked = get_index().similar(job.pk, k * 2)
+    if not ranked:
+        return []
+    jobs = Job.objects.filter(is_active=True).only(
+        'pk', 'title', 'company_name', 'location', 'job_type',
+        'salary_min', 'salary_max', 'salary_currency', 'salary_period', 'salary_note',
+    ).in_bulk([job_id for job_id, _ in ranked])
+    return [jobs[job_id] for job_id, _ in ranked if job_id in jobs][:k]
@@ -0,0 +1,269 @@
+"""
+Dashboard statistics.
+
+Totals live in ``SiteCounter`` and per-day counts in ``DailyCounter``:
+for each day, how many of the rows created that day still exist, so a
+delete takes its row off the day it was created on. Both are adjusted
+with ``F()`` updates from the model signals in ``jobs.signals``, on the
+same connection as the write that caused them. What a row counted
+towards before a save is read from the database under a row lock (see
+``stored_copy``), not from the copy the caller loaded, so two stale
+copies saved in turn count one change, not the same change twice.
+Requests are not atomic (``ATOMIC_REQUESTS`` is off), so a
+counter update only shares a transaction with its write when the caller
+opened one; a failure between the two statements leaves the counters
+off. The ``reconcile_stats`` command is the repair path: it recomputes
+everything from the source tables.
+"""
+import collections
+import datetime
+
+from django.apps import apps as global_apps
+from django.db import router, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+USERS = 'users'
+JOBS = 'jobs'
+INACTIVE_JOBS = 'jobs_inactive'
+APPLICATIONS = 'applications'
+PENDING_TESTIMONIALS = 'testimonials_pending'
+APPROVED_TESTIMONIALS = 'testimonials_approved'
+
+# Daily series: how many rows of each kind created on a day still exist.
+DAILY_SERIES = {
+    USERS: ('auth', 'User', 'date_joined'),
+    JOBS: ('jobs', 'Job', 'posted_at'),
+    APPLICATIONS: ('jobs', 'JobApplication', 'applied_at'),
+    'testimonials': ('jobs', 'Testimonial', 'created_at'),
+}
+
+
+# Fields whose stored values decide which totals a row counts towards.
+COUNTED_FIELDS = {
+    'Job': ('is_active',),
+    'JobApplication': ('job', 'status'),
+    'Testimonial': ('is_approved',),
+}
+
+
+def status_counter(status):
+    return f'applications_{status}'
+
+
+def counters_for(instance):
+    """
+    Names of the totals ``instance`` currently counts towards, or None if a
+    field needed to tell is deferred. Reads ``__dict__`` so it never
+    triggers a query.
+    """
+    from .models import Job, JobApplication, Testimonial
+
+    values = instance.__dict__
+    if isinstance(instance, Job):
+        if 'is_active' not in values:
+            return None
+        return [JOBS] if values['is_active'] else [JOBS, INACTIVE_JOBS]
+    if isinstance(instance, JobApplication):
+        if 'status' not in values:
+            return None
+        return [APPLICATIONS, status_counter(values['status'])]
+    if isinstance(instance, Testimonial):
+        if 'is_approved' not in values:
+            return None
+        return [APPROVED_TESTIMONIALS if values['is_approved'] else PENDING_TESTIMONIALS]
+    return [USERS]
+
+
+def daily_key(instance):
+    """
+    ``(series name, local creation date)`` for ``instance``, or None if it
+    has no series or its creation date is deferred.
+    """
+    for name, (app_label, model_name, date_field) in DAILY_SERIES.items():
+        if instance._meta.app_label == app_label and instance._meta.object_name == model_name:
+            created_at = instance.__dict__.get(date_field)
+            return (name, timezone.localdate(created_at)) if created_at else None
+    return None
+
+
+def stored_copy(instance, using=None, update_fields=None):
+    """
+    ``instance``'s row as it is in the database now, with only the fields
+    in ``COUNTED_FIELDS`` loaded and, inside a transaction, locked until it
+    ends. None for new or missing rows, other models, and saves whose
+    ``update_fields`` leave the counted fields alone.
+    """
+    fields = COUNTED_FIELDS.get(instance._meta.object_name)
+    if not fields or instance._state.adding:
+        return None
+    if update_fields is not None:
+        names = {name for field in fields for name in (field, instance._meta.get_field(field).attname)}
+        if names.isdisjoint(update_fields):
+            return None
+    using = using or router.db_for_write(type(instance), instance=instance)
+    rows = type(instance)._base_manager.using(using).only(*fields).filter(pk=instance.pk)
+    if transaction.get_connection(using).in_atomic_block:
+        rows = rows.select_for_update()
+    return rows.first()
+
+
+def increment(name, delta=1, day=None):
+    from .models import DailyCounter, SiteCounter
+
+    if not delta:
+        return
+    if day is None:
+        model, lookup = SiteCounter, {'name': name}
+    else:
+        model, lookup = DailyCounter, {'name': name, 'day': day}
+
+    if model.objects.filter(**lookup).update(value=F('value') + delta):
+        return
+    counter, created = model.objects.get_or_create(defaults={'value': delta}, **lookup)
+    if not created:
+        model.objects.filter(pk=counter.pk).update(value=F('value') + delta)
+
+
+def apply_change(old, new):
+    old, new = old or [], new or []
+    for name in new:
+        if name not in old:
+            increment(name, 1)
+    for name in old:
+        if name not in new:
+            increment(name, -1)
+
+
+def remember(instance, stored=None):
+    """Note the totals ``instance`` counts towards, taken from ``stored`` (a fresh copy of its row) if given."""
+    instance._stat_counters = counters_for(stored or instance) if instance.pk else []
+
+
+def record_save(instance, created):
+    new = counters_for(instance)
+    if created:
+        old = []
+        key = daily_key(instance)
+        if key:
+            increment(key[0], 1, day=key[1])
+    else:
+        old = getattr(instance, '_stat_counters', new)
+    if new is not None and old is not None:
+        apply_change(old, new)
+    instance._stat_counters = new
+
+
+def record_delete(instance):
+    counted = getattr(instance, '_stat_counters', None) or counters_for(instance)
+    apply_change(counted, [])
+    key = daily_key(instance)
+    if key:
+        increment(key[0], -1, day=key[1])
+
+
+def record_bulk_create(objects):
+    """Count rows inserted with ``bulk_create``, one update per counter."""
+    totals, daily = collections.Counter(), collections.Counter()
+    for instance in objects:
+        totals.update(counters_for(instance) or [])
+        key = daily_key(instance)
+        if key:
+            daily[key] += 1
+    for name, delta in totals.items():
+        increment(name, delta)
+    for (name, day), delta in daily.items():
+        increment(name, delta, day=day)
+
+
+def record_bulk_update(model, values, previous):
+    """
+    Adjust totals after ``jobs.bulk.update`` set ``values`` on groups of rows
+    whose old values and sizes are given in ``previous``.
+    """
+    deltas = collections.Counter()
+    for old_values, rows in previous:
+        old = counters_for(model(**old_values)) or []
+        new = counters_for(model(**{**old_values, **values})) or []
+        for name in set(new) - set(old):
+            deltas[name] += rows
+        for name in set(old) - set(new):
+            deltas[name] -= rows
+    for name, delta in deltas.items():
+        increment(name, delta)
+
+
+def get_counters():
+    """All totals in one query, with every known counter defaulting to 0."""
+    from .models import JobApplication, SiteCounter
+
+    names = [USERS, JOBS, INACTIVE_JOBS, APPLICATIONS, PENDING_TESTIMONIALS, APPROVED_TESTIMONIALS]
+    names += [status_counter(status) for status, _ in JobApplication.STATUS_CHOICES]
+    counters = dict.fromkeys(names, 0)
+    counters.update(SiteCounter.objects.values_list('name', 'value'))
+    return counters
+
+
+def daily_series(days=14):
+    """
+    ``[(date, {series name: count}), ...]`` for the last ``days`` days,
+    newest first, in one query; days without rows count 0.
+    """
+    from .models import DailyCounter
+
+    today = timezone.localdate()
+    values = collections.defaultdict(dict)
+    rows = DailyCounter.objects.filter(name__in=list(DAILY_SERIES), day__gt=today - datetime.timedelta(days=days))
+    for name, day, value in rows.values_list('name', 'day', 'value'):
+        values[day][name] = value
+    series = []
+    for offset in range(days):
+        day = today - datetime.timedelta(days=offset)
+        series.append((day, {name: values[day].get(name, 0) for name in DAILY_SERIES}))
+    return series
+
+
+def rebuild(apps=global_apps):
+    """
+    Recompute every counter with bulk aggregates, reading models from
+    the ``apps`` registry.
+    """
+    User = apps.get_model('auth', 'User')
+    Job = apps.get_model('jobs', 'Job')
+    JobApplication = apps.get_model('jobs', 'JobApplication')
+    Testimonial = apps.get_model('jobs', 'Testimonial')
+    SiteCounter = apps.get_model('jobs', 'SiteCounter')
+    DailyCounter = apps.get_model('jobs', 'DailyCounter')
+
+    totals = {
+        USERS: User.objects.count(),
+        JOBS: Job.objects.count(),
+        INACTIVE_JOBS: Job.objects.filter(is_active=False).count(),
+        APPLICATIONS: JobApplication.objects.count(),
+    }
+    for status, count in JobApplication.objects.values_list('status').annotate(Count('id')).order_by():
+        totals[status_counter(status)] = count
+    for approved, count in Testimonial.objects.values_list('is_approved').annotate(Count('id')).order_by():
+        totals[APPROVED_TESTIMONIALS if approved else PENDING_TESTIMONIALS] = count
+
+    daily = []
+    for name, (app_label, model_name, date_field) in DAILY_SERIES.items():
+        rows = (
+            apps.get_model(app_label, model_name).objects
+            .annotate(day=TruncDate(date_field))
+            .values_list('day')
+            .annotate(value=Count('pk'))
+            .order_by()
+        )
+        daily += [DailyCounter(name=name, day=day, value=value) for day, value in rows]
+
+    with transaction.atomic():
+        SiteCounter.objects.all().delete()
+        DailyCounter.objects.all().delete()
+        SiteCounter.objects.bulk_create(
+            SiteCounter(name=name, value=value) for name, value in totals.items()
+        )
+        DailyCounter.objects.bulk_create(daily, batch_size=1000)
+
+    return totals
@@ -1,3 +1,1652 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models.signals import post_save
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from . import (
+    application_counts, bulk, facets, feed, fragments, imports, metrics, page_cache, pagination, roles, resumes,
+    routers, salaries, search, sessions, similarity, stats, uploads,
+)
+from .benchmarks import (
+    concurrency as bench_concurrency, data as bench_data, resumes as bench_resumes, suite as bench_suite,
+)
+from .context_processors import user_profile
+from .forms import JobApplicationForm, JobCreateForm, JobFilterForm
+from .models import (
+    ContactMessage, DailyCounter, Job, JobApplication, JobVector, PendingUpload, Profile, ResumeText, SiteCounter,
+    Testimonial, UserProfile,
+)
+
+
+def make_job(posted_by, **kwargs):
+    fields = {
+        'title': 'Python Developer',
+        'company_name': 'Himalayan Tech',
+        'location': 'Kathmandu',
+        'job_type': 'FT',
+        'description': 'Build things.',
+        'requirements': 'Python',
+        'posted_by': posted_by,
+    }
+    fields.update(kwargs)
+    return Job.objects.create(**fields)
+
+
+def profile_queries(queries):
+    return [q['sql'] for q in queries if 'jobs_profile' in q['sql']]
+
+
+class JobSearchTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        self.title_match = make_job(self.admin, title='Django Developer', description='Build things.')
+        self.body_match = make_job(self.admin, title='Team Lead', description='Some Django work.')
+        self.other = make_job(self.admin, title='Accountant', location='Pokhara', requirements='Excel')
+
+    def search(self, query='', location=''):
+        return list(search.search_jobs(Job.objects.all(), query=query, location=location))
+
+    def test_ranks_title_matches_first(self):
+        self.assertEqual(search.get_backend().name, 'sqlite_fts5')
+        self.assertEqual(self.search('djang'), [self.title_match, self.body_match])
+
+    def test_location_only_matches_the_location_column(self):
+        self.assertEqual(self.search(location='pokhara'), [self.other])
+        self.assertEqual(self.search('pokhara'), [self.other])
+        self.assertEqual(self.search('django', location='pokhara'), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.other.title = 'Kotlin Developer'
+        self.other.save()
+        self.assertEqual(self.search('kotlin'), [self.other])
+        self.assertEqual(self.search('accountant'), [])
+
+        self.other.delete()
+        self.assertEqual(self.search('kotlin'), [])
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM jobs_job_search")
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+    def test_rebuild_restores_a_cleared_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM jobs_job_search")
+        self.assertEqual(self.search('django'), [])
+        search.rebuild_index()
+        self.assertEqual(self.search('django'), [self.title_match, self.body_match])
+
+    def test_empty_query_falls_back_to_like(self):
+        backend = search.get_backend()
+        self.assertEqual(backend.build_query('', ''), '')
+        self.assertEqual(len(self.search()), 3)
+
+
+class SearchBackendQueryTests(SimpleTestCase):
+    def test_sqlite_query(self):
+        self.assertEqual(
+            search.SqliteFTSBackend().build_query('Senior react', 'Kathmandu'),
+            '"senior"* AND "react"* AND location : ("kathmandu"*)',
+        )
+
+    def test_postgres_query(self):
+        backend = search.PostgresSearchBackend()
+        self.assertEqual(backend.build_query('Senior react', 'Kathmandu'), 'senior:* & react:* & kathmandu:*C')
+        self.assertIn("setweight(to_tsvector('english', %s), 'A')", backend.document_sql('%s'))
+
+    def test_index_backends_are_abstract(self):
+        with self.assertRaises(TypeError):
+            search.IndexBackend()
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        for i in range(7):
+            make_job(self.admin, title=f'Job {i}')
+        # Every job shares one timestamp, so only the pk tie-breaker orders them.
+        Job.objects.update(posted_at=timezone.now())
+        self.expected = list(Job.objects.order_by('-posted_at', '-pk'))
+        self.paginator = pagination.CursorPaginator(Job.objects.all(), ['-posted_at'], page_size=3)
+
+    def test_ties_on_posted_at_break_on_pk(self):
+        self.assertEqual(self.paginator.ordering, ['-posted_at', '-pk'])
+        rows = []
+        page = self.paginator.page()
+        rows += page.object_list
+        while page.has_next:
+            page = self.paginator.page(page.next_cursor)
+            rows += page.object_list
+        self.assertEqual(rows, self.expected)
+
+    def test_next_and_previous_round_trip(self):
+        first = self.paginator.page()
+        self.assertEqual(first.object_list, self.expected[:3])
+        self.assertFalse(first.has_previous)
+        self.assertIsNone(first.previous_cursor)
+
+        second = self.paginator.page(first.next_cursor)
+        self.assertEqual(second.object_list, self.expected[3:6])
+        self.assertTrue(second.has_previous)
+
+        last = self.paginator.page(second.next_cursor)
+        self.assertEqual(last.object_list, self.expected[6:])
+        self.assertFalse(last.has_next)
+
+        back = self.paginator.page(last.previous_cursor)
+        self.assertEqual(back.object_list, second.object_list)
+        self.assertTrue(back.has_next)
+        self.assertEqual(back.next_cursor, second.next_cursor)
+
+        start = self.paginator.page(back.previous_cursor)
+        self.assertEqual(start.object_list, first.object_list)
+        self.assertFalse(start.has_previous)
+
+    def test_malformed_cursor_falls_back_to_the_first_page(self):
+        for cursor in ['not-base64!', pagination.encode_cursor(['yesterday', 1]), pagination.encode_cursor([1])]:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(pagination.InvalidCursor):
+                    self.paginator.page(cursor)
+                request = RequestFactory().get('/jobs/', {'cursor': cursor, 'page_size': 3})
+                page = pagination.paginate(request, Job.objects.all(), ['-posted_at'])
+                self.assertEqual(page.object_list, self.expected[:3])
+
+        response = self.client.get(reverse('job_list'), {'cursor': 'not-base64!'})
+        self.assertEqual(response.status_code, 200)
+
+
+class UserProfileContextProcessorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='seeker@example.com', password='pass')
+        employer = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        for i in range(3):
+            make_job(employer, title=f'Job {i}')
+
+    def test_profile_created_with_user(self):
+        self.assertTrue(Profile.objects.filter(user=self.user).exists())
+
+    def test_processor_is_lazy(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        with self.assertNumQueries(0):
+            context = user_profile(request)
+        self.assertEqual(context['profile'].user_id, self.user.pk)
+
+    def test_job_list_profile_query_only_on_cold_cache(self):
+        self.client.force_login(self.user)
+        # As if the session had been through a request, so neither one saves it.
+        session = self.client.session
+        session[sessions.REFRESHED_KEY] = int(time.time())
+        session.save()
+        url = reverse('job_list')
+        facets.base_counts()
+
+        with CaptureQueriesContext(connection) as cold:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as warm:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(profile_queries(cold.captured_queries)), 1)
+        self.assertEqual(profile_queries(warm.captured_queries), [])
+        self.assertEqual(len(warm), len(cold) - 1)
+
+    def test_profile_save_invalidates_cache(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('job_list'))
+
+        profile = Profile.objects.get(user=self.user)
+        profile.location = 'Pokhara'
+        profile.save()
+
+        response = self.client.get(reverse('job_list'))
+        self.assertEqual(response.context['profile'].location, 'Pokhara')
+
+
+class HomePageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        make_job(self.employer, title='Featured Role', featured=True)
+
+    def add_testimonials(self, count, approved=True):
+        for i in range(count):
+            author = User.objects.create_user(
+                username=f'author{Testimonial.objects.count()}@example.com',
+                first_name='Author',
+            )
+            Testimonial.objects.create(
+                user=author, designation='Engineer', message=f'Great portal {i}', is_approved=approved
+            )
+
+    def home_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_independent_of_testimonials(self):
+        self.add_testimonials(1)
+        one = self.home_queries()
+        self.add_testimonials(5)
+        self.assertEqual(self.home_queries(), one)
+
+    def test_cached_fragments_skip_queries(self):
+        self.add_testimonials(3)
+        self.client.get(reverse('home'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'))
+        self.assertContains(response, 'Featured Role')
+        self.assertContains(response, 'Great portal 2')
+
+    def test_testimonial_approval_invalidates_fragment(self):
+        self.add_testimonials(1, approved=False)
+        self.assertNotContains(self.client.get(reverse('home')), 'Great portal 0')
+
+        testimonial = Testimonial.objects.get()
+        testimonial.is_approved = True
+        testimonial.save()
+        self.assertContains(self.client.get(reverse('home')), 'Great portal 0')
+
+        testimonial.is_approved = False
+        testimonial.save()
+        self.assertNotContains(self.client.get(reverse('home')), 'Great portal 0')
+
+    def test_featured_flag_invalidates_fragment(self):
+        job = make_job(self.employer, title='Quiet Role')
+        self.assertNotContains(self.client.get(reverse('home')), 'Quiet Role')
+
+        job.featured = True
+        job.save()
+        self.assertContains(self.client.get(reverse('home')), 'Quiet Role')
+
+        job.delete()
+        self.assertNotContains(self.client.get(reverse('home')), 'Quiet Role')
+
+
+class HotQueryIndexTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user(username='author@example.com')
+        for i in range(4):
+            Testimonial.objects.create(user=author, designation='Engineer', message='Great', is_approved=i % 2 == 0)
+
+    def test_testimonial_indexes(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Testimonial._meta.db_table)
+        names = {name for name, info in constraints.items() if info['index'] and name.startswith('testimonial_')}
+        self.assertEqual(names, {'testimonial_created_idx', 'testimonial_status_idx'})
+
+    def test_salary_indexes_lead_with_currency_and_period(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Job._meta.db_table)
+        for bound in ('min', 'max'):
+            self.assertEqual(
+                constraints[f'job_active_salary_{bound}_idx']['columns'],
+                ['salary_currency', 'salary_period', f'salary_{bound}'],
+            )
+        plan = JobFilterForm({'salary_from': '60000'}).filter(Job.objects.filter(is_active=True)).explain()
+        self.assertIn('job_active_salary_max_idx', plan)
+
+    def test_explain_hot_queries(self):
+        out = io.StringIO()
+        call_command('explain_hot_queries', stdout=out)
+        lines = {line.split('indexes:')[0].split(None, 1)[1].strip(): line for line in out.getvalue().splitlines()
+                 if 'indexes:' in line}
+        # Without the partial index, home's testimonials still come from an
+        # index in order: no table scan and no in-memory sort.
+        for label in ['home: testimonials', 'admin_testimonials', 'admin_testimonials: pending']:
+            with self.subTest(label=label):
+                self.assertTrue(lines[label].startswith('OK'), lines[label])
+                self.assertRegex(lines[label], r'indexes: testimonial_(created|status)_idx')
+        self.assertNotIn('testimonial_approved_idx', out.getvalue())
+
+    def test_fail_on_scan(self):
+        plan = 'SCAN jobs_contactmessage'
+        with mock.patch('django.db.models.query.QuerySet.explain', return_value=plan):
+            with self.assertRaisesMessage(CommandError, 'Full table scans in: home: featured jobs'):
+                call_command('explain_hot_queries', '--fail-on-scan', stdout=io.StringIO())
+
+
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        self.job = make_job(self.employer)
+
+    def test_second_request_is_a_hit(self):
+        url = reverse('job_list')
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'miss')
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertContains(response, 'Python Developer')
+
+    def test_query_params_are_normalized(self):
+        url = reverse('job_list')
+        self.client.get(url, {'q': 'Python'})
+        response = self.client.get(url, {'q': '  python ', 'utm_source': 'mail'})
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertEqual(self.client.get(url, {'q': 'django'})['X-Page-Cache'], 'miss')
+
+    def test_cursor_is_keyed_verbatim(self):
+        for i in range(3):
+            make_job(self.employer, title=f'Job {i}')
+        url = reverse('job_list')
+        first = self.client.get(url, {'page_size': 2})
+        cursor = first.context['page'].next_cursor
+        self.assertNotEqual(cursor, cursor.lower())
+        second = self.client.get(url, {'page_size': 2, 'cursor': cursor})
+        self.assertEqual(second['X-Page-Cache'], 'miss')
+        # A differently cased cursor is malformed (first page), not a hit on page two.
+        response = self.client.get(url, {'page_size': 2, 'cursor': cursor.lower()})
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertEqual(list(response.context['page']), list(first.context['page']))
+
+    def test_job_change_invalidates(self):
+        url = reverse('job_detail', args=[self.job.id])
+        self.client.get(url)
+        self.job.title = 'Django Developer'
+        self.job.save()
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'Django Developer')
+
+    def test_authenticated_requests_bypass_cache(self):
+        self.client.force_login(User.objects.create_user(username='seeker@example.com'))
+        response = self.client.get(reverse('job_list'))
+        self.assertNotIn('X-Page-Cache', response)
+
+
+class FailingUploader:
+    def upload(self, fileobj, file_name, field):
+        raise ConnectionError("storage unavailable")
+
+
+class DeferredUploadTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        settings = override_settings(
+            UPLOADS_BACKEND='jobs.uploads.LocalUploader', UPLOADS_LOCAL_ROOT=self.root.name
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        employer = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        self.job = make_job(employer)
+        self.seeker = User.objects.create_user(username='seeker@example.com', password='pass')
+        self.client.force_login(self.seeker)
+
+    def apply(self):
+        resume = SimpleUploadedFile('cv.pdf', b'%PDF-1.4 resume', content_type='application/pdf')
+        response = self.client.post(reverse('apply_job', args=[self.job.id]), {
+            'full_name': 'Job Seeker',
+            'email': 'seeker@example.com',
+            'phone': '9800000000',
+            'resume': resume,
+        })
+        self.assertEqual(response.status_code, 302)
+        return JobApplication.objects.get(job=self.job, user=self.seeker)
+
+    def test_apply_queues_resume(self):
+        application = self.apply()
+        self.assertEqual(application.upload_status, 'pending')
+        self.assertFalse(application.resume)
+        task = PendingUpload.objects.get()
+        self.assertEqual((task.field_name, task.file_name), ('resume', 'cv.pdf'))
+
+    def test_worker_uploads_and_completes(self):
+        application = self.apply()
+        call_command('process_uploads', '--once', '--workers', '1', stdout=io.StringIO())
+
+        application.refresh_from_db()
+        self.assertEqual(application.upload_status, 'complete')
+        self.assertTrue(application.resume.public_id)
+        self.assertFalse(PendingUpload.objects.exists())
+
+    def test_failures_retry_then_give_up(self):
+        application = self.apply()
+        task = PendingUpload.objects.get()
+
+        self.assertEqual(uploads.claim(10, 60), [task.id])
+        self.assertEqual(uploads.process(task.id, FailingUploader(), max_attempts=2), 'retry')
+        self.assertEqual(uploads.claim(10, 60), [])
+
+        PendingUpload.objects.update(available_at=task.available_at)
+        uploads.claim(10, 60)
+        self.assertEqual(uploads.process(task.id, FailingUploader(), max_attempts=2), 'failed')
+        application.refresh_from_db()
+        self.assertEqual(application.upload_status, 'failed')
+
+
+class ResumeSearchTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        settings = override_settings(
+            UPLOADS_BACKEND='jobs.uploads.LocalUploader', UPLOADS_LOCAL_ROOT=self.root.name
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.admin = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        self.job = make_job(self.admin)
+        self.django = self.apply('django@example.com', ['Backend developer', 'Skills: Python, Django, React.js'])
+        self.cpp = self.apply('cpp@example.com', ['Embedded engineer', 'Skills: C++, Linux, Machine Learning'])
+
+    def apply(self, username, lines):
+        seeker = User.objects.create_user(username=username, password='pass')
+        client = Client()
+        client.force_login(seeker)
+        client.post(reverse('apply_job', args=[self.job.id]), {
+            'full_name': username,
+            'email': username,
+            'phone': '9800000000',
+            'resume': SimpleUploadedFile('cv.pdf', bench_resumes.make_pdf(lines), content_type='application/pdf'),
+        })
+        call_command('process_uploads', '--once', '--workers', '1', stdout=io.StringIO())
+        return JobApplication.objects.get(job=self.job, user=seeker)
+
+    def search(self, query):
+        return set(JobApplication.objects.filter(resumes.matching(query)).values_list('pk', flat=True))
+
+    def test_skills_are_normalized(self):
+        terms = resumes.normalize('C++ and ReactJS, node.js; Machine Learning on k8s')
+        self.assertTrue({'cpp', 'react', 'nodejs', 'machinelearning', 'kubernetes'} <= set(terms))
+
+    def test_only_new_or_replaced_resumes_are_processed(self):
+        self.assertEqual(resumes.run(workers=2), {'done': 2})
+        self.assertEqual(self.search('react.js'), {self.django.pk})
+        self.assertEqual(self.search('c++ machine learning'), {self.cpp.pk})
+        self.assertEqual(ResumeText.objects.get(pk=self.cpp.pk).skills, 'cpp linux machinelearning')
+        self.assertEqual(resumes.run(workers=2), {})
+
+        uploader = uploads.LocalUploader()
+        field = JobApplication._meta.get_field('resume')
+        self.django.resume = uploader.upload(io.BytesIO(bench_resumes.make_pdf(['Skills: Kubernetes'])), 'cv.pdf', field)
+        self.django.save()
+        self.assertEqual(resumes.run(workers=2), {'done': 1})
+        self.assertEqual(self.search('kubernetes'), {self.django.pk})
+        self.assertEqual(self.search('django'), set())
+
+    def test_unreadable_resumes_wait_for_a_new_file(self):
+        uploader = uploads.LocalUploader()
+        field = JobApplication._meta.get_field('resume')
+        self.cpp.resume = uploader.upload(io.BytesIO(b'not a pdf'), 'cv.pdf', field)
+        self.cpp.save()
+
+        with self.assertLogs('jobs.resumes', 'WARNING'):
+            self.assertEqual(resumes.run(), {'done': 1, 'failed': 1})
+        self.assertTrue(ResumeText.objects.get(pk=self.cpp.pk).error)
+        self.assertEqual(resumes.run(), {})
+        with self.assertLogs('jobs.resumes', 'WARNING'):
+            self.assertEqual(resumes.run(retry_failed=True), {'failed': 1})
+
+    def test_admin_pages_search_resume_keywords(self):
+        call_command('process_resumes', '--once', stdout=io.StringIO())
+        self.client.force_login(self.admin)
+
+        response = self.client.get(reverse('admin_applications'), {'q': 'django'})
+        self.assertEqual([app.pk for app in response.context['applications']], [self.django.pk])
+        response = self.client.get(reverse('admin_applications'), {'q': 'cpp@example'})
+        self.assertEqual([app.pk for app in response.context['applications']], [self.cpp.pk])
+
+        self.admin.is_superuser = True
+        self.admin.save()
+        response = self.client.get(reverse('admin:jobs_jobapplication_changelist'), {'q': 'linux'})
+        self.assertEqual([app.pk for app in response.context['cl'].result_list], [self.cpp.pk])
+
+        self.cpp.delete()
+        self.assertEqual(self.search('linux'), set())
+
+
+class BulkActionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        self.client.force_login(self.admin)
+        self.jobs = [make_job(self.admin, title=f'Job {i}', is_active=i % 2 == 0) for i in range(4)]
+        self.applications = [
+            JobApplication.objects.create(
+                job=self.jobs[0],
+                user=User.objects.create_user(username=f'seeker{i}@example.com'),
+                full_name=f'Seeker {i}',
+                email=f'seeker{i}@example.com',
+                phone='9800000000',
+                status='reviewing' if i == 0 else 'applied',
+            )
+            for i in range(5)
+        ]
+
+    def assertCountersExact(self):
+        counters = stats.get_counters()
+        for name, value in stats.rebuild().items():
+            self.assertEqual(counters.get(name, 0), value, name)
+
+    def test_application_status_single_update(self):
+        ids = [application.id for application in self.applications[:4]]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse('bulk_application_status'), {'ids': ids, 'status': 'shortlisted'}
+            )
+        self.assertRedirects(response, reverse('admin_applications'), fetch_redirect_response=False)
+
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "jobs_jobapplication"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(JobApplication.objects.filter(status='shortlisted').count(), 4)
+        self.assertCountersExact()
+
+    def test_select_all_keeps_the_search(self):
+        response = self.client.get(reverse('admin_applications'), {'q': 'seeker1@'})
+        self.assertContains(response, '<input type="hidden" name="q" value="seeker1@">', html=True)
+
+        self.client.post(reverse('bulk_application_status'), {'select': 'all', 'q': 'seeker1@', 'status': 'rejected'})
+        rejected = set(JobApplication.objects.filter(status='rejected').values_list('pk', flat=True))
+        self.assertEqual(rejected, {self.applications[1].pk})
+        self.assertCountersExact()
+
+    def test_jobs_by_filter_invalidate_pages(self):
+        self.client.logout()
+        self.client.get(reverse('job_list'))
+        self.client.force_login(self.admin)
+
+        self.client.post(reverse('bulk_jobs'), {'select': 'all', 'is_active': 'False', 'action': 'approve'})
+        self.assertFalse(Job.objects.filter(is_active=False).exists())
+        self.assertCountersExact()
+
+        self.client.logout()
+        response = self.client.get(reverse('job_list'))
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'Job 3')
+
+    def test_users_never_block_self_or_superusers(self):
+        root = User.objects.create_superuser(username='root@example.com', password='pass')
+        seeker = self.applications[0].user
+        self.client.post(reverse('bulk_users'), {'ids': [root.id, self.admin.id, seeker.id], 'action': 'block'})
+
+        blocked = set(User.objects.filter(is_active=False).values_list('id', flat=True))
+        self.assertEqual(blocked, {seeker.id})
+
+    def test_admin_action(self):
+        self.admin.is_superuser = True
+        self.admin.save()
+        response = self.client.post(reverse('admin:jobs_job_changelist'), {
+            'action': 'set_is_active_false',
+            '_selected_action': [job.id for job in self.jobs],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Job.objects.filter(is_active=True).exists())
+        self.assertCountersExact()
+
+    def test_admin_block_action_skips_self_and_superusers(self):
+        self.admin.is_superuser = True
+        self.admin.save()
+        root = User.objects.create_superuser(username='root@example.com', password='pass')
+        seeker = self.applications[0].user
+        response = self.client.post(reverse('admin:auth_user_changelist'), {
+            'action': 'set_is_active_false',
+            '_selected_action': [root.id, self.admin.id, seeker.id],
+        })
+        self.assertEqual(response.status_code, 302)
+
+        blocked = set(User.objects.filter(is_active=False).values_list('id', flat=True))
+        self.assertEqual(blocked, {seeker.id})
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        self.client.force_login(self.admin)
+        for i in range(5):
+            ContactMessage.objects.create(
+                name=f'Visitor {i}', email=f'visitor{i}@example.com', message=f'Hello,\n"line" {i}'
+            )
+        self.ids = list(ContactMessage.objects.order_by('id').values_list('id', flat=True))
+
+    def export(self, dataset, **params):
+        response = self.client.get(reverse('export_data', args=[dataset]), params)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_streams_every_row(self):
+        rows = list(csv.reader(io.StringIO(self.export('messages', format='csv'))))
+        self.assertEqual(rows[0], ['id', 'name', 'email', 'phone', 'message', 'created_at'])
+        self.assertEqual([int(row[0]) for row in rows[1:]], self.ids)
+        self.assertEqual(rows[1][4], 'Hello,\n"line" 0')
+
+    def test_csv_neutralizes_formulas(self):
+        payloads = ['=HYPERLINK("http://evil.example")', '+1+1', '-2+3', '@SUM(A1)', '\tcmd', '\rcmd']
+        for payload in payloads:
+            ContactMessage.objects.create(name=payload, email='evil@example.com', message='Hi')
+
+        rows = list(csv.reader(io.StringIO(self.export('messages', format='csv', after=self.ids[-1]))))
+        self.assertEqual([row[1] for row in rows], ["'" + payload for payload in payloads])
+        lines = self.export('messages', format='jsonl', after=self.ids[-1]).splitlines()
+        self.assertEqual([json.loads(line)['name'] for line in lines], payloads)
+
+    def test_jsonl_resumes_after_id(self):
+        lines = self.export('messages', format='jsonl', after=self.ids[2]).splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], self.ids[3:])
+
+    def test_applications_filter_by_status(self):
+        job = make_job(self.admin)
+        for i, status in enumerate(['applied', 'selected', 'selected']):
+            JobApplication.objects.create(
+                job=job, user=User.objects.create_user(username=f'seeker{i}@example.com'),
+                full_name=f'Seeker {i}', email=f'seeker{i}@example.com', phone='9800000000', status=status,
+            )
+        lines = self.export('applications', format='jsonl', status='selected', job=job.id).splitlines()
+        self.assertEqual([json.loads(line)['full_name'] for line in lines], ['Seeker 1', 'Seeker 2'])
+
+    def test_invalid_parameters(self):
+        url = reverse('export_data', args=['messages'])
+        self.assertEqual(self.client.get(url, {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'since': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('export_data', args=['jobs'])).status_code, 400)
+
+    def test_command_resume_appends_missing_rows(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'messages.csv')
+            call_command('export_data', 'messages', '--output', path, '--until', '2000-01-01', stderr=io.StringIO())
+            call_command('export_data', 'messages', '--output', path, '--resume', stderr=io.StringIO())
+            ContactMessage.objects.create(name='Late', email='late@example.com', message='Hi')
+            call_command('export_data', 'messages', '--output', path, '--resume', stderr=io.StringIO())
+
+            with open(path, newline='') as f:
+                rows = list(csv.reader(f))
+        self.assertEqual(rows[0][0], 'id')
+        self.assertEqual([row[1] for row in rows[1:]], [f'Visitor {i}' for i in range(5)] + ['Late'])
+
+
+class JobImportTests(TestCase):
+    header = 'title,company_name,location,job_type,salary,description,requirements,featured,is_active\n'
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='hr@example.com', password='pass')
+
+    def test_bad_rows_are_reported_and_the_rest_imported(self):
+        stream = io.StringIO(self.header + (
+            'Kotlin Developer,Lumbini Soft,Pokhara,FT,50000,Build apps,Kotlin,yes,\n'
+            ',No Title,Kathmandu,FT,,Missing title,None,,\n'
+            'Accountant,Everest Bank,Kathmandu,XX,,Books,Excel,,\n'
+            'Data Analyst,Everest Bank,Lalitpur,PT,,Reports,SQL,,false\n'
+        ))
+        result = imports.import_jobs(stream, 'csv', self.admin, chunk_size=2)
+
+        self.assertEqual((result.rows, result.created, result.failed), (4, 2, 2))
+        self.assertEqual([line for line, _ in result.errors], [3, 4])
+        self.assertIn('title', result.errors[0][1])
+        self.assertIn('job_type', result.errors[1][1])
+
+        kotlin = Job.objects.get(title='Kotlin Developer')
+        self.assertTrue(kotlin.featured and kotlin.is_active)
+        self.assertEqual((kotlin.salary_min, kotlin.salary_max, kotlin.salary_period), (50000, 50000, 'month'))
+        self.assertFalse(Job.objects.get(title='Data Analyst').is_active)
+        self.assertEqual(list(search.search_jobs(Job.objects.all(), 'kotlin')), [kotlin])
+        counters = stats.get_counters()
+        self.assertEqual((counters[stats.JOBS], counters[stats.INACTIVE_JOBS]), (2, 1))
+
+    def test_jsonl_upload_page(self):
+        self.client.force_login(self.admin)
+        upload = SimpleUploadedFile('jobs.jsonl', (
+            b'{"title": "QA Tester", "company_name": "Koshi Health", "location": "Remote", '
+            b'"job_type": "FT", "description": "Testing", "requirements": "Selenium"}\n'
+            b'not json\n'
+        ))
+        response = self.client.post(reverse('import_jobs'), {'file': upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.context['result'].created, response.context['result'].failed), (1, 1))
+        self.assertEqual(Job.objects.get().posted_by, self.admin)
+
+    def test_malformed_csv_row_is_reported(self):
+        stream = io.StringIO(self.header + (
+            'Kotlin Developer,Lumbini Soft,Pokhara,FT,,"%s",Kotlin,,\n'
+            'Data Analyst,Everest Bank,Lalitpur,PT,,Reports,SQL,,\n'
+        ) % ('x' * (csv.field_size_limit() + 1)))
+        result = imports.import_jobs(stream, 'csv', self.admin)
+
+        self.assertEqual((result.rows, result.created, result.failed), (2, 1, 1))
+        self.assertIn('Malformed CSV', result.errors[0][1]['__all__'][0])
+        self.assertEqual(Job.objects.get().title, 'Data Analyst')
+
+    def test_non_utf8_upload_is_reported(self):
+        self.client.force_login(self.admin)
+        for name, content in [
+            ('jobs.csv', self.header.encode() + 'Cafe Manager,Café Himalaya,Pokhara,FT,,Run it,Tea,,\n'.encode('latin-1')),
+            ('jobs.jsonl', '{"title": "Café Manager"}\n'.encode('latin-1')),
+        ]:
+            with self.subTest(name=name):
+                response = self.client.post(reverse('import_jobs'), {'file': SimpleUploadedFile(name, content)})
+
+                self.assertEqual(response.status_code, 200)
+                result = response.context['result']
+                self.assertEqual((result.created, result.failed), (0, 1))
+                self.assertIn('Not UTF-8 text', result.errors[0][1]['__all__'][0])
+        self.assertFalse(Job.objects.exists())
+
+
+class SalaryTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+
+    def test_parse_salary(self):
+        self.assertEqual(salaries.parse_salary('Rs. 40,000 - 60,000'), {
+            'salary_min': 40000, 'salary_max': 60000, 'salary_currency': 'NPR', 'salary_period': 'month',
+        })
+        self.assertEqual(salaries.parse_salary('NPR 5 lakh per annum')['salary_max'], 500000)
+        self.assertEqual(salaries.parse_salary('NPR 5 lakh per annum')['salary_period'], 'year')
+        self.assertEqual(salaries.parse_salary('$20/hr')['salary_currency'], 'USD')
+        self.assertEqual(salaries.parse_salary('20-30k')['salary_min'], 20000)
+        self.assertIsNone(salaries.parse_salary('Negotiable'))
+
+    def test_form_fills_and_checks_bounds(self):
+        data = {
+            'title': 'Accountant', 'company_name': 'Everest Bank', 'location': 'Kathmandu', 'job_type': 'FT',
+            'description': 'Books', 'requirements': 'Excel', 'salary_currency': 'NPR', 'salary_period': 'month',
+        }
+        form = JobCreateForm({**data, 'salary_min': '30000'})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.instance.salary_max, 30000)
+        self.assertEqual(form.instance.salary, 'NPR 30,000 / month')
+        self.assertIn('salary_max', JobCreateForm({**data, 'salary_min': '30000', 'salary_max': '20000'}).errors)
+
+    def test_job_list_filters_by_type_and_overlapping_salary(self):
+        make_job(self.admin, title='Junior', salary_min=20000, salary_max=30000)
+        make_job(self.admin, title='Mid', salary_min=45000, salary_max=60000)
+        make_job(self.admin, title='Senior part time', job_type='PT', salary_min=55000, salary_max=90000)
+        make_job(self.admin, title='Unpaid')
+
+        def titles(**params):
+            response = self.client.get(reverse('job_list'), params)
+            return sorted(job.title for job in response.context['jobs'])
+
+        self.assertEqual(titles(salary_from=50000), ['Mid', 'Senior part time'])
+        self.assertEqual(titles(salary_from=25000, salary_to=50000), ['Junior', 'Mid'])
+        self.assertEqual(titles(job_type='PT'), ['Senior part time'])
+        self.assertEqual(titles(salary_from='lots'), ['Junior', 'Mid', 'Senior part time', 'Unpaid'])
+
+    def test_salary_range_stays_in_one_currency_and_period(self):
+        make_job(self.admin, title='Kathmandu', salary_min=50000, salary_max=60000)
+        make_job(self.admin, title='Remote', salary_min=50000, salary_max=60000, salary_currency='USD', salary_period='year')
+        make_job(self.admin, title='Hourly', salary_min=50, salary_max=60000, salary_period='hour')
+
+        def titles(**params):
+            response = self.client.get(reverse('job_list'), params)
+            return sorted(job.title for job in response.context['jobs'])
+
+        # A bare range is NPR a month.
+        self.assertEqual(titles(salary_from=55000), ['Kathmandu'])
+        self.assertEqual(titles(salary_from=55000, salary_currency='USD', salary_period='year'), ['Remote'])
+        self.assertEqual(titles(salary_to=100, salary_period='hour'), ['Hourly'])
+        self.assertEqual(titles(salary_currency='USD'), ['Remote'])
+
+    def test_salary_text_without_amount_is_kept(self):
+        stream = io.StringIO(
+            'title,company_name,location,job_type,salary,description,requirements\n'
+            'Accountant,Everest Bank,Kathmandu,FT,Negotiable,Books,Excel\n'
+        )
+        imports.import_jobs(stream, 'csv', self.admin)
+        job = Job.objects.get()
+        self.assertEqual((job.salary_min, job.salary_note), (None, 'Negotiable'))
+        self.assertEqual(job.salary, 'Negotiable')
+
+
+class SalaryMigrationTests(TransactionTestCase):
+    before = [('jobs', '0020_deferred_uploads')]
+    after = [('jobs', '0021_structured_salary')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_unparsed_salary_text_survives(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        old_apps = executor.loader.project_state(self.before).apps
+        poster = old_apps.get_model('auth', 'User').objects.create(username='hr@example.com')
+        OldJob = old_apps.get_model('jobs', 'Job')
+        for title, salary in [('Priced', 'Rs. 40,000 - 60,000'), ('Negotiable', 'Negotiable'), ('None', '')]:
+            OldJob.objects.create(
+                title=title, company_name='Everest Bank', location='Kathmandu', job_type='FT',
+                description='Books', requirements='Excel', salary=salary, posted_by=poster,
+            )
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+        Job = executor.loader.project_state(self.after).apps.get_model('jobs', 'Job')
+        jobs = {job.title: job for job in Job.objects.all()}
+        self.assertEqual((jobs['Priced'].salary_min, jobs['Priced'].salary_note), (40000, ''))
+        self.assertEqual((jobs['Negotiable'].salary_min, jobs['Negotiable'].salary_note), (None, 'Negotiable'))
+        self.assertEqual(jobs['None'].salary_note, '')
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        salaries_back = dict(OldJob.objects.values_list('title', 'salary'))
+        self.assertEqual(salaries_back, {'Priced': 'NPR 40,000 - 60,000 / month', 'Negotiable': 'Negotiable', 'None': None})
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class JobFacetTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        make_job(self.admin, location='Kathmandu', featured=True)
+        make_job(self.admin, location='Kathmandu', job_type='PT')
+        make_job(self.admin, title='Accountant', location='Pokhara', job_type='PT')
+        make_job(self.admin, location='Pokhara', is_active=False)
+
+    def facet_counts(self, response):
+        return {
+            title: {option['label']: option['count'] for option in options}
+            for title, options in response.context['facets']
+        }
+
+    def test_plain_list_uses_cached_base_counts(self):
+        self.client.get(reverse('job_list'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('job_list'))
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(self.facet_counts(response), {
+            'Job type': {'Full Time': 1, 'Part Time': 2},
+            'Location': {'Kathmandu': 2, 'Pokhara': 1},
+            'Featured': {'Featured jobs': 1},
+        })
+
+    def test_filtered_list_counts_its_results_in_one_query(self):
+        self.client.get(reverse('job_list'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('job_list'), {'job_type': 'PT'})
+
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(self.facet_counts(response), {
+            'Job type': {'Part Time': 2},
+            'Location': {'Kathmandu': 1, 'Pokhara': 1},
+            'Featured': {'Featured jobs': 0},
+        })
+        selected = [option for option in response.context['facets'][0][1] if option['selected']]
+        self.assertEqual(selected[0]['url'], '?')
+
+    def test_job_changes_invalidate_base_counts(self):
+        self.client.get(reverse('job_list'))
+        make_job(self.admin, location='Remote')
+        bulk.update(Job.objects.filter(featured=False), featured=True)
+
+        counts = self.facet_counts(self.client.get(reverse('job_list')))
+        self.assertEqual(counts['Location'], {'Kathmandu': 2, 'Pokhara': 1, 'Remote': 1})
+        self.assertEqual(counts['Featured'], {'Featured jobs': 4})
+
+
+class AppliedFlagTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        self.jobs = [make_job(admin, title=f'Role {i}') for i in range(5)]
+        self.seeker = User.objects.create_user(username='seeker@example.com', password='pass')
+        for job in self.jobs[:2]:
+            JobApplication.objects.create(
+                job=job, user=self.seeker, full_name='Seeker', email='seeker@example.com', phone='9800000000',
+            )
+        self.client.force_login(self.seeker)
+
+    def test_applied_state_comes_with_the_page_query(self):
+        self.client.get(reverse('job_list'))
+        with self.assertNumQueries(3):
+            # Session, user, the page of jobs with its applied flag.
+            response = self.client.get(reverse('job_list'))
+
+        applied = {job.pk for job in response.context['jobs'] if job.applied}
+        self.assertEqual(applied, {job.pk for job in self.jobs[:2]})
+        self.assertContains(response, 'Applied', count=2)
+
+
+APPLICATION_DATA = {'full_name': 'Seeker', 'email': 'seeker@example.com', 'phone': '9800000000'}
+
+
+class SimilarJobsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        self.job = make_job(self.admin, title='Senior Python Developer', requirements='Python and Django')
+        self.close = make_job(self.admin, title='Python Developer', requirements='Django, Python')
+        self.far = make_job(
+            self.admin, title='Accountant', company_name='Everest Bank', location='Pokhara',
+            description='Keep the books.', requirements='Excel and tally',
+        )
+
+    def test_jobs_are_ranked_by_text_similarity(self):
+        self.assertEqual(similarity.similar_jobs(self.job)[0], self.close)
+        self.assertNotIn(self.job, similarity.similar_jobs(self.job))
+
+        response = self.client.get(reverse('job_detail', args=[self.job.pk]))
+        self.assertContains(response, 'Similar Jobs')
+        self.assertContains(response, reverse('job_detail', args=[self.close.pk]))
+
+    def test_saved_jobs_are_synced_incrementally(self):
+        similarity.similar_jobs(self.job)
+        added = make_job(self.admin, title='Senior Python Developer', requirements='Python and Django')
+        self.close.is_active = False
+        self.close.save()
+
+        with mock.patch.object(similarity.Index, 'from_rows', side_effect=AssertionError('full reload')):
+            ranked = similarity.similar_jobs(self.job)
+        self.assertEqual(ranked[0], added)
+        self.assertNotIn(self.close, ranked)
+
+    def test_saves_without_text_changes_keep_the_vector_and_versions(self):
+        versions = similarity.version(), similarity.listing_version()
+        written = JobVector.objects.get(job=self.job).updated_at
+        self.job.featured = True
+        self.job.save()
+        Job.objects.only('pk', 'featured').get(pk=self.far.pk).save()
+        self.assertEqual((similarity.version(), similarity.listing_version()), versions)
+        self.assertEqual(JobVector.objects.get(job=self.job).updated_at, written)
+
+        self.job.title = 'Lead Python Developer'
+        self.job.save()
+        self.assertNotEqual(similarity.version(), versions[0])
+        self.assertEqual(similarity.listing_version(), versions[1])
+        self.job.is_active = False
+        self.job.save()
+        self.assertNotEqual(similarity.listing_version(), versions[1])
+
+    def test_updates_share_storage_and_mask_replaced_rows(self):
+        rng = np.random.default_rng(0)
+        vectors = rng.random((5, similarity.DIMENSIONS), dtype=np.float32)
+        index = similarity.Index([1, 2, 3, 4, 5], vectors)
+        changed = index.updated([
+            (2, vectors[0].tobytes(), True),  # now a copy of job 1
+            (3, vectors[2].tobytes(), False),  # closed
+            (6, vectors[0].tobytes(), True),
+        ])
+
+        self.assertTrue(np.shares_memory(changed.vectors, index.vectors))
+        self.assertIs(changed.idf, index.idf)
+        self.assertEqual((len(index), len(changed)), (5, 5))
+        self.assertEqual(sorted(job_id for job_id, _ in changed.similar(1, 2)), [2, 6])
+        self.assertNotIn(3, [job_id for job_id, _ in changed.similar(1, 10)])
+        # The older index is untouched and still answers.
+        self.assertEqual(len(index.similar(1, 10)), 4)
+        self.assertIn(3, [job_id for job_id, _ in index.similar(1, 10)])
+
+        # An index that was already extended from is copied, not overwritten.
+        again = index.updated([(7, vectors[1].tobytes(), True)])
+        self.assertFalse(np.shares_memory(again.vectors, changed.vectors))
+        self.assertIn(6, changed.rows)
+        self.assertNotIn(6, again.rows)
+
+    def test_readers_do_not_wait_for_a_sync(self):
+        current = similarity.get_index()
+        make_job(self.admin, title='Python Developer')
+        with similarity._lock:
+            # Another thread is syncing: keep answering from the current index.
+            self.assertIs(similarity.get_index(), current)
+        self.assertIsNot(similarity.get_index(), current)
+
+    def test_deleted_jobs_need_no_reload(self):
+        similarity.similar_jobs(self.job)
+        self.close.delete()
+        with mock.patch.object(similarity.Index, 'from_rows', side_effect=AssertionError('full reload')):
+            self.assertNotIn(self.close.pk, [job.pk for job in similarity.similar_jobs(self.job)])
+
+    def test_rebuild_recomputes_every_vector(self):
+        JobVector.objects.all().delete()
+        self.assertEqual(similarity.rebuild(), 3)
+        self.assertEqual(JobVector.objects.count(), 3)
+        self.assertEqual(similarity.similar_jobs(self.job)[0], self.close)
+
+
+class PersonalFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        admin = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        self.applied = make_job(admin, title='Python Developer', requirements='Python and Django')
+        self.python = make_job(admin, title='Senior Python Developer', requirements='Django, Python')
+        self.accountant = make_job(
+            admin, title='Accountant', company_name='Everest Bank', location='Pokhara',
+            description='Keep the books.', requirements='Excel and tally',
+        )
+        self.seeker = User.objects.create_user(username='seeker@example.com', password='pass')
+        JobApplication.objects.create(
+            job=self.applied, user=self.seeker, full_name='Seeker', email='seeker@example.com', phone='9800000000',
+        )
+        self.client.force_login(self.seeker)
+        self.url = reverse('job_list') + '?sort=for_you'
+
+    def test_jobs_are_ranked_by_application_history(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response.context['recommended'])
+        self.assertEqual(response.context['jobs'][0], self.python)
+        # Jobs already applied to are not recommended but still listed, last.
+        self.assertNotIn(self.applied.pk, feed.get_feed(self.seeker))
+        self.assertEqual(response.context['jobs'][-1], self.applied)
+
+    def test_feed_is_cached_until_the_user_applies(self):
+        self.client.get(self.url)
+        with mock.patch.object(feed, 'compute_feed', wraps=feed.compute_feed) as compute:
+            self.client.get(self.url)
+            compute.assert_not_called()
+
+            JobApplication.objects.create(
+                job=self.python, user=self.seeker, full_name='Seeker', email='seeker@example.com', phone='9800000000',
+            )
+            response = self.client.get(self.url)
+            compute.assert_called_once()
+        self.assertNotIn(self.python.pk, feed.get_feed(self.seeker))
+        self.assertEqual(list(response.context['jobs']), [self.accountant, self.python, self.applied])
+
+    def test_deleting_a_deferred_application(self):
+        application = JobApplication.objects.get(job=self.applied)
+        feed.get_feed(self.seeker)
+        application.delete()
+        self.assertIsNone(cache.get(feed.feed_cache_key(self.seeker.pk)))
+
+        other = JobApplication.objects.create(
+            job=self.python, user=self.seeker, full_name='Seeker', email='seeker@example.com', phone='9800000000',
+        )
+        JobApplication.objects.only('id').get(pk=other.pk).delete()
+        self.assertFalse(JobApplication.objects.filter(pk=other.pk).exists())
+
+    def test_new_jobs_are_ranked_on_the_next_visit(self):
+        self.client.get(self.url)
+        added = make_job(self.applied.posted_by, title='Python Developer', requirements='Python and Django')
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['jobs'][0], added)
+
+    def test_ranked_pages_follow_the_feed_order(self):
+        other = User.objects.create_user(username='new@example.com', password='pass')
+        self.client.force_login(other)
+        ids = [self.accountant.pk, self.python.pk, self.applied.pk]
+        with mock.patch.object(feed, 'get_feed', return_value=ids):
+            first = self.client.get(self.url + '&page_size=2')
+            self.assertEqual(list(first.context['jobs']), [self.accountant, self.python])
+            second = self.client.get(reverse('job_list') + first.context['page'].next_url)
+            self.assertEqual(list(second.context['jobs']), [self.applied])
+            back = self.client.get(reverse('job_list') + second.context['page'].previous_url)
+        self.assertEqual(list(back.context['jobs']), [self.accountant, self.python])
+
+    def test_filters_keep_jobs_outside_the_feed(self):
+        other = User.objects.create_user(username='new@example.com', password='pass')
+        self.client.force_login(other)
+        nearby = make_job(self.applied.posted_by, title='Tally Operator', location='Pokhara', requirements='Tally')
+        ids = [self.python.pk, self.accountant.pk]
+        with mock.patch.object(feed, 'get_feed', return_value=ids):
+            response = self.client.get(self.url + '&location=Pokhara')
+            self.assertEqual(list(response.context['jobs']), [self.accountant, nearby])
+
+            # Pages run from the ranked jobs into the rest, newest first, and back.
+            pages = []
+            url = self.url + '&page_size=2'
+            while url:
+                page = self.client.get(url).context['page']
+                pages.append(list(page))
+                url = page.next_url and reverse('job_list') + page.next_url
+            self.assertEqual(pages, [[self.python, self.accountant], [nearby, self.applied]])
+            back = self.client.get(reverse('job_list') + page.previous_url).context['page']
+            self.assertEqual(list(back), [self.python, self.accountant])
+            self.assertFalse(back.has_previous)
+
+            # A page that straddles both parts.
+            first = self.client.get(self.url + '&page_size=3').context['page']
+            last = self.client.get(reverse('job_list') + first.next_url).context['page']
+            self.assertEqual(list(last), [self.applied])
+            back = self.client.get(reverse('job_list') + last.previous_url).context['page']
+            self.assertEqual(list(back), [self.python, self.accountant, nearby])
+
+        paginator = pagination.RankedPaginator(Job.objects.order_by('-posted_at'), ids, page_size=3)
+        page = async_to_sync(paginator.apage)()
+        self.assertEqual(list(page), [self.python, self.accountant, nearby])
+        self.assertEqual(list(async_to_sync(paginator.apage)(page.next_cursor)), [self.applied])
+
+    def test_feed_falls_back_to_newest_without_history(self):
+        other = User.objects.create_user(username='new@example.com', password='pass')
+        self.client.force_login(other)
+        response = self.client.get(self.url)
+        self.assertFalse(response.context['recommended'])
+        self.assertEqual(len(response.context['jobs']), 3)
+
+
+class ApplyJobTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        admin = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        self.job = make_job(admin)
+        self.seeker = User.objects.create_user(username='seeker@example.com', password='pass')
+        self.client.force_login(self.seeker)
+        self.url = reverse('apply_job', args=[self.job.pk])
+
+    def post(self):
+        response = self.client.post(self.url, APPLICATION_DATA)
+        self.assertRedirects(response, reverse('job_list'), fetch_redirect_response=False)
+        return [str(message) for message in get_messages(response.wsgi_request)]
+
+    def test_checks_run_in_one_query(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.post(), ["Application submitted successfully."])
+
+        # Session, user, then the job with the role and duplicate checks;
+        # everything after is the insert and its counters.
+        sql = [query['sql'] for query in queries]
+        checks = sql[:next(i for i, statement in enumerate(sql) if statement.startswith('SAVEPOINT'))]
+        self.assertEqual(len(checks), 3)
+        self.assertIn('already_applied', checks[-1])
+
+        self.assertEqual(self.post()[-1], "You have already applied for this job.")
+        self.assertEqual(JobApplication.objects.count(), 1)
+
+    def test_duplicate_insert_is_caught_from_the_constraint(self):
+        # Another request inserts between the duplicate check and the save.
+        is_valid = JobApplicationForm.is_valid
+
+        def racing_insert(form):
+            JobApplication.objects.create(job=self.job, user=self.seeker, **APPLICATION_DATA)
+            return is_valid(form)
+
+        with mock.patch.object(JobApplicationForm, 'is_valid', racing_insert):
+            self.assertEqual(self.post(), ["You have already applied for this job."])
+        self.assertEqual(JobApplication.objects.count(), 1)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.application_count, 1)
+
+
+class UserRoleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_new_user_gets_one_insert_per_profile_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            user = User.objects.create_user(username='seeker@example.com', password='pass')
+        profile_sql = [q['sql'] for q in queries if 'jobs_userprofile' in q['sql'] or 'jobs_profile' in q['sql']]
+        self.assertEqual(len(profile_sql), 2)
+        self.assertTrue(all(sql.startswith('INSERT') for sql in profile_sql))
+
+        # Idempotent: running the receivers again leaves the rows alone.
+        post_save.send(User, instance=user, created=True)
+        self.assertEqual(UserProfile.objects.filter(user=user).count(), 1)
+        self.assertEqual(Profile.objects.filter(user=user).count(), 1)
+        self.assertEqual(roles.get_role(user), roles.JOBSEEKER)
+
+    def test_role_is_cached_until_the_profile_changes(self):
+        user = User.objects.create_user(username='seeker@example.com', password='pass')
+        self.assertEqual(roles.get_role(user), roles.JOBSEEKER)
+        with self.assertNumQueries(0):
+            self.assertTrue(roles.has_role(User(pk=user.pk), roles.JOBSEEKER))
+
+        user_profile = UserProfile.objects.get(user=user)
+        user_profile.role = roles.EMPLOYER
+        user_profile.save()
+        self.assertEqual(roles.get_role(User(pk=user.pk)), roles.EMPLOYER)
+
+
+class ConcurrentApplyTests(TransactionTestCase):
+    def test_double_submit_creates_one_application(self):
+        cache.clear()
+        admin = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        job = make_job(admin)
+        seeker = User.objects.create_user(username='seeker@example.com', password='pass')
+        first = Client()
+        first.force_login(seeker)
+        second = Client()
+        second.cookies = first.cookies
+        url = reverse('apply_job', args=[job.pk])
+
+        # Both requests pass the duplicate check before either inserts;
+        # then they save one at a time (SQLite allows a single writer).
+        checked = threading.Barrier(2, timeout=10)
+        writer = threading.Lock()
+        is_valid = JobApplicationForm.is_valid
+
+        def checked_then_serialized(form):
+            valid = is_valid(form)
+            checked.wait()
+            writer.acquire()
+            return valid
+
+        responses = []
+
+        def submit(client):
+            try:
+                responses.append(client.post(url, APPLICATION_DATA))
+            finally:
+                writer.release()
+                connection.close()
+
+        with mock.patch.object(JobApplicationForm, 'is_valid', checked_then_serialized):
+            threads = [threading.Thread(target=submit, args=(client,)) for client in (first, second)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(responses), 2)
+        outcomes = sorted(str(message) for response in responses for message in get_messages(response.wsgi_request))
+        self.assertEqual(outcomes, ["Application submitted successfully.", "You have already applied for this job."])
+        self.assertEqual(JobApplication.objects.filter(job=job, user=seeker).count(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.application_count, job.applied_count), (1, 1))
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        self.seekers = [User.objects.create_user(username=f'seeker{i}@example.com') for i in range(3)]
+        self.job = make_job(self.admin)
+        self.inactive = make_job(self.admin, title='Designer', is_active=False)
+        self.applications = [
+            JobApplication.objects.create(
+                job=self.job, user=seeker, full_name=seeker.username, email=seeker.username, phone='9800000000',
+            )
+            for seeker in self.seekers
+        ]
+        self.testimonial = Testimonial.objects.create(user=self.seekers[0], designation='Developer', message='Great.')
+
+    def assertCountersExact(self):
+        counters = stats.get_counters()
+        daily = set(DailyCounter.objects.exclude(value=0).values_list('name', 'day', 'value'))
+        totals = stats.rebuild()
+        self.assertEqual({name: counters[name] for name in totals}, totals)
+        self.assertEqual(daily, set(DailyCounter.objects.values_list('name', 'day', 'value')))
+        self.assertTrue(all(value >= 0 for value in counters.values()))
+
+    def test_saves_and_deletes_keep_counters_exact(self):
+        self.assertEqual(stats.get_counters()[stats.status_counter('applied')], 3)
+        self.applications[0].status = 'shortlisted'
+        self.applications[0].save()
+        self.inactive.is_active = True
+        self.inactive.save()
+        self.testimonial.is_approved = True
+        self.testimonial.save()
+        self.applications[1].delete()
+        self.seekers[2].delete()
+        self.assertCountersExact()
+        self.assertEqual(stats.daily_series(days=1)[0][1], {'users': 3, 'jobs': 2, 'applications': 1, 'testimonials': 1})
+
+    def test_stale_copies_count_one_change_each(self):
+        for instance, field, values in [
+            (self.inactive, 'is_active', [True, True]),
+            (self.applications[0], 'status', ['rejected', 'selected']),
+            (self.testimonial, 'is_approved', [True, True]),
+        ]:
+            copies = [type(instance).objects.get(pk=instance.pk) for _ in values]
+            for copy, value in zip(copies, values):
+                setattr(copy, field, value)
+                copy.save()
+        self.assertCountersExact()
+
+    def test_dashboard_shows_counters_and_daily_series(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin_dashboard'))
+        self.assertEqual(response.context['total_users'], 4)
+        self.assertEqual(response.context['total_jobs'], 2)
+        self.assertEqual(response.context['pending_jobs'], 1)
+        self.assertEqual(response.context['pending_testimonials'], 1)
+        self.assertIn(('Applied', 3), response.context['application_status_counts'])
+        series = response.context['daily_series']
+        self.assertEqual(len(series), 14)
+        self.assertEqual(series[0], (timezone.localdate(), {'users': 4, 'jobs': 2, 'applications': 3, 'testimonials': 1}))
+        self.assertEqual(series[1][1], {'users': 0, 'jobs': 0, 'applications': 0, 'testimonials': 0})
+
+    def test_reconcile_stats_command(self):
+        SiteCounter.objects.filter(name=stats.APPLICATIONS).update(value=-2)
+        DailyCounter.objects.filter(name='jobs').update(value=9)
+
+        out = io.StringIO()
+        call_command('reconcile_stats', stdout=out)
+        self.assertIn('applications                 3  (was -2)', out.getvalue())
+        self.assertEqual(stats.get_counters()[stats.APPLICATIONS], 3)
+        self.assertEqual(DailyCounter.objects.get(name='jobs').value, 2)
+
+
+class ApplicationCounterTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='hr@example.com', password='pass')
+        self.client.force_login(self.admin)
+        self.job = make_job(self.admin)
+        self.other_job = make_job(self.admin, title='Designer')
+
+    def apply(self, job, i, status='applied'):
+        return JobApplication.objects.create(
+            job=job, user=User.objects.create_user(username=f'seeker{i}@example.com'),
+            full_name=f'Seeker {i}', email=f'seeker{i}@example.com', phone='9800000000', status=status,
+        )
+
+    def counts(self, job):
+        job.refresh_from_db()
+        return {field: getattr(job, field) for field in Job.COUNTER_FIELDS if getattr(job, field)}
+
+    def test_create_status_change_and_delete(self):
+        first = self.apply(self.job, 1)
+        second = self.apply(self.job, 2)
+        self.apply(self.other_job, 3, status='reviewing')
+
+        self.client.get(reverse('update_application_status', args=[first.id, 'shortlisted']))
+        changelist = reverse('admin:jobs_jobapplication_changelist')
+        self.client.post(changelist, {
+            'form-TOTAL_FORMS': '1', 'form-INITIAL_FORMS': '1',
+            'form-0-id': str(second.id), 'form-0-status': 'selected', '_save': 'Save',
+        })
+        self.assertEqual(JobApplication.objects.get(pk=second.pk).status, 'selected')
+        self.assertEqual(self.counts(self.job), {'application_count': 2, 'shortlisted_count': 1, 'selected_count': 1})
+
+        JobApplication.objects.filter(pk=second.pk).delete()
+        self.assertEqual(self.counts(self.job), {'application_count': 1, 'shortlisted_count': 1})
+        self.assertEqual(self.counts(self.other_job), {'application_count': 1, 'reviewing_count': 1})
+
+    def test_bulk_status_change_and_stale_job_save(self):
+        stale = Job.objects.get(pk=self.job.pk)
+        for i in range(3):
+            self.apply(self.job, i)
+        self.apply(self.other_job, 3)
+
+        bulk.update(JobApplication.objects.all(), status='rejected')
+        stale.title = 'Senior Python Developer'
+        stale.save()
+
+        self.assertEqual(self.counts(self.job), {'application_count': 3, 'rejected_count': 3})
+        self.assertEqual(self.counts(self.other_job), {'application_count': 1, 'rejected_count': 1})
+
+    def test_stale_copies_count_one_change_each(self):
+        application = self.apply(self.job, 1)
+        first = JobApplication.objects.get(pk=application.pk)
+        second = JobApplication.objects.get(pk=application.pk)
+        first.status = 'rejected'
+        first.save()
+        second.status = 'selected'
+        second.save()
+        self.assertEqual(self.counts(self.job), {'application_count': 1, 'selected_count': 1})
+
+        first.job = self.other_job
+        first.save()
+        self.assertEqual(self.counts(self.job), {})
+        self.assertEqual(self.counts(self.other_job), {'application_count': 1, 'rejected_count': 1})
+        self.assertEqual(application_counts.rebuild(), 0)
+        counters = stats.get_counters()
+        self.assertEqual({name: counters[name] for name in stats.rebuild()}, stats.rebuild())
+
+    def test_repair_command(self):
+        self.apply(self.job, 1, status='selected')
+        Job.objects.update(application_count=7, applied_count=2, selected_count=0)
+
+        out = io.StringIO()
+        call_command('repair_application_counts', '--batch-size', '1', stdout=out)
+        self.assertIn('2 job(s) corrected', out.getvalue())
+        self.assertEqual(self.counts(self.job), {'application_count': 1, 'selected_count': 1})
+        self.assertEqual(self.counts(self.other_job), {})
+
+
+@override_settings(REPLICA_DATABASES=['replica1', 'replica2'])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+        routers._down_until.clear()
+        self.addCleanup(routers._down_until.clear)
+
+    def through_middleware(self, request, view):
+        return routers.PrimaryPinningMiddleware(view)(request)
+
+    def test_reads_go_to_an_available_replica_or_the_primary(self):
+        with mock.patch.object(connections['default'], 'in_atomic_block', False):
+            with mock.patch.object(routers, 'is_available', side_effect=lambda alias: alias == 'replica2'):
+                self.assertEqual(self.router.db_for_read(Job), 'replica2')
+            routers.mark_down('replica1')
+            routers.mark_down('replica2')
+            self.assertEqual(self.router.db_for_read(Job), 'default')
+        self.assertFalse(self.router.allow_migrate('replica1', 'jobs'))
+
+    def test_write_pins_the_request_and_the_next_ones(self):
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(Job))
+            self.assertEqual(self.router.db_for_write(Job), 'default')
+            seen.append(self.router.db_for_read(Job))
+            return HttpResponse()
+
+        factory = RequestFactory()
+        with mock.patch.object(connections['default'], 'in_atomic_block', False), \
+                mock.patch.object(routers, 'is_available', return_value=True):
+            response = self.through_middleware(factory.get('/'), view)
+            self.assertIn(seen[0], ('replica1', 'replica2'))
+            self.assertEqual(seen[1], 'default')
+            self.assertEqual(response.cookies[routers.PIN_COOKIE]['max-age'], 5)
+
+            seen.clear()
+            request = factory.get('/')
+            request.COOKIES[routers.PIN_COOKIE] = '1'
+            self.through_middleware(request, view)
+            self.through_middleware(factory.post('/'), view)
+            self.assertEqual(seen, ['default'] * 4)
+
+    def test_only_cache_refills_read_from_the_primary_after_invalidation(self):
+        seen = []
+
+        def record_read(queryset):
+            seen.append(self.router.db_for_read(Job))
+            return {'total': 0, 'job_type': {}, 'location': {}, 'featured': 0}
+
+        def view(request):
+            seen.append(self.router.db_for_read(Job))
+            facets.base_counts()
+            return HttpResponse()
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+        factory = RequestFactory()
+        with mock.patch.object(connections['default'], 'in_atomic_block', False), \
+                mock.patch.object(routers, 'is_available', return_value=True), \
+                mock.patch.object(facets, 'count', side_effect=record_read):
+            facets.invalidate()
+            page_cache.invalidate(page_cache.JOBS)
+            response = self.through_middleware(factory.get('/'), view)
+            self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+            self.assertTrue(routers.held(page_cache._version_key(page_cache.JOBS)))
+            self.assertFalse(routers.held(fragments.HOME_TESTIMONIALS))
+
+            facets.invalidate()
+            with mock.patch.object(routers.time, 'time', return_value=time.time() + 6):
+                self.through_middleware(factory.get('/'), view)
+        self.assertIn(seen[0], ('replica1', 'replica2'))
+        self.assertEqual(seen[1], 'default')
+        self.assertIn(seen[2], ('replica1', 'replica2'))
+        self.assertIn(seen[3], ('replica1', 'replica2'))
+
+    async def test_async_refill_honours_the_hold(self):
+        async def view(request):
+            with routers.primary_reads(await routers.aheld(facets.BASE_KEY)):
+                return HttpResponse(await sync_to_async(self.router.db_for_read)(Job))
+
+        await sync_to_async(cache.clear)()
+        self.addCleanup(cache.clear)
+        await sync_to_async(facets.invalidate)()
+        with mock.patch.object(routers, 'is_available', return_value=True):
+            response = await routers.PrimaryPinningMiddleware(view)(RequestFactory().get('/'))
+        self.assertEqual(response.content, b'default')
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_middleware_unused_without_replicas(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            routers.PrimaryPinningMiddleware(lambda request: HttpResponse())
+
+    async def test_async_middleware_sees_writes_from_orm_threads(self):
+        async def view(request):
+            # The async ORM routes and runs queries in a worker thread.
+            await sync_to_async(self.router.db_for_write)(Job)
+            return HttpResponse()
+
+        with mock.patch.object(routers, 'is_available', return_value=True):
+            response = await routers.PrimaryPinningMiddleware(view)(RequestFactory().get('/'))
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        self.job = make_job(admin, featured=True)
+        self.closed = make_job(admin, title='Closed Role', is_active=False)
+        self.seeker = User.objects.create_user(username='seeker@example.com', password='pass')
+        JobApplication.objects.create(
+            job=self.job, user=self.seeker, full_name='Seeker', email='seeker@example.com', phone='9800000000',
+        )
+        Testimonial.objects.create(user=self.seeker, message='Found a job here.', is_approved=True)
+        self.enterContext(bench_concurrency.read_views(async_views=True))
+
+    async def test_read_paths(self):
+        self.assertTrue(iscoroutinefunction(resolve(reverse('job_list')).func))
+
+        response = await self.async_client.get(reverse('home'))
+        self.assertContains(response, 'Python Developer')
+        self.assertContains(response, 'Found a job here.')
+        response = await self.async_client.get(reverse('job_list'), {'q': 'python'})
+        self.assertEqual([job.pk for job in response.context['jobs']], [self.job.pk])
+        response = await self.async_client.get(reverse('job_detail', args=[self.job.pk]))
+        self.assertContains(response, 'Python Developer')
+        response = await self.async_client.get(reverse('job_detail', args=[self.closed.pk]))
+        self.assertEqual(response.status_code, 404)
+
+        response = await self.async_client.get(reverse('my_jobs'))
+        self.assertEqual(response.status_code, 302)
+        await self.async_client.aforce_login(self.seeker)
+        response = await self.async_client.get(reverse('my_jobs'))
+        self.assertEqual([app.job.title for app in response.context['applications']], ['Python Developer'])
+        response = await self.async_client.get(reverse('job_list'))
+        self.assertEqual([job.applied for job in response.context['jobs']], [True])
+        with mock.patch.object(feed, 'get_feed', return_value=[self.job.pk]):
+            response = await self.async_client.get(reverse('job_list'), {'sort': feed.FOR_YOU})
+        self.assertTrue(response.context['recommended'])
+        self.assertEqual([job.pk for job in response.context['jobs']], [self.job.pk])
+
+    async def test_anonymous_pages_are_cached(self):
+        url = reverse('job_detail', args=[self.job.pk])
+        await sync_to_async(cache.clear)()
+        first = await self.async_client.get(url)
+        second = await self.async_client.get(url)
+        self.assertEqual((first['X-Page-Cache'], second['X-Page-Cache']), ('miss', 'hit'))
+        self.assertEqual(first.content, second.content)
+
+
+def session_writes(queries):
+    return [
+        q['sql'] for q in queries
+        if 'django_session' in q['sql'] and not q['sql'].startswith('SELECT')
+    ]
+
+
+class SessionRefreshTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='seeker@example.com', password='pass')
+        self.client.force_login(self.user)
+        self.client.get(reverse('my_jobs'))
+
+    def test_page_views_do_not_write_session(self):
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(3):
+                self.assertEqual(self.client.get(reverse('my_jobs')).status_code, 200)
+        self.assertEqual(session_writes(queries), [])
+
+    def test_session_near_expiry_is_extended(self):
+        session = self.client.session
+        session[sessions.REFRESHED_KEY] = int(time.time()) - session.get_expiry_age() + 60
+        session.save()
+        before = Session.objects.get().expire_date
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('my_jobs'))
+        self.assertEqual(len(session_writes(queries)), 1)
+        self.assertIn('sessionid', response.cookies)
+        self.assertGreater(Session.objects.get().expire_date, before)
+
+    def test_prune_expired_in_batches(self):
+        past = timezone.now() - timezone.timedelta(days=1)
+        Session.objects.bulk_create(
+            Session(session_key=f'expired{i:04d}', session_data='', expire_date=past) for i in range(7)
+        )
+        self.assertEqual(list(sessions.prune_expired(batch_size=3)), [3, 3, 1])
+        self.assertEqual(Session.objects.count(), 1)
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.employer = User.objects.create_user(username='hr@example.com', password='pass', is_staff=True)
+        make_job(self.employer)
+
+    def test_disabled_records_nothing(self):
+        self.client.get(reverse('job_list'))
+        self.assertEqual(metrics.registry.snapshot(), {})
+
+    @override_settings(REQUEST_METRICS_ENABLED=True)
+    def test_requests_recorded_per_view(self):
+        self.client.force_login(self.employer)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('job_list'))
+        first_queries = len(queries)
+        self.client.get(reverse('job_list'))
+
+        row = next(row for row in metrics.report() if row['view'] == 'job_list')
+        self.assertEqual(row['requests'], 2)
+        self.assertEqual(row['queries_max'], first_queries)
+        self.assertGreater(row['wall_p95'], 0)
+        self.assertGreater(row['template_p95'], 0)
+
+        response = self.client.get(reverse('admin_metrics'))
+        self.assertContains(response, 'job_list')
+
+    def test_fingerprint_groups_repeated_queries(self):
+        self.assertEqual(
+            metrics.fingerprint('SELECT * FROM "jobs_job" WHERE "id" = 1 AND "title" = \'a\''),
+            metrics.fingerprint('SELECT  * FROM "jobs_job" WHERE "id" = 22 AND "title" = \'b c\''),
+        )
+        self.assertEqual(
+            metrics.fingerprint('SELECT 1 WHERE "id" IN (%s, %s, %s)'),
+            metrics.fingerprint('SELECT 1 WHERE "id" IN (%s)'.replace('(%s)', '(%s, %s)')),
+        )
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_seed_and_run(self):
+        counts = {'users': 5, 'jobs': 10, 'applications': 12, 'testimonials': 2, 'messages': 3}
+        fixtures = bench_data.seed(counts, seed=1)
+        self.assertEqual(JobApplication.objects.count(), 12)
+        self.assertEqual(stats.get_counters()[stats.APPLICATIONS], 12)
+
+        scenarios = {s.name: s for s in bench_suite.build_scenarios(fixtures)}
+        result = bench_suite.run_scenario(scenarios['apply_job'], repeat=3, warmup=1, memory_runs=1)
+        self.assertEqual(JobApplication.objects.filter(full_name='Bench Applicant').count(), 5)
+        self.assertGreater(result['queries'], 0)
+
+    def test_compare_flags_slowdowns_and_extra_queries(self):
+        baseline = {'results': {
+            'job_list': {'p50_ms': 10.0, 'queries': 3},
+            'home': {'p50_ms': 1.0, 'queries': 2},
+        }}
+        results = {
+            'job_list': {'p50_ms': 20.0, 'queries': 4},
+            'home': {'p50_ms': 2.0, 'queries': 2},
+        }
+        problems = bench_suite.compare(results, baseline, tolerance=0.25, min_delta_ms=2.0)
+        self.assertEqual(len(problems), 2)
+        self.assertTrue(all(problem.startswith('job_list') for problem in problems))
@@ -0,0 +1,191 @@
+"""
+Deferred file uploads.
+
+Views detach freshly uploaded files from their forms and queue them as
+``PendingUpload`` rows in the same transaction as the object they belong
+to, so the request never waits on Cloudinary. The ``process_uploads``
+command drains the queue with a pool of worker threads, retrying failed
+uploads with exponential backoff.
+
+The remote side is pluggable through ``settings.UPLOADS_BACKEND``:
+``CloudinaryUploader`` in production, ``LocalUploader`` to run offline.
+Both can also ``download`` a stored file again (``jobs.resumes`` reads
+resumes that way).
+"""
+import datetime
+import io
+import os
+import time
+import urllib.request
+import uuid
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import PendingUpload
+
+PENDING = 'pending'
+RUNNING = 'running'
+FAILED = 'failed'
+
+# Seconds to wait on remote storage when reading a file back.
+DOWNLOAD_TIMEOUT = 30
+
+
+class CloudinaryUploader:
+    def upload(self, fileobj, file_name, field):
+        from cloudinary import uploader
+
+        options = {'type': field.type, 'resource_type': field.resource_type}
+        options.update({key: value for key, value in field.options.items() if not callable(value)})
+        return uploader.upload_resource(fileobj, **options).get_prep_value()
+
+    def download(self, value, field):
+        with urllib.request.urlopen(value.build_url(), timeout=DOWNLOAD_TIMEOUT) as response:
+            return response.read()
+
+
+class LocalUploader:
+    """
+    Offline stand-in: writes files under ``settings.UPLOADS_LOCAL_ROOT`` and
+    returns an identifier in the format ``CloudinaryField`` stores.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or getattr(
+            settings, 'UPLOADS_LOCAL_ROOT', os.path.join(settings.BASE_DIR, 'media', 'local-uploads')
+        )
+
+    def upload(self, fileobj, file_name, field):
+        stem, ext = os.path.splitext(file_name)
+        public_id = f"{uuid.uuid4().hex}"
+        directory = os.path.join(self.root, field.resource_type)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, public_id + ext), 'wb') as out:
+            out.write(fileobj.read())
+        return f"{field.resource_type}/{field.type}/v{int(time.time())}/{public_id}{ext}"
+
+    def download(self, value, field):
+        name = os.path.basename(field.get_prep_value(value))
+        with open(os.path.join(self.root, field.resource_type, name), 'rb') as f:
+            return f.read()
+
+
+def get_uploader():
+    return import_string(getattr(settings, 'UPLOADS_BACKEND', 'jobs.uploads.CloudinaryUploader'))()
+
+
+# ==========================
+# REQUEST SIDE
+# ==========================
+def detach(form, field_names):
+    """
+    Take new uploads off a validated ModelForm's instance so saving it does
+    not upload them inline. The fields keep their previous value until the
+    worker finishes. Returns ``[(field_name, UploadedFile), ...]``.
+    """
+    pending = []
+    for name in field_names:
+        value = form.cleaned_data.get(name)
+        if isinstance(value, UploadedFile):
+            pending.append((name, value))
+            setattr(form.instance, name, form.initial.get(name))
+    return pending
+
+
+def enqueue(instance, pending):
+    """Queue the files returned by ``detach`` for ``instance`` (which must be saved)."""
+    if not pending:
+        return []
+    content_type = ContentType.objects.get_for_model(instance)
+    tasks = []
+    for field_name, upload in pending:
+        upload.seek(0)
+        tasks.append(PendingUpload(
+            content_type=content_type,
+            object_id=instance.pk,
+            field_name=field_name,
+            file_name=os.path.basename(upload.name),
+            data=upload.read(),
+        ))
+    return PendingUpload.objects.bulk_create(tasks)
+
+
+# ==========================
+# WORKER SIDE
+# ==========================
+def claim(batch_size, lease_seconds):
+    """
+    Mark up to ``batch_size`` due tasks as running and return their ids.
+    Tasks left running by a crashed worker become claimable again after
+    ``lease_seconds``.
+    """
+    now = timezone.now()
+    due = Q(status=PENDING, available_at__lte=now) | Q(
+        status=RUNNING, claimed_at__lt=now - datetime.timedelta(seconds=lease_seconds)
+    )
+    with transaction.atomic():
+        ids = list(
+            PendingUpload.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by('available_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        PendingUpload.objects.filter(id__in=ids).update(
+            status=RUNNING, claimed_at=now, attempts=F('attempts') + 1
+        )
+    return ids
+
+
+def _set_upload_status(model, object_id, status):
+    if any(field.name == 'upload_status' for field in model._meta.fields):
+        obj = model.objects.filter(pk=object_id).first()
+        if obj is not None and obj.upload_status != status:
+            obj.upload_status = status
+            obj.save(update_fields=['upload_status'])
+
+
+def process(task_id, uploader, max_attempts=5, backoff_seconds=30):
+    """Upload one claimed task. Returns 'done', 'retry', 'failed' or 'missing'."""
+    task = PendingUpload.objects.select_related('content_type').filter(pk=task_id).first()
+    if task is None:
+        return 'missing'
+    model = task.content_type.model_class()
+    field = model._meta.get_field(task.field_name)
+
+    try:
+        value = uploader.upload(io.BytesIO(bytes(task.data)), task.file_name, field)
+    except Exception as e:
+        if task.attempts >= max_attempts:
+            PendingUpload.objects.filter(pk=task.pk).update(status=FAILED, last_error=repr(e))
+            _set_upload_status(model, task.object_id, FAILED)
+            return 'failed'
+        delay = backoff_seconds * 2 ** (task.attempts - 1)
+        PendingUpload.objects.filter(pk=task.pk).update(
+            status=PENDING,
+            last_error=repr(e),
+            available_at=timezone.now() + datetime.timedelta(seconds=delay),
+        )
+        return 'retry'
+
+    with transaction.atomic():
+        obj = model.objects.select_for_update().filter(pk=task.object_id).first()
+        task.delete()
+        if obj is None:
+            return 'missing'
+        setattr(obj, task.field_name, field.to_python(value))
+        update_fields = [task.field_name]
+        remaining = PendingUpload.objects.filter(
+            content_type=task.content_type, object_id=task.object_id
+        ).exclude(status=FAILED)
+        if hasattr(obj, 'upload_status') and not remaining.exists():
+            obj.upload_status = 'complete'
+            update_fields.append('upload_status')
+        # A real save so post_save receivers (profile cache, page cache) run.
+        obj.save(update_fields=update_fields)
+    return 'done'
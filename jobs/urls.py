@@ -1,22 +1,27 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 from django.contrib.auth import views as auth_views
 from django.urls import reverse_lazy
 
+# Under ASGI the public read paths can wait on the database without
+# holding a thread; see jobs.async_views.
+read_views = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
     # ==========================
     # PUBLIC PAGES
     # ==========================
-    path('', views.home, name='home'),
+    path('', read_views.home, name='home'),
     path('contact/', views.contact, name='contact'),
 
     # ==========================
     # JOBS
     # ==========================
-    path('jobs/', views.job_list, name='job_list'),
-    path('jobs/<int:job_id>/', views.job_detail, name='job_detail'),
+    path('jobs/', read_views.job_list, name='job_list'),
+    path('jobs/<int:job_id>/', read_views.job_detail, name='job_detail'),
     path('jobs/<int:job_id>/apply/', views.apply_job, name='apply_job'),
-    path('my-jobs/', views.my_jobs, name='my_jobs'),
+    path('my-jobs/', read_views.my_jobs, name='my_jobs'),
     path('dashboard/admin/users/<int:id>/delete/', views.delete_user, name='delete_user'),
     
 
@@ -45,20 +50,30 @@ urlpatterns = [
     path('dashboard/admin/jobs/<int:id>/approve/', views.approve_job, name='approve_job'),
     path('dashboard/admin/jobs/<int:id>/reject/', views.reject_job, name='reject_job'),
     path('dashboard/admin/jobs/edit/<int:job_id>/', views.edit_job, name='edit_job'),
+    path('dashboard/admin/jobs/bulk/', views.bulk_jobs, name='bulk_jobs'),
+    path('dashboard/admin/jobs/import/', views.import_jobs, name='import_jobs'),
 
     # Admin Applications
     path('dashboard/admin/applications/', views.admin_applications, name='admin_applications'),
+    path(
+        'dashboard/admin/applications/bulk/',
+        views.bulk_application_status,
+        name='bulk_application_status'
+    ),
     path(
         'dashboard/admin/applications/<int:app_id>/<str:status>/',
         views.update_application_status,
         name='update_application_status'
     ),
    path("dashboard/admin/messages/", views.messages_list, name="admin_messages"),
+    path('dashboard/admin/export/<str:dataset>/', views.export_data, name='export_data'),
+    path('dashboard/admin/metrics/', views.admin_metrics, name='admin_metrics'),
 
 
     # Admin Users
     path('dashboard/admin/users/', views.admin_users, name='admin_users'),
     path('dashboard/admin/users/<int:id>/toggle/', views.toggle_user, name='toggle_user'),
+    path('dashboard/admin/users/bulk/', views.bulk_users, name='bulk_users'),
     path('dashboard/admin/testimonials/', views.admin_testimonials, name='admin_testimonials'),
     path('dashboard/admin/testimonials/<int:id>/approve/', views.approve_testimonial, name='approve_testimonial'),
     path('dashboard/admin/testimonials/<int:id>/unapprove/', views.unapprove_testimonial, name='unapprove_testimonial'),
@@ -1,4 +1,3 @@
-from django.db.models import Q
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login, logout, update_session_auth_hash
@@ -14,31 +13,43 @@ from .forms import (
     JobApplicationForm,
     ProfilePhotoForm,
     JobCreateForm,
+    JobFilterForm,
+    JobImportForm,
     CustomPasswordChangeForm
 )
-from .models import Profile, Job, JobApplication, UserProfile, ContactMessage
+from .models import Profile, Job, JobApplication, ContactMessage
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 import re
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
 from .models import Testimonial
 from .forms import TestimonialForm
+from django.conf import settings
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.views.decorators.http import require_POST
+from . import (
+    bulk, exports, facets, feed, fragments, imports, metrics, page_cache, resumes, roles, routers, search, similarity,
+    stats, uploads,
+)
+from .page_cache import cache_anonymous_page
+from .pagination import paginate, paginate_ranked
 
 # ==========================
 # HOME
 # ==========================
+@cache_anonymous_page('home', depends_on=(page_cache.JOBS, page_cache.TESTIMONIALS))
 def home(request):
+    # Both querysets stay lazy: on a fragment cache hit they never run.
     featured_jobs = Job.objects.filter(featured=True, is_active=True)
-    testimonials = Testimonial.objects.filter(is_approved=True).select_related('user').order_by('-created_at')[:6]
-
-    for testimonial in testimonials:
-        profile = Profile.objects.filter(user=testimonial.user).first()
-        testimonial.profile_photo_url = profile.photo.url if profile and profile.photo else None
+    testimonials = Testimonial.objects.filter(is_approved=True).select_related('user__profile').order_by('-created_at')[:6]
 
-    return render(request, 'jobs/home.html', {
-        'featured_jobs': featured_jobs,
-        'testimonials': testimonials
-    })
+    with routers.primary_reads(routers.held(fragments.HOME_FEATURED_JOBS, fragments.HOME_TESTIMONIALS)):
+        return render(request, 'jobs/home.html', {
+            'featured_jobs': featured_jobs,
+            'testimonials': testimonials,
+            'fragment_timeout': fragments.FRAGMENT_TIMEOUT
+        })
 
 
 # ==========================
@@ -79,10 +90,6 @@ def register(request):
                     last_name=last_name
                 )
 
-                user_profile, created = UserProfile.objects.get_or_create(user=user)
-                user_profile.role = 'jobseeker'
-                user_profile.save()
-
             messages.success(request, "Account created successfully.")
             return redirect('login')
 
@@ -135,9 +142,14 @@ def edit_profile(request):
         profile_form = ProfileUpdateForm(request.POST, request.FILES, instance=profile)
 
         if user_form.is_valid() and profile_form.is_valid():
-            user_form.save()
-            profile_form.save()
-            messages.success(request, "Profile updated successfully.")
+            with transaction.atomic():
+                user_form.save()
+                pending = uploads.detach(profile_form, ['photo'])
+                uploads.enqueue(profile_form.save(), pending)
+            if pending:
+                messages.success(request, "Profile updated successfully. Your new photo will appear shortly.")
+            else:
+                messages.success(request, "Profile updated successfully.")
             return redirect('profile')
     else:
         user_form = UserUpdateForm(instance=request.user)
@@ -153,38 +165,62 @@ def edit_profile(request):
 # ==========================
 # JOB LIST & DETAILS
 # ==========================
+def with_applied(jobs, user):
+    """Annotate ``applied`` (has ``user`` applied?) in the jobs query itself."""
+    if not user.is_authenticated:
+        return jobs
+    return jobs.annotate(applied=Exists(
+        JobApplication.objects.filter(job=OuterRef('pk'), user=user)
+    ))
+
+
+@cache_anonymous_page('job_list', params=(
+    'q', 'location', 'job_type', 'salary_from', 'salary_to', 'salary_currency', 'salary_period',
+    'featured', 'cursor', 'page_size',
+))
 def job_list(request):
     query = request.GET.get('q', '')
     location = request.GET.get('location', '')
+    filters = JobFilterForm(request.GET)
 
-    jobs = Job.objects.filter(is_active=True)
-
-    if query:
-        jobs = jobs.filter(
-            Q(title__icontains=query) |
-            Q(company_name__icontains=query)
-        )
+    jobs = filters.filter(Job.objects.filter(is_active=True).order_by('-posted_at'))
 
-    if location:
-        jobs = jobs.filter(location__icontains=location)
+    if query or location:
+        jobs = search.search_jobs(jobs, query=query, location=location)
 
-    applied_jobs = []
-    if request.user.is_authenticated:
-        applied_jobs = JobApplication.objects.filter(
-            user=request.user
-        ).values_list('job_id', flat=True)
+    sort = request.GET.get('sort', '')
+    recommended = feed.get_feed(request.user) if sort == feed.FOR_YOU and request.user.is_authenticated else None
+    if recommended:
+        page = paginate_ranked(request, with_applied(jobs, request.user), recommended)
+    else:
+        page = paginate(request, with_applied(jobs, request.user))
+    filtered = bool(query or location) or any(
+        value not in (None, '', False) for value in filters.cleaned_data.values()
+    )
+    job_facets = facets.build(request.GET, jobs, filtered)
 
     return render(request, 'jobs/job_list.html', {
-        'jobs': jobs,
+        'jobs': page.object_list,
+        'page': page,
         'query': query,
         'location': location,
-        'applied_jobs': applied_jobs
+        'filters': filters.cleaned_data,
+        'job_types': Job.JOB_TYPE_CHOICES,
+        'salary_currencies': Job.CURRENCY_CHOICES,
+        'salary_periods': Job.SALARY_PERIOD_CHOICES,
+        'facets': job_facets,
+        'sort': sort,
+        'recommended': bool(recommended),
     })
 
 
+@cache_anonymous_page('job_detail')
 def job_detail(request, job_id):
     job = get_object_or_404(Job, id=job_id, is_active=True)
-    return render(request, 'jobs/job_detail.html', {'job': job})
+    return render(request, 'jobs/job_detail.html', {
+        'job': job,
+        'similar_jobs': similarity.similar_jobs(job),
+    })
 
 
 # ==========================
@@ -192,18 +228,24 @@ def job_detail(request, job_id):
 # ==========================
 @login_required
 def apply_job(request, job_id):
-    job = get_object_or_404(Job, id=job_id, is_active=True)
+    # The job and whether the user already applied, in one query.
+    job = get_object_or_404(
+        Job.objects.annotate(
+            already_applied=Exists(JobApplication.objects.filter(job=OuterRef('pk'), user=request.user)),
+        ),
+        id=job_id,
+        is_active=True,
+    )
 
     if request.user.is_staff or request.user.is_superuser:
         messages.error(request, "Admins cannot apply for jobs.")
         return redirect('job_list')
 
-    user_profile = UserProfile.objects.filter(user=request.user).first()
-    if not user_profile or user_profile.role != 'jobseeker':
+    if not roles.has_role(request.user, roles.JOBSEEKER):
         messages.error(request, "Only job seekers can apply for jobs.")
         return redirect('job_list')
 
-    if JobApplication.objects.filter(job=job, user=request.user).exists():
+    if job.already_applied:
         messages.warning(request, "You have already applied for this job.")
         return redirect('job_list')
 
@@ -212,7 +254,22 @@ def apply_job(request, job_id):
         form = JobApplicationForm(request.POST, request.FILES, instance=application)
 
         if form.is_valid():
-            form.save()
+            # Files go to Cloudinary from the process_uploads worker, not here.
+            try:
+                with transaction.atomic():
+                    pending = uploads.detach(form, ['photo', 'resume'])
+                    application = form.save(commit=False)
+                    if pending:
+                        application.upload_status = 'pending'
+                    application.save()
+                    uploads.enqueue(application, pending)
+            except IntegrityError:
+                # The unique (job, user) constraint caught a concurrent
+                # submit, e.g. a double click.
+                if not JobApplication.objects.filter(job=job, user=request.user).exists():
+                    raise
+                messages.warning(request, "You have already applied for this job.")
+                return redirect('job_list')
             messages.success(request, "Application submitted successfully.")
             return redirect('job_list')
     else:
@@ -235,9 +292,11 @@ def my_jobs(request):
     applications = JobApplication.objects.filter(
         user=request.user
     ).select_related('job')
+    page = paginate(request, applications)
 
     return render(request, 'jobs/my_jobs.html', {
-        'applications': applications
+        'applications': page.object_list,
+        'page': page
     })
 
 
@@ -251,30 +310,56 @@ def admin_dashboard(request):
     if request.method == 'POST':
         form = ProfilePhotoForm(request.POST, request.FILES, instance=profile)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                pending = uploads.detach(form, ['photo'])
+                uploads.enqueue(form.save(), pending)
             return redirect('admin_dashboard')
     else:
         form = ProfilePhotoForm(instance=profile)
 
+    counters = stats.get_counters()
+
     context = {
     'profile': profile,
     'form': form,
-    'total_users': User.objects.count(),
-    'total_jobs': Job.objects.count(),
-    'total_applications': JobApplication.objects.count(),
-    'pending_jobs': Job.objects.filter(is_active=False).count(),
-    'pending_testimonials': Testimonial.objects.filter(is_approved=False).count(),
-    'approved_testimonials': Testimonial.objects.filter(is_approved=True).count(),
+    'total_users': counters[stats.USERS],
+    'total_jobs': counters[stats.JOBS],
+    'total_applications': counters[stats.APPLICATIONS],
+    'pending_jobs': counters[stats.INACTIVE_JOBS],
+    'pending_testimonials': counters[stats.PENDING_TESTIMONIALS],
+    'approved_testimonials': counters[stats.APPROVED_TESTIMONIALS],
+    'application_status_counts': [
+        (label, counters[stats.status_counter(status)])
+        for status, label in JobApplication.STATUS_CHOICES
+    ],
+    'daily_series': stats.daily_series(),
     'user': request.user
 }
 
     return render(request, 'jobs/admin/admin_dashboard.html', context)
 
 
+def bulk_selection(request, queryset, filters):
+    """
+    Rows targeted by a bulk form: the ticked ``ids``, or with ``select=all``
+    every row matching the posted ``filters`` (``{param: lookup}``).
+    """
+    if request.POST.get("select") == "all":
+        try:
+            return queryset.filter(**{
+                lookup: request.POST[param]
+                for param, lookup in filters.items()
+                if request.POST.get(param)
+            })
+        except (ValueError, ValidationError):
+            return queryset.none()
+    return queryset.filter(pk__in=bulk.ids_from(request.POST))
+
+
 @staff_member_required
 def admin_jobs(request):
-    jobs = Job.objects.all()
-    return render(request, "jobs/admin/admin_jobs.html", {"jobs": jobs})
+    page = paginate(request, Job.objects.select_related("posted_by").order_by("-posted_at"))
+    return render(request, "jobs/admin/admin_jobs.html", {"jobs": page.object_list, "page": page})
 
 
 @staff_member_required
@@ -293,6 +378,24 @@ def admin_create_job(request):
     return render(request, "jobs/admin/admin_create_job.html", {"form": form})
 
 
+@staff_member_required
+def import_jobs(request):
+    result = None
+    if request.method == "POST":
+        form = JobImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data["file"]
+            fmt = form.cleaned_data["format"] or imports.guess_format(upload.name)
+            result = imports.import_jobs(
+                imports.text_stream(upload.file), fmt, request.user, max_errors=100
+            )
+            messages.success(request, f"Imported {result.created} of {result.rows} rows.")
+    else:
+        form = JobImportForm()
+
+    return render(request, "jobs/admin/import_jobs.html", {"form": form, "result": result})
+
+
 @staff_member_required
 def edit_job(request, job_id):
     job = get_object_or_404(Job, id=job_id)
@@ -328,10 +431,42 @@ def reject_job(request, id):
     return redirect("admin_jobs")
 
 
+@staff_member_required
+@require_POST
+def bulk_jobs(request):
+    action = request.POST.get("action")
+    if action not in ("approve", "reject"):
+        messages.error(request, "Choose an action.")
+        return redirect("admin_jobs")
+
+    selected = bulk_selection(request, Job.objects.all(), {"is_active": "is_active"})
+    updated = bulk.update(selected, is_active=(action == "approve"))
+    messages.success(request, f"{updated} job(s) {'approved' if action == 'approve' else 'deactivated'}.")
+    return redirect("admin_jobs")
+
+
+def search_applications(applications, query):
+    """``applications`` whose name, email or resume keywords match ``query``; all of them if it is blank."""
+    query = query.strip()
+    if not query:
+        return applications
+    return applications.filter(Q(full_name__icontains=query) | Q(email__icontains=query) | resumes.matching(query))
+
+
 @staff_member_required
 def admin_applications(request):
-    applications = JobApplication.objects.select_related("job", "user")
-    return render(request, "jobs/admin/admin_applications.html", {"applications": applications})
+    query = request.GET.get("q", "").strip()
+    applications = JobApplication.objects.select_related("job", "user", "resume_text").defer(
+        "resume_text__text", "resume_text__keywords"
+    )
+    applications = search_applications(applications, query)
+    page = paginate(request, applications)
+    return render(request, "jobs/admin/admin_applications.html", {
+        "applications": page.object_list,
+        "page": page,
+        "query": query,
+        "status_choices": JobApplication.STATUS_CHOICES
+    })
 
 
 @staff_member_required
@@ -345,10 +480,30 @@ def update_application_status(request, app_id, status):
     return redirect("admin_applications")
 
 
+@staff_member_required
+@require_POST
+def bulk_application_status(request):
+    status = request.POST.get("status")
+    if status not in dict(JobApplication.STATUS_CHOICES):
+        messages.error(request, "Choose a valid status.")
+        return redirect("admin_applications")
+
+    # Select-all covers the list as the form showed it, search included.
+    applications = JobApplication.objects.all()
+    if request.POST.get("select") == "all":
+        applications = search_applications(applications, request.POST.get("q", ""))
+    selected = bulk_selection(request, applications, {"job": "job_id", "current_status": "status"})
+    updated = bulk.update(selected, status=status)
+    messages.success(
+        request, f"{updated} application(s) marked as {dict(JobApplication.STATUS_CHOICES)[status]}."
+    )
+    return redirect("admin_applications")
+
+
 @staff_member_required
 def admin_users(request):
-    users = User.objects.all()
-    return render(request, "jobs/admin/admin_users.html", {"users": users})
+    page = paginate(request, User.objects.order_by("id"))
+    return render(request, "jobs/admin/admin_users.html", {"users": page.object_list, "page": page})
 
 
 @staff_member_required
@@ -358,6 +513,23 @@ def toggle_user(request, id):
     user.save()
     return redirect("admin_users")
 
+
+@staff_member_required
+@require_POST
+def bulk_users(request):
+    action = request.POST.get("action")
+    if action not in ("block", "unblock"):
+        messages.error(request, "Choose an action.")
+        return redirect("admin_users")
+
+    # Superusers are never blocked from here, and nobody blocks themselves.
+    selected = bulk_selection(
+        request, User.objects.filter(is_superuser=False), {"is_active": "is_active"}
+    ).exclude(pk=request.user.pk)
+    updated = bulk.update(selected, is_active=(action == "unblock"))
+    messages.success(request, f"{updated} user(s) {action}ed.")
+    return redirect("admin_users")
+
 @staff_member_required
 def delete_user(request, id):
     user = get_object_or_404(User, id=id)
@@ -422,8 +594,39 @@ def contact(request):
 
 @staff_member_required
 def messages_list(request):
-    messages_obj = ContactMessage.objects.all().order_by("-created_at")
-    return render(request, "jobs/admin/message.html", {"messages": messages_obj})
+    page = paginate(request, ContactMessage.objects.all().order_by("-created_at"))
+    return render(request, "jobs/admin/message.html", {"messages": page.object_list, "page": page})
+
+
+@staff_member_required
+def admin_metrics(request):
+    if request.method == "POST":
+        metrics.reset()
+        messages.success(request, "Request metrics reset.")
+        return redirect("admin_metrics")
+
+    return render(request, "jobs/admin/metrics.html", {
+        "rows": metrics.report(),
+        "enabled": getattr(settings, "REQUEST_METRICS_ENABLED", False)
+    })
+
+
+@staff_member_required
+def export_data(request, dataset):
+    # ?format=csv|jsonl plus the dataset's filters, since/until and after=<id>.
+    # A resumed CSV export (after=...) has no header row, so it can be appended.
+    fmt = request.GET.get("format", "csv")
+    try:
+        data = exports.get_dataset(dataset)
+        lines = exports.export_lines(
+            data, data.queryset(request.GET), fmt, header=not request.GET.get("after")
+        )
+    except exports.InvalidExport as e:
+        return HttpResponseBadRequest(str(e))
+
+    response = StreamingHttpResponse(lines, content_type=exports.FORMATS[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{dataset}.{fmt}"'
+    return response
 
 
 @login_required
@@ -468,8 +671,11 @@ def admin_testimonials(request):
     elif status == 'approved':
         testimonials = testimonials.filter(is_approved=True)
 
+    page = paginate(request, testimonials)
+
     return render(request, 'jobs/admin/admin_testimonials.html', {
-        'testimonials': testimonials,
+        'testimonials': page.object_list,
+        'page': page,
         'status': status
     })
 
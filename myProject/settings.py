@@ -57,9 +57,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'jobs.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'jobs.routers.PrimaryPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'jobs.sessions.SlidingSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -86,6 +89,11 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'myProject.wsgi.application'
+ASGI_APPLICATION = 'myProject.asgi.application'
+
+# Route home / job_list / job_detail / my_jobs to jobs.async_views. Turn on
+# only when serving myProject.asgi (e.g. uvicorn myProject.asgi:application).
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "False") == "True"
 
 # ------------------------------
 # Database
@@ -102,6 +110,58 @@ database_url = os.environ.get("DATABASE_URL")
 if database_url:
     DATABASES['default'] = dj_database_url.parse(database_url, conn_max_age=600)
 
+# Read replicas: REPLICA_DATABASE_URLS is a comma separated list of URLs in
+# the DATABASE_URL format. Reads are routed to them by jobs.routers.
+REPLICA_DATABASES = []
+for number, url in enumerate(filter(None, os.environ.get("REPLICA_DATABASE_URLS", "").split(",")), 1):
+    alias = f'replica{number}'
+    DATABASES[alias] = dj_database_url.parse(url.strip(), conn_max_age=600)
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    REPLICA_DATABASES.append(alias)
+
+if REPLICA_DATABASES:
+    DATABASE_ROUTERS = ['jobs.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = 5  # reads stay on the primary this long after a write
+REPLICA_RETRY_SECONDS = 30  # an unreachable replica is skipped this long
+
+# ------------------------------
+# Cache
+# ------------------------------
+# CACHE_BACKEND: "locmem" (default), "file" or "redis" (needs REDIS_URL).
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem")
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if CACHE_BACKEND == "redis" and REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+elif CACHE_BACKEND == "file":
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get("CACHE_LOCATION", str(BASE_DIR / '.cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'job-portal',
+        }
+    }
+
+# Whole-page cache for anonymous home / job_list / job_detail (jobs.page_cache)
+PAGE_CACHE_ENABLED = os.environ.get("PAGE_CACHE_ENABLED", "True") == "True"
+PAGE_CACHE_TIMEOUT = int(os.environ.get("PAGE_CACHE_TIMEOUT", 300))
+
+# Per-view SQL/latency metrics (jobs.metrics); off by default.
+REQUEST_METRICS_ENABLED = os.environ.get("REQUEST_METRICS_ENABLED", "False") == "True"
+REQUEST_METRICS_SAMPLES = 1000  # latest requests kept per view
+REQUEST_METRICS_FLUSH_INTERVAL = 10  # seconds between copies to the cache
+
 # ------------------------------
 # Password validation
 # ------------------------------
@@ -134,9 +194,30 @@ MEDIA_URL = '/media/'
 # ------------------------------
 # Session Settings
 # ------------------------------
+# SESSION_BACKEND: "db" (default), "cached_db", "signed_cookies" or "cache"
+# ("cache" only with a shared cache such as redis).
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+    "cache": "django.contrib.sessions.backends.cache",
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get("SESSION_BACKEND", "db")]
 SESSION_COOKIE_AGE = 60 * 60 * 24 * 7  # 7 days
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
-SESSION_SAVE_EVERY_REQUEST = True
+# Sessions are saved when they change; jobs.sessions.SlidingSessionMiddleware
+# extends them once less than SESSION_REFRESH_WINDOW seconds remain.
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_WINDOW = int(os.environ.get("SESSION_REFRESH_WINDOW", SESSION_COOKIE_AGE // 2))
+
+# ------------------------------
+# Pagination
+# ------------------------------
+PAGINATION_PAGE_SIZE = int(os.environ.get("PAGINATION_PAGE_SIZE", 20))
+PAGINATION_MAX_PAGE_SIZE = 100
+
+# Rows fetched per round-trip by the CSV/JSON Lines exports.
+EXPORT_CHUNK_SIZE = 2000
 
 # ------------------------------
 # Login URL
@@ -164,4 +245,9 @@ CLOUDINARY_STORAGE = {
 }
 
 DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
+
+# Resume/photo uploads are queued by the views and pushed by
+# `manage.py process_uploads`. Use jobs.uploads.LocalUploader to run offline.
+UPLOADS_BACKEND = os.environ.get("UPLOADS_BACKEND", "jobs.uploads.CloudinaryUploader")
+UPLOADS_LOCAL_ROOT = os.environ.get("UPLOADS_LOCAL_ROOT", str(BASE_DIR / "media" / "local-uploads"))
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"